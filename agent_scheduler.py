@@ -0,0 +1,123 @@
+import os
+import subprocess
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+def branch_name_for(issue_number, issue_title):
+    """Branch used for an issue, e.g. 'feature/issue-12-add-a-timer'."""
+    safe_title = "".join([c if c.isalnum() else "-" for c in issue_title]).lower()[:30]
+    return f"feature/issue-{issue_number}-{safe_title}"
+
+class WorktreeManager:
+    """
+    Gives each issue its own git worktree so several issues can be worked on at once.
+    Commands that touch the shared repository metadata (.git) are serialized by a lock.
+    """
+    def __init__(self, repo_dir, base_dir='.worktrees', base_branch='main'):
+        self.repo_dir = os.path.abspath(repo_dir)
+        self.base_dir = os.path.join(self.repo_dir, base_dir)
+        self.base_branch = base_branch
+        self.lock = threading.Lock()
+
+    def _git(self, *args):
+        return subprocess.run(['git', *args], cwd=self.repo_dir, capture_output=True, text=True)
+
+    def _exclude_base_dir(self):
+        """Keeps the worktrees folder out of 'git status' / 'git add .' in the shared checkout."""
+        git_dir = self._git('rev-parse', '--git-common-dir').stdout.strip()
+        exclude_path = os.path.join(self.repo_dir, git_dir, 'info', 'exclude')
+        entry = '/' + os.path.relpath(self.base_dir, self.repo_dir) + '/'
+        content = ''
+        if os.path.exists(exclude_path):
+            with open(exclude_path, 'r', encoding='utf-8') as f:
+                content = f.read()
+        if entry not in content.splitlines():
+            os.makedirs(os.path.dirname(exclude_path), exist_ok=True)
+            with open(exclude_path, 'a', encoding='utf-8') as f:
+                f.write(f"\n{entry}\n")
+
+    def path_for(self, issue_number):
+        return os.path.join(self.base_dir, f"issue-{issue_number}")
+
+    def create(self, issue_number, branch_name, start_point=None):
+        """
+        Creates a fresh worktree on a new branch from the base branch, or from
+        start_point (e.g. a checkpoint commit when resuming). Returns its path.
+        """
+        path = self.path_for(issue_number)
+        with self.lock:
+            self._exclude_base_dir()
+            # Leftovers from a crashed run would make 'worktree add' fail
+            if os.path.exists(path):
+                self._git('worktree', 'remove', '--force', path)
+            self._git('worktree', 'prune')
+            result = self._git('worktree', 'add', '-B', branch_name, path, start_point or self.base_branch)
+        if result.returncode != 0:
+            raise RuntimeError(f"git worktree add failed: {result.stderr.strip()}")
+        return path
+
+    def checkpoint(self, issue_number, message):
+        """Commits everything in an issue's worktree on its branch. Returns the commit id."""
+        path = self.path_for(issue_number)
+        subprocess.run(['git', 'add', '-A'], cwd=path, capture_output=True)
+        result = subprocess.run(['git', 'commit', '--allow-empty', '--no-verify', '-m', f"checkpoint: {message}"],
+                                cwd=path, capture_output=True, text=True)
+        if result.returncode != 0:
+            raise RuntimeError(f"git commit failed: {result.stderr.strip()}")
+        return subprocess.run(['git', 'rev-parse', 'HEAD'], cwd=path, capture_output=True, text=True).stdout.strip()
+
+    def remove(self, issue_number):
+        """Deletes an issue's worktree (the branch is kept)."""
+        with self.lock:
+            self._git('worktree', 'remove', '--force', self.path_for(issue_number))
+            self._git('worktree', 'prune')
+
+class IssueScheduler:
+    """
+    Runs issue handlers in parallel, at most `max_workers` at a time.
+    An issue that is already queued or running is not submitted again, so the
+    polling loop can hand over every open issue on each cycle.
+    """
+    def __init__(self, handler, max_workers=2):
+        self.handler = handler
+        self.max_workers = max_workers
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='issue')
+        self.in_flight = {}
+        self.lock = threading.Lock()
+
+    def submit(self, issue):
+        """Schedules an issue. Returns False if it is already being handled."""
+        with self.lock:
+            if issue.number in self.in_flight:
+                return False
+            future = self.executor.submit(self._run, issue)
+            self.in_flight[issue.number] = future
+            return True
+
+    def _run(self, issue):
+        try:
+            return self.handler(issue)
+        finally:
+            with self.lock:
+                self.in_flight.pop(issue.number, None)
+
+    def active(self):
+        """Numbers of the issues queued or running."""
+        with self.lock:
+            return sorted(self.in_flight)
+
+    def shutdown(self, wait=True):
+        self.executor.shutdown(wait=wait)
+
+def resolve_in_root(root, path):
+    """
+    Joins an agent-supplied path to a worktree root, refusing paths that escape it.
+    Returns None for paths outside the root. Symlinks are resolved on both sides,
+    so a link inside the worktree can't lead outside it; the resolved path is returned.
+    """
+    root = os.path.realpath(root)
+    full_path = os.path.realpath(os.path.join(root, path))
+    if full_path != root and not full_path.startswith(root + os.sep):
+        return None
+    return full_path
+
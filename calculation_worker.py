@@ -0,0 +1,239 @@
+import sys
+import time
+import itertools
+import multiprocessing
+from collections import deque
+from contextlib import contextmanager
+
+try:
+    import resource  # Unix only: lets workers enforce a CPU-time limit on themselves
+except ImportError:
+    resource = None
+
+# Worker errors are sent back by name and rebuilt in the parent; anything else becomes RuntimeError
+ERROR_TYPES = {
+    'SyntaxError': SyntaxError,
+    'ZeroDivisionError': ZeroDivisionError,
+    'OverflowError': OverflowError,
+}
+
+# Longest result shown by default, in digits
+MAX_DIGITS = 10000
+
+@contextmanager
+def allow_int_digits(max_digits):
+    """
+    Raises Python's int/str conversion limit (3.11+, 4300 digits by default) to
+    max_digits inside the block, and restores the previous limit afterwards.
+    """
+    get_limit = getattr(sys, 'get_int_max_str_digits', None)
+    previous = get_limit() if get_limit is not None else 0
+    if not 0 < previous < max_digits:
+        yield
+        return
+    sys.set_int_max_str_digits(max_digits)
+    try:
+        yield
+    finally:
+        sys.set_int_max_str_digits(previous)
+
+def evaluate_limited(expression, max_digits):
+    """Evaluates an expression and returns it as a string, refusing results longer than max_digits."""
+    from expression_engine import evaluate
+
+    with allow_int_digits(max_digits):
+        try:
+            value = evaluate(expression)
+        except ValueError as e:
+            # An integer literal over the conversion limit, i.e. longer than max_digits
+            raise OverflowError(f"number has more than {max_digits} digits") from e
+        return format_limited(value, max_digits)
+
+def format_limited(value, max_digits):
+    """Converts a result to a string, refusing results longer than max_digits."""
+    # Check the size before str(): converting a huge int is itself slow
+    if isinstance(value, int) and value.bit_length() * 0.30103 > max_digits:
+        raise OverflowError(f"result has more than {max_digits} digits")
+    result = str(value)
+    if len(result) > max_digits:
+        raise OverflowError(f"result has more than {max_digits} digits")
+    return result
+
+def _set_cpu_limit(seconds):
+    """Makes the kernel kill this process if the current job uses more than `seconds` of CPU."""
+    if resource is None:
+        return
+    usage = resource.getrusage(resource.RUSAGE_SELF)
+    used = usage.ru_utime + usage.ru_stime
+    _, hard = resource.getrlimit(resource.RLIMIT_CPU)
+    soft = int(used + seconds) + 1
+    if hard != resource.RLIM_INFINITY:
+        soft = min(soft, hard)
+    resource.setrlimit(resource.RLIMIT_CPU, (soft, hard))
+
+def _clear_cpu_limit():
+    if resource is None:
+        return
+    _, hard = resource.getrlimit(resource.RLIMIT_CPU)
+    resource.setrlimit(resource.RLIMIT_CPU, (hard, hard))
+
+def _worker_main(conn):
+    """Worker process loop: receives (job_id, expression, cpu_time, max_digits), sends back a result."""
+    while True:
+        try:
+            message = conn.recv()
+        except EOFError:
+            return
+        if message is None:
+            return
+        job_id, expression, cpu_time, max_digits = message
+        _set_cpu_limit(cpu_time)
+        try:
+            reply = (job_id, 'ok', evaluate_limited(expression, max_digits))
+        except Exception as e:
+            reply = (job_id, 'error', (type(e).__name__, str(e)))
+        finally:
+            _clear_cpu_limit()
+        conn.send(reply)
+
+class _Worker:
+    """One worker process and the job it is running, if any."""
+    def __init__(self, context):
+        self.conn, child_conn = context.Pipe()
+        self.process = context.Process(target=_worker_main, args=(child_conn,), daemon=True)
+        self.process.start()
+        child_conn.close()
+        self.job_id = None
+        self.started = None
+
+    def stop(self):
+        try:
+            self.conn.send(None)
+        except (OSError, ValueError):
+            pass
+        self.process.join(0.5)
+        self.kill()
+
+    def kill(self):
+        if self.process.is_alive():
+            self.process.terminate()
+            self.process.join(1)
+        self.conn.close()
+
+class CalculationPool:
+    """
+    Evaluates calculator expressions in reusable worker processes so a runaway
+    expression (e.g. 9**9**9) can never block the caller.
+
+    Jobs are submitted with submit(), finished results are collected with poll()
+    (non-blocking, meant to be called from Tk's after() loop) or wait().
+    Each job is limited to `cpu_time` seconds and results of at most `max_digits`
+    characters. A worker that exceeds the limit or is cancelled is killed and replaced.
+    """
+    # Wall-clock fallback when the OS can't enforce the CPU limit (e.g. Windows)
+    WALL_TIME_FACTOR = 2
+
+    def __init__(self, workers=2, cpu_time=2, max_digits=MAX_DIGITS):
+        self.cpu_time = cpu_time
+        self.max_digits = max_digits
+        # spawn: safe to use next to Tk and threads on every platform
+        self.context = multiprocessing.get_context('spawn')
+        self.workers = [_Worker(self.context) for _ in range(workers)]
+        self.pending = deque()
+        self.finished = {}
+        self.job_ids = itertools.count(1)
+
+    def submit(self, expression):
+        """Queues an expression and returns its job id."""
+        job_id = next(self.job_ids)
+        self.pending.append((job_id, expression))
+        self._dispatch()
+        return job_id
+
+    def cancel(self, job_id):
+        """Cancels a queued or running job. Returns True if it was still in progress."""
+        for item in self.pending:
+            if item[0] == job_id:
+                self.pending.remove(item)
+                return True
+        for index, worker in enumerate(self.workers):
+            if worker.job_id == job_id:
+                self._replace(index)
+                self._dispatch()
+                return True
+        return False
+
+    def poll(self):
+        """
+        Collects finished jobs without blocking.
+        Returns a list of (job_id, result, error): result is a string on success,
+        otherwise error holds the exception (SyntaxError, ZeroDivisionError,
+        OverflowError for oversized results, TimeoutError, or RuntimeError).
+        """
+        for index, worker in enumerate(self.workers):
+            if worker.job_id is None:
+                continue
+            job_id = worker.job_id
+            if worker.conn.poll():
+                try:
+                    _, status, payload = worker.conn.recv()
+                except (EOFError, OSError):
+                    status, payload = None, None
+                if status is not None:
+                    worker.job_id = None
+                    self.finished[job_id] = self._to_outcome(status, payload)
+                    continue
+            if not worker.process.is_alive():
+                # Killed by the kernel for exceeding its CPU limit
+                self._replace(index)
+                self.finished[job_id] = (None, TimeoutError(f"calculation exceeded {self.cpu_time}s of CPU time"))
+            elif time.monotonic() - worker.started > self.cpu_time * self.WALL_TIME_FACTOR:
+                self._replace(index)
+                self.finished[job_id] = (None, TimeoutError(f"calculation took longer than {self.cpu_time * self.WALL_TIME_FACTOR}s"))
+
+        self._dispatch()
+        done = [(job_id, result, error) for job_id, (result, error) in self.finished.items()]
+        self.finished.clear()
+        return done
+
+    def wait(self, job_id, timeout=None, interval=0.01):
+        """Blocks until a job finishes and returns (result, error). Other finished jobs are kept for poll()."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            for done_id, result, error in self.poll():
+                if done_id == job_id:
+                    return result, error
+                self.finished[done_id] = (result, error)
+            if deadline is not None and time.monotonic() > deadline:
+                raise TimeoutError(f"job {job_id} did not finish in {timeout}s")
+            time.sleep(interval)
+
+    def shutdown(self):
+        """Stops all worker processes."""
+        for worker in self.workers:
+            worker.stop()
+        self.workers = []
+        self.pending.clear()
+
+    def _to_outcome(self, status, payload):
+        if status == 'ok':
+            return payload, None
+        name, message = payload
+        error_type = ERROR_TYPES.get(name)
+        if error_type is None:
+            return None, RuntimeError(f"An unexpected error occurred: {message}")
+        return None, error_type(message)
+
+    def _replace(self, index):
+        self.workers[index].kill()
+        self.workers[index] = _Worker(self.context)
+
+    def _dispatch(self):
+        for worker in self.workers:
+            if not self.pending:
+                return
+            if worker.job_id is None:
+                job_id, expression = self.pending.popleft()
+                worker.conn.send((job_id, expression, self.cpu_time, self.max_digits))
+                worker.job_id = job_id
+                worker.started = time.monotonic()
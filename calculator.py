@@ -1,3 +1,6 @@
+from expression_engine import evaluate
+
+
 class Calculator:
     """
     Handles the business logic of the calculator.
@@ -14,6 +17,10 @@ class Calculator:
         """Clears the current expression."""
         self.expression = ""
 
+    def set_result(self, result):
+        """Stores a result computed elsewhere (e.g. by a CalculationPool) as the new expression."""
+        self.expression = result
+
     def calculate(self):
         """
         Evaluates the current expression.
@@ -21,8 +28,8 @@ class Calculator:
         Raises SyntaxError or ZeroDivisionError on failure.
         """
         try:
-            # Using eval is simple for this PoC, but not safe for production apps
-            result = str(eval(self.expression))
+            # Compiled (and cached) by the restricted expression engine instead of eval
+            result = str(evaluate(self.expression))
             self.expression = result
             return result
         except (SyntaxError, ZeroDivisionError):
@@ -37,8 +44,12 @@ class Calculator:
 
 def main():
     """Initializes and runs the Tkinter GUI application."""
+    import queue
+    import threading
     import tkinter as tk
     from tkinter import messagebox
+    from calculation_worker import CalculationPool
+    from expression_engine import IncrementalExpression
 
     class CalculatorApp:
         """
@@ -46,14 +57,32 @@ def main():
         This class serves as the initial proof-of-concept before
         the project is pivoted to a Minesweeper game.
         """
+        # How often (ms) the window checks for finished calculations
+        POLL_MS = 30
+        # Quiet time (ms) after a key press before the live preview is computed
+        PREVIEW_DEBOUNCE_MS = 80
+        PREVIEW_MAX_CHARS = 24
+
         def __init__(self, root):
             self.calculator = Calculator() # Logic handler
+            # '=' is evaluated in worker processes so runaway expressions can't freeze the window
+            self.pool = CalculationPool(workers=1)
+            self.pending_job = None
             self.root = root
             self.root.title("Calculator")
-            self.root.geometry("300x400")
+            self.root.geometry("300x430")
             self.root.resizable(False, False)
 
             self.display_text = tk.StringVar()
+            self.preview_text = tk.StringVar()
+
+            # Live preview: a worker thread keeps an IncrementalExpression and answers
+            # the latest expression text sent through preview_requests
+            self.preview_requests = queue.Queue()
+            self.preview_results = queue.Queue()
+            self.preview_after = None
+            self.preview_pending = None
+            threading.Thread(target=self._preview_worker, daemon=True).start()
 
             self._create_widgets()
 
@@ -65,6 +94,9 @@ def main():
             display_entry = tk.Entry(display_frame, textvariable=self.display_text, font=('arial', 20, 'bold'), bd=10, bg="#eee", justify='right', state='readonly')
             display_entry.pack()
 
+            preview_label = tk.Label(self.root, textvariable=self.preview_text, font=('arial', 12), fg='gray', anchor='e')
+            preview_label.pack(fill=tk.X, padx=20)
+
             button_frame = tk.Frame(self.root)
             button_frame.pack()
 
@@ -93,28 +125,118 @@ def main():
 
         def _on_button_press(self, value):
             """Handles clicks for numbers and operators."""
+            if self.pending_job is not None:
+                return # Wait for the result (or press C to cancel)
             self.calculator.press(value)
             self.display_text.set(self.calculator.expression)
+            self._schedule_preview()
+
+        def _schedule_preview(self):
+            """Debounces preview requests so fast typing only computes the last one."""
+            if self.preview_after is not None:
+                self.root.after_cancel(self.preview_after)
+            self.preview_after = self.root.after(self.PREVIEW_DEBOUNCE_MS, self._request_preview)
+
+        def _request_preview(self):
+            """Hands the current expression to the preview thread."""
+            self.preview_after = None
+            polling = self.preview_pending is not None
+            self.preview_pending = self.calculator.expression
+            self.preview_requests.put(self.preview_pending)
+            if not polling:
+                self.root.after(self.POLL_MS, self._poll_preview)
+
+        def _preview_worker(self):
+            """Runs in the preview thread; only the newest request is evaluated."""
+            incremental = IncrementalExpression()
+            while True:
+                text = self.preview_requests.get()
+                while True:
+                    try:
+                        text = self.preview_requests.get_nowait()
+                    except queue.Empty:
+                        break
+                try:
+                    preview = str(incremental.update(text))
+                except Exception:
+                    preview = ""
+                if len(preview) > self.PREVIEW_MAX_CHARS:
+                    preview = preview[:self.PREVIEW_MAX_CHARS - 3] + "..."
+                self.preview_results.put((text, preview))
+
+        def _poll_preview(self):
+            """Shows the preview once the result for the latest expression arrives."""
+            while True:
+                try:
+                    text, preview = self.preview_results.get_nowait()
+                except queue.Empty:
+                    break
+                if text == self.preview_pending:
+                    self.preview_pending = None
+                    self.preview_text.set(f"= {preview}" if preview else "")
+
+            if self.preview_pending is not None:
+                self.root.after(self.POLL_MS, self._poll_preview)
+
+        def _clear_preview(self):
+            """Drops the preview and any preview still being computed."""
+            if self.preview_after is not None:
+                self.root.after_cancel(self.preview_after)
+                self.preview_after = None
+            self.preview_pending = None
+            self.preview_text.set("")
 
         def _on_equals_press(self):
-            """Calculates the result of the expression."""
-            try:
-                result = self.calculator.calculate()
-                self.display_text.set(result)
-            except (SyntaxError, ZeroDivisionError) as e:
-                messagebox.showerror("Error", f"Invalid Expression: {e}")
-                self.display_text.set("")
-            except Exception as e:
-                messagebox.showerror("Error", "An error occurred")
+            """Sends the expression to the worker pool; the result arrives in _poll_result."""
+            if self.pending_job is not None:
+                return
+            self._clear_preview()
+            self.pending_job = self.pool.submit(self.calculator.expression)
+            self.display_text.set("...")
+            self.root.after(self.POLL_MS, self._poll_result)
+
+        def _poll_result(self):
+            """Checks the worker pool for the pending calculation without blocking the UI."""
+            for job_id, result, error in self.pool.poll():
+                if job_id != self.pending_job:
+                    continue # Result of a cancelled calculation
+                self.pending_job = None
+                if error is None:
+                    self.calculator.set_result(result)
+                    self.display_text.set(result)
+                    return
+                self.calculator.clear()
                 self.display_text.set("")
+                if isinstance(error, (SyntaxError, ZeroDivisionError)):
+                    messagebox.showerror("Error", f"Invalid Expression: {error}")
+                elif isinstance(error, TimeoutError):
+                    messagebox.showerror("Error", "The calculation took too long")
+                elif isinstance(error, OverflowError):
+                    messagebox.showerror("Error", "The result is too large")
+                else:
+                    messagebox.showerror("Error", "An error occurred")
+                return
+
+            if self.pending_job is not None:
+                self.root.after(self.POLL_MS, self._poll_result)
 
         def _on_clear_press(self):
-            """Clears the current expression and display."""
+            """Clears the current expression and display, cancelling a running calculation."""
+            if self.pending_job is not None:
+                self.pool.cancel(self.pending_job)
+                self.pending_job = None
+            self._clear_preview()
             self.calculator.clear()
             self.display_text.set("")
 
+        def close(self):
+            """Stops the worker processes and closes the window."""
+            self.pool.shutdown()
+            self.root.destroy()
+
     root = tk.Tk()
     app = CalculatorApp(root)
+    root.protocol("WM_DELETE_WINDOW", app.close)
     root.mainloop()
 
 
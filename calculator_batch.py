@@ -0,0 +1,128 @@
+import sys
+import argparse
+import multiprocessing
+from collections import deque
+from itertools import islice
+
+from expression_engine import tokenize, split_template, compile_template
+from calculation_worker import MAX_DIGITS, allow_int_digits, format_limited
+
+DEFAULT_CHUNK_SIZE = 1000
+
+def format_error(error):
+    """Formats a failed expression for the output stream."""
+    return f"Error: {type(error).__name__}: {error}"
+
+def evaluate_chunk(lines, max_digits=MAX_DIGITS):
+    """
+    Evaluates a list of expressions and returns their results (as strings) in order.
+    Identical lines are computed once; lines that differ only in numeric literals
+    are grouped and run through one compiled template in a tight loop.
+
+    Evaluation is limited like the calculator's worker pool: powers and products are
+    refused before they grow past MAX_LIMITED_DIGITS and results longer than
+    max_digits are errors. A line that fails in any way gets its error in its slot.
+    """
+    with allow_int_digits(max_digits):
+        return _evaluate_chunk(lines, max_digits)
+
+def _evaluate_chunk(lines, max_digits):
+    results = [None] * len(lines)
+    by_template = {}
+    seen = {}
+
+    for index, line in enumerate(lines):
+        expression = line.strip()
+        if expression in seen:
+            seen[expression].append(index)
+            continue
+        seen[expression] = [index]
+        try:
+            template, values = split_template(tokenize(expression))
+        except Exception as e:
+            results[index] = format_error(e)
+            continue
+        by_template.setdefault(template, []).append((index, values))
+
+    for template, rows in by_template.items():
+        try:
+            # Deeply nested parentheses exhaust the recursion limit here
+            function = compile_template(template, limited=True)
+        except Exception as e:
+            for index, _ in rows:
+                results[index] = format_error(e)
+            continue
+        for index, values in rows:
+            try:
+                results[index] = format_limited(function(values), max_digits)
+            except Exception as e:
+                results[index] = format_error(e)
+
+    # Copy results to the repeated lines
+    for indexes in seen.values():
+        first = indexes[0]
+        for index in indexes[1:]:
+            results[index] = results[first]
+    return results
+
+def _chunks(stream, chunk_size):
+    """Reads a text stream lazily in lists of chunk_size lines (without newlines)."""
+    lines = (line.rstrip('\n') for line in stream)
+    while True:
+        chunk = list(islice(lines, chunk_size))
+        if not chunk:
+            return
+        yield chunk
+
+def run_batch(input_stream, output_stream, workers=None, chunk_size=DEFAULT_CHUNK_SIZE, max_digits=MAX_DIGITS):
+    """
+    Evaluates one expression per input line and writes one result per output line,
+    in input order. Chunks are spread over `workers` processes (default: all cores);
+    at most two chunks per worker are in flight, so memory stays bounded.
+    Returns the number of expressions processed.
+    """
+    workers = workers or multiprocessing.cpu_count()
+    count = 0
+
+    if workers == 1:
+        for chunk in _chunks(input_stream, chunk_size):
+            output_stream.write("\n".join(evaluate_chunk(chunk, max_digits)) + "\n")
+            count += len(chunk)
+        return count
+
+    context = multiprocessing.get_context('spawn')
+    with context.Pool(workers) as pool:
+        in_flight = deque()
+        for chunk in _chunks(input_stream, chunk_size):
+            in_flight.append(pool.apply_async(evaluate_chunk, (chunk, max_digits)))
+            count += len(chunk)
+            if len(in_flight) >= workers * 2:
+                output_stream.write("\n".join(in_flight.popleft().get()) + "\n")
+        while in_flight:
+            output_stream.write("\n".join(in_flight.popleft().get()) + "\n")
+    return count
+
+def main(argv=None):
+    """Command line entry point: python calculator_batch.py [INPUT] [-o OUTPUT] [-j WORKERS]"""
+    parser = argparse.ArgumentParser(description="Evaluate calculator expressions, one per line.")
+    parser.add_argument('input', nargs='?', default='-', help="input file (default: stdin)")
+    parser.add_argument('-o', '--output', default='-', help="output file (default: stdout)")
+    parser.add_argument('-j', '--workers', type=int, default=None, help="worker processes (default: all cores)")
+    parser.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE, help="lines per work unit")
+    parser.add_argument('--max-digits', type=int, default=MAX_DIGITS, help="longest result allowed")
+    args = parser.parse_args(argv)
+
+    input_stream = sys.stdin if args.input == '-' else open(args.input, 'r', encoding='utf-8')
+    output_stream = sys.stdout if args.output == '-' else open(args.output, 'w', encoding='utf-8')
+    try:
+        run_batch(input_stream, output_stream, workers=args.workers, chunk_size=args.chunk_size,
+                  max_digits=args.max_digits)
+    finally:
+        if input_stream is not sys.stdin:
+            input_stream.close()
+        if output_stream is not sys.stdout:
+            output_stream.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+import json
+import time
+from contextlib import nullcontext
+
+try:
+    from crewai.llms.base_llm import BaseLLM
+except ImportError:  # The gateway works without CrewAI; only the agent adapter needs it
+    BaseLLM = object
+try:
+    from crewai.llms.base_llm import call_stop_override
+except ImportError:
+    call_stop_override = None
+
+def prompt_text(messages, tools=None):
+    """Stable text of one call's messages (and tool schemas) for the cache key."""
+    if isinstance(messages, str) and not tools:
+        return messages
+    return json.dumps({'messages': messages, 'tools': tools}, sort_keys=True, default=str)
+
+class LLMGateway:
+    """
+    Work done around every model call of a crew, at the level CrewAI calls the
+    model (agents only ever use `llm.call`): identical calls on an unchanged
+    worktree are answered from the LLMCache, the others wait for the model's slot
+    in the shared RateScheduler, and their latency and tokens go to the open spans
+    of the PipelineMetrics.
+    """
+    def __init__(self, cache, root=None, scheduler=None, metrics=None):
+        self.cache = cache
+        self.root = root
+        self.scheduler = scheduler
+        self.metrics = metrics
+
+    def _send(self, model, send, usage):
+        if self.scheduler is not None:
+            self.scheduler.acquire(model)
+        before = usage() if usage else (0, 0)
+        start = time.perf_counter()
+        response = send()
+        if self.metrics is not None:
+            after = usage() if usage else (0, 0)
+            self.metrics.record_llm_call(after[0] - before[0], after[1] - before[1], time.perf_counter() - start)
+        return response
+
+    def call(self, model, temperature, messages, send, tools=None, cacheable=True, usage=None):
+        """
+        Answer for `messages`, from the cache or from `send()` once the model's rate slot
+        is free. `usage()` returns the client's running (prompt, completion) token totals.
+        """
+        if not cacheable:
+            return self._send(model, send, usage)
+        key = self.cache.key_for(model, temperature, prompt_text(messages, tools), self.root)
+        response = self.cache.get(key)
+        if response is None:
+            response = self._send(model, send, usage)
+            if response is not None:
+                self.cache.put(key, response)
+        return response
+
+class GatewayLLM(BaseLLM):
+    """
+    CrewAI LLM that sends every call of an inner CrewAI LLM through an LLMGateway.
+    CrewAI keeps BaseLLM instances as they are, whereas LangChain chat models are
+    rebuilt as LiteLLM clients, dropping their cache, rate limiter and callbacks.
+    """
+    llm: BaseLLM
+    gateway: LLMGateway
+
+    def call(self, messages, tools=None, callbacks=None, available_functions=None,
+             from_task=None, from_agent=None, response_model=None):
+        def send():
+            # The agent sets its stop words on this wrapper; the inner client reads its own
+            override = call_stop_override(self.llm, self.stop_sequences) if call_stop_override else nullcontext()
+            with override:
+                return self.llm.call(messages, tools=tools, callbacks=callbacks,
+                                     available_functions=available_functions, from_task=from_task,
+                                     from_agent=from_agent, response_model=response_model)
+        # With available_functions the client runs the tools itself, so the call always goes out
+        return self.gateway.call(self.model, self.temperature, messages, send, tools=tools,
+                                 cacheable=available_functions is None and response_model is None,
+                                 usage=self._usage)
+
+    def _usage(self):
+        summary = self.llm.get_token_usage_summary()
+        return summary.prompt_tokens, summary.completion_tokens
+
+    def supports_function_calling(self):
+        return self.llm.supports_function_calling()
+
+    def supports_stop_words(self):
+        return self.llm.supports_stop_words()
+
+    def get_context_window_size(self):
+        return self.llm.get_context_window_size()
+
+    def get_token_usage_summary(self):
+        return self.llm.get_token_usage_summary()
+
+    @classmethod
+    def wrap(cls, llm, gateway):
+        return cls(model=llm.model, temperature=llm.temperature, stop=list(llm.stop), llm=llm, gateway=gateway)
@@ -0,0 +1,323 @@
+import re
+import operator
+from functools import lru_cache
+
+# Numbers as Python writes them (so chained results like "1e+16" or "0.5" parse back),
+# then the operators the calculator can produce. Longer operators come first.
+TOKEN_RE = re.compile(r"""
+    \s*(?:
+        (?P<number>(?:\d+\.?\d*|\.\d+)(?:[eE][+-]?\d+)?)
+      | (?P<op>\*\*|//|[-+*/%()])
+    )""", re.VERBOSE)
+
+BINARY_OPERATORS = {
+    '+': operator.add,
+    '-': operator.sub,
+    '*': operator.mul,
+    '/': operator.truediv,
+    '//': operator.floordiv,
+    '%': operator.mod,
+    '**': operator.pow,
+}
+
+CACHE_SIZE = 256
+
+# Size cap for '**' and '*' in limited (preview, batch) evaluation. A huge power or
+# product holds the GIL for as long as it runs, so it has to be refused before it starts.
+MAX_LIMITED_DIGITS = 10000
+
+def limited_pow(base, exponent):
+    """operator.pow that raises OverflowError instead of building an enormous integer."""
+    if isinstance(base, int) and isinstance(exponent, int) and exponent > 0 and abs(base) > 1:
+        if exponent * base.bit_length() * 0.30103 > MAX_LIMITED_DIGITS:
+            raise OverflowError(f"result has more than {MAX_LIMITED_DIGITS} digits")
+    return operator.pow(base, exponent)
+
+def limited_mul(left, right):
+    """operator.mul with the same size cap as limited_pow, so chained products stay bounded too."""
+    if isinstance(left, int) and isinstance(right, int):
+        if (left.bit_length() + right.bit_length()) * 0.30103 > MAX_LIMITED_DIGITS + 1:
+            raise OverflowError(f"result has more than {MAX_LIMITED_DIGITS} digits")
+    return operator.mul(left, right)
+
+LIMITED_OPERATORS = dict(BINARY_OPERATORS, **{'**': limited_pow, '*': limited_mul})
+
+def tokenize(expression):
+    """
+    Splits an expression into ('number', value) and ('op', symbol) tokens.
+    Raises SyntaxError on anything that isn't a number or a calculator operator.
+    """
+    return [token for token, _ in _tokenize_from(expression, 0)]
+
+def _tokenize_from(expression, pos):
+    """Yields (token, start offset) pairs for expression[pos:]."""
+    expression = expression.rstrip()
+    while pos < len(expression):
+        match = TOKEN_RE.match(expression, pos)
+        if not match:
+            raise SyntaxError(f"invalid character at position {pos}: {expression[pos]!r}")
+        number = match.group('number')
+        if number is not None:
+            yield ('number', _parse_number(number)), pos
+        else:
+            yield ('op', match.group('op')), pos
+        pos = match.end()
+
+def _parse_number(text):
+    """Converts a numeric literal the way Python's own parser would."""
+    if any(ch in text for ch in '.eE'):
+        return float(text)
+    # Python rejects "07" but accepts "0" and "00"
+    if len(text) > 1 and text[0] == '0' and text.strip('0'):
+        raise SyntaxError("leading zeros in decimal integer literals are not permitted")
+    return int(text)
+
+def split_template(tokens):
+    """
+    Separates the shape of an expression from its numeric literals:
+    "3*4+1" -> ("# * # + #", (3, 4, 1)). Expressions that differ only in their
+    numbers share a template and therefore one compiled function.
+    """
+    parts = []
+    values = []
+    for kind, value in tokens:
+        if kind == 'number':
+            parts.append('#')
+            values.append(value)
+        else:
+            parts.append(value)
+    return " ".join(parts), tuple(values)
+
+class _Parser:
+    """
+    Recursive-descent parser producing a tree of closures over the template's
+    literal values (each closure takes the tuple of values), with Python's precedence:
+    expr   := term (('+' | '-') term)*
+    term   := unary (('*' | '/' | '//' | '%') unary)*
+    unary  := ('+' | '-') unary | power
+    power  := atom ('**' unary)?
+    atom   := number | '(' expr ')'
+    """
+    def __init__(self, tokens, operators=BINARY_OPERATORS):
+        self.tokens = tokens
+        self.operators = operators
+        self.pos = 0
+
+    def peek(self):
+        if self.pos < len(self.tokens):
+            return self.tokens[self.pos]
+        return (None, None)
+
+    def take_op(self, *symbols):
+        kind, value = self.peek()
+        if kind == 'op' and value in symbols:
+            self.pos += 1
+            return value
+        return None
+
+    def parse(self):
+        if not self.tokens:
+            raise SyntaxError("empty expression")
+        node = self.expr()
+        if self.pos != len(self.tokens):
+            raise SyntaxError(f"unexpected token {self.peek()[1]!r}")
+        return node
+
+    def expr(self):
+        return self.chain(self.term, ('+', '-'))
+
+    def term(self):
+        return self.chain(self.unary, ('*', '/', '//', '%'))
+
+    def chain(self, operand, symbols):
+        """Parses a left-associative chain like a+b-c into one flat node."""
+        first = operand()
+        rest = []
+        while True:
+            symbol = self.take_op(*symbols)
+            if symbol is None:
+                break
+            rest.append((self.operators[symbol], operand()))
+        if not rest:
+            return first
+        if len(rest) == 1:
+            return _binary(rest[0][0], first, rest[0][1])
+        return _chain(first, rest)
+
+    def unary(self):
+        symbol = self.take_op('+', '-')
+        if symbol is None:
+            return self.power()
+        operand = self.unary()
+        if symbol == '-':
+            return lambda args: -operand(args)
+        return lambda args: +operand(args)
+
+    def power(self):
+        base = self.atom()
+        if self.take_op('**') is None:
+            return base
+        # Right-associative, and the exponent may carry a sign: 2**-1, 2**3**2
+        return _binary(self.operators['**'], base, self.unary())
+
+    def atom(self):
+        kind, value = self.peek()
+        if kind == 'number':
+            self.pos += 1
+            # In a template, a number token holds the index of its literal
+            return lambda args: args[value]
+        if self.take_op('('):
+            node = self.expr()
+            if self.take_op(')') is None:
+                raise SyntaxError("missing closing parenthesis")
+            return node
+        if kind is None:
+            raise SyntaxError("unexpected end of expression")
+        raise SyntaxError(f"unexpected token {value!r}")
+
+def _binary(func, left, right):
+    return lambda args: func(left(args), right(args))
+
+def _chain(first, rest):
+    # Evaluated in a loop so long sums don't nest one Python call per operator
+    def node(args):
+        value = first(args)
+        for func, operand in rest:
+            value = func(value, operand(args))
+        return value
+    return node
+
+@lru_cache(maxsize=CACHE_SIZE)
+def compile_template(template, limited=False):
+    """
+    Compiles a template from split_template() into a callable taking the tuple
+    of literal values. Cached, so every expression with the same shape reuses it.
+    With limited=True, '**' and '*' refuse results above MAX_LIMITED_DIGITS.
+    """
+    tokens = []
+    index = 0
+    for part in template.split(" "):
+        if part == '#':
+            tokens.append(('number', index))
+            index += 1
+        elif part:
+            tokens.append(('op', part))
+    return _Parser(tokens, LIMITED_OPERATORS if limited else BINARY_OPERATORS).parse()
+
+@lru_cache(maxsize=CACHE_SIZE)
+def compile_expression(expression):
+    """
+    Compiles an expression into a zero-argument callable returning its value.
+    Results are cached, so repeated expressions are only parsed once.
+    Raises SyntaxError for invalid input.
+    """
+    template, values = split_template(tokenize(expression))
+    function = compile_template(template)
+    return lambda: function(values)
+
+def evaluate(expression):
+    """Evaluates an arithmetic expression without eval(). Same result types as Python."""
+    return compile_expression(expression)()
+
+class IncrementalExpression:
+    """
+    Evaluates an expression that grows one keystroke at a time (live preview).
+
+    Only the last token is re-tokenized when text is appended, and the top-level
+    '+'/'-' terms that are already complete keep their running value, so each
+    update costs as much as the term being typed, not the whole expression.
+    Evaluation is limited (see limited_pow), so it is safe to run on any input.
+    """
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        self.text = ""
+        self.tokens = []
+        self.starts = []
+        # One entry per completed top-level term: (index of the '+'/'-' token after it,
+        # that operator, value of everything before the operator)
+        self.boundaries = []
+
+    def update(self, text):
+        """
+        Sets the new expression text and returns its value.
+        Raises SyntaxError while the expression is incomplete, or the evaluation error.
+        """
+        if self.tokens and text.startswith(self.text):
+            # Appending can only change the last token (e.g. "1" -> "12", "*" -> "**")
+            keep = len(self.tokens) - 1
+        else:
+            keep = 0
+        start = self.starts[keep] if keep else 0
+
+        del self.tokens[keep:]
+        del self.starts[keep:]
+        while self.boundaries and self.boundaries[-1][0] >= keep:
+            self.boundaries.pop()
+
+        self.text = text
+        try:
+            for token, offset in _tokenize_from(text, start):
+                self.tokens.append(token)
+                self.starts.append(offset)
+        except SyntaxError:
+            self.reset()
+            raise
+
+        return self._evaluate_from_last_boundary()
+
+    def _evaluate_from_last_boundary(self):
+        if self.boundaries:
+            term_start = self.boundaries[-1][0] + 1
+        else:
+            term_start = 0
+
+        # Look for new top-level binary '+'/'-' in the part after the last boundary
+        depth = 0
+        for index in range(term_start, len(self.tokens)):
+            kind, value = self.tokens[index]
+            if value == '(':
+                depth += 1
+            elif value == ')':
+                depth -= 1
+            elif kind == 'op' and value in ('+', '-') and depth == 0 and index > term_start:
+                previous_kind, previous_value = self.tokens[index - 1]
+                if previous_kind == 'number' or previous_value == ')':
+                    try:
+                        before = self._value_until(term_start, index)
+                    except Exception as e:
+                        # Kept so later updates report it without re-evaluating
+                        before = e
+                    self.boundaries.append((index, value, before))
+                    term_start = index + 1
+
+        return self._value_until(term_start, len(self.tokens))
+
+    def _value_until(self, term_start, term_end):
+        """Value of the completed terms combined with the term tokens[term_start:term_end]."""
+        template, values = split_template(self.tokens[term_start:term_end])
+        term = compile_template(template, limited=True)(values)
+        if not self.boundaries:
+            return term
+        _, symbol, before = self.boundaries[-1]
+        if isinstance(before, Exception):
+            raise before
+        return BINARY_OPERATORS[symbol](before, term)
+
+def benchmark(expressions=None, repeat=20000):
+    """Times evaluate() against eval() on the given expressions; returns {name: seconds}."""
+    import timeit
+
+    expressions = expressions or ["9*3", "3*3+1", "12.5/4-7*2", "2**10//3+45%7", "(1+2)*(3+4)-5/6"]
+    results = {}
+    for name, func in (('eval', eval), ('evaluate', evaluate)):
+        results[name] = timeit.timeit(lambda: [func(e) for e in expressions], number=repeat)
+    return results
+
+# Benchmark against eval (for measuring, not part of the calculator)
+if __name__ == '__main__':
+    timings = benchmark()
+    for name, seconds in timings.items():
+        print(f"{name:>8}: {seconds:.3f}s")
+    print(f"speedup: {timings['eval'] / timings['evaluate']:.1f}x")
@@ -0,0 +1,132 @@
+import os
+import threading
+import subprocess
+
+class GitError(RuntimeError):
+    """A git command exited with an error; the message carries its stderr."""
+
+class TouchedFiles:
+    """Paths (relative to a worktree) that the agents' tools wrote or deleted."""
+    def __init__(self, root, paths=()):
+        # Same form as the paths resolve_in_root() hands to the tools
+        self.root = os.path.realpath(root)
+        self.lock = threading.Lock()
+        self._paths = set(paths)
+
+    def add(self, path):
+        relative = os.path.relpath(os.path.abspath(os.path.join(self.root, path)), self.root)
+        with self.lock:
+            self._paths.add(relative.replace(os.sep, '/'))
+
+    def update(self, paths):
+        for path in paths:
+            self.add(path)
+
+    def paths(self):
+        with self.lock:
+            return sorted(self._paths)
+
+class CommitRequest:
+    """One commit to build: `paths` read from `workdir` on top of `parent`, stored on `branch`."""
+    def __init__(self, branch, parent, workdir, paths, message):
+        self.branch = branch
+        self.parent = parent
+        self.workdir = workdir
+        self.paths = paths
+        self.message = message
+
+def _quote(path):
+    return '"' + path.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n') + '"'
+
+def _data(payload):
+    return b"data %d\n" % len(payload) + payload + b"\n"
+
+class GitOps:
+    """
+    Branch, commit and push steps for the agent runner. Commits for any number of
+    branches are written by one 'git fast-import' process fed from memory (no index,
+    no checkout), only the given paths are included, and the branches go out in a
+    single push. Every git command's exit status is checked.
+    """
+    def __init__(self, repo_dir, remote='origin'):
+        self.repo_dir = os.path.abspath(repo_dir)
+        self.remote = remote
+
+    def _git(self, *args, input=None):
+        result = subprocess.run(['git', *args], cwd=self.repo_dir, input=input, capture_output=True)
+        if result.returncode != 0:
+            raise GitError(f"git {args[0]} failed: {result.stderr.decode('utf-8', errors='replace').strip()}")
+        return result.stdout.decode('utf-8', errors='replace').strip()
+
+    def rev_parse(self, ref):
+        return self._git('rev-parse', '--verify', f"{ref}^{{commit}}")
+
+    def remote_sha(self, branch):
+        """Commit the remote's branch points to now, or '' if the remote has no such branch."""
+        output = self._git('ls-remote', '--heads', self.remote, f"refs/heads/{branch}")
+        return output.split()[0] if output else ''
+
+    def merge_base(self, a, b):
+        return self._git('merge-base', a, b)
+
+    def commit_many(self, requests):
+        """
+        Writes one commit per request (replacing the branch tip, so earlier checkpoint
+        commits on an agent branch are squashed away). Returns the new commit ids.
+        """
+        if not requests:
+            return []
+        committer = self._git('var', 'GIT_COMMITTER_IDENT').encode('utf-8')
+        stream = bytearray()
+        for request in requests:
+            stream += b"commit refs/heads/%s\n" % request.branch.encode('utf-8')
+            stream += b"committer " + committer + b"\n"
+            stream += _data(request.message.encode('utf-8'))
+            stream += b"from %s\n" % self.rev_parse(request.parent).encode('ascii')
+            for path in sorted(set(request.paths)):
+                full_path = os.path.join(request.workdir, path)
+                quoted = _quote(path).encode('utf-8')
+                if os.path.islink(full_path):
+                    # Stored as a link (also when it points to a directory), never followed
+                    target = os.readlink(os.fsencode(full_path))
+                    stream += b"M 120000 inline " + quoted + b"\n" + _data(target)
+                elif not os.path.lexists(full_path):
+                    stream += b"D " + quoted + b"\n"
+                elif os.path.isdir(full_path):
+                    # Not a blob; the files inside are listed on their own
+                    continue
+                else:
+                    # A file that cannot be read raises instead of being committed as deleted
+                    with open(full_path, 'rb') as f:
+                        content = f.read()
+                    mode = b'100755' if os.access(full_path, os.X_OK) else b'100644'
+                    stream += b"M " + mode + b" inline " + quoted + b"\n" + _data(content)
+            stream += b"\n"
+        stream += b"done\n"
+        # --force: agent branches are rewritten on purpose (squashing their checkpoints)
+        self._git('fast-import', '--quiet', '--done', '--force', input=bytes(stream))
+        return [self.rev_parse(f"refs/heads/{request.branch}") for request in requests]
+
+    def commit(self, branch, parent, workdir, paths, message):
+        return self.commit_many([CommitRequest(branch, parent, workdir, paths, message)])[0]
+
+    def push(self, branches, force=False, leases=None):
+        """
+        Pushes several branches to the remote in one 'git push'. `leases` maps a branch
+        to the sha this runner last pushed to it ('' if it never did): the branch may be
+        rewritten only while the remote still has that sha, so commits pushed by anyone
+        else are never overwritten.
+        """
+        if not branches:
+            return
+        leases = leases or {}
+        options = [f"--force-with-lease=refs/heads/{branch}:{leases[branch]}" for branch in branches if branch in leases]
+        prefix = '+' if force else ''
+        self._git('push', '--porcelain', *options, self.remote,
+                  *[f"{prefix}refs/heads/{branch}:refs/heads/{branch}" for branch in branches])
+
+    def publish(self, requests, leases=None):
+        """Commits every request and pushes all their branches together. Returns the commit ids."""
+        commits = self.commit_many(requests)
+        self.push([request.branch for request in requests], leases=leases)
+        return commits
@@ -0,0 +1,181 @@
+import os
+import re
+import json
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+
+class PollResult:
+    """Outcome of one poll: every open issue plus what changed since the previous poll."""
+    def __init__(self, issues, changed, removed, not_modified, error=None):
+        self.issues = issues
+        self.changed = changed
+        self.removed = removed
+        self.not_modified = not_modified
+        self.error = error
+
+class IssuePoller:
+    """
+    Polls the open issues with a label using conditional requests (ETag /
+    If-Modified-Since). Unchanged lists come back as 304, which GitHub does not
+    count against the rate limit. Issue metadata is cached on disk, new or edited
+    issues are found by comparing 'updated_at' with the cache, and next_interval()
+    adapts the polling delay to activity and to the rate-limit headers.
+    """
+    def __init__(self, repo_name, token=None, label='ai-agent', api_url='https://api.github.com',
+                 cache_path='.ai_cache/issues.json', min_interval=30, max_interval=300, timeout=30):
+        self.repo_name = repo_name
+        self.token = token
+        self.label = label
+        self.api_url = api_url.rstrip('/')
+        self.cache_path = cache_path
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.timeout = timeout
+
+        self.interval = min_interval
+        self.rate_limited_until = 0
+        self.server_poll_interval = 0
+        self.requests_made = 0
+        self.not_modified_count = 0
+
+        self.etag = None
+        self.last_modified = None
+        self.issues = {}
+        self._load_cache()
+
+    # --- Cache ---
+
+    def _load_cache(self):
+        if not self.cache_path or not os.path.exists(self.cache_path):
+            return
+        try:
+            with open(self.cache_path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return
+        self.etag = data.get('etag')
+        self.last_modified = data.get('last_modified')
+        self.issues = {int(number): issue for number, issue in data.get('issues', {}).items()}
+
+    def _save_cache(self):
+        if not self.cache_path:
+            return
+        folder = os.path.dirname(self.cache_path)
+        if folder:
+            os.makedirs(folder, exist_ok=True)
+        data = {'etag': self.etag, 'last_modified': self.last_modified,
+                'issues': {str(number): issue for number, issue in self.issues.items()}}
+        temp_path = self.cache_path + '.tmp'
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump(data, f)
+        os.replace(temp_path, self.cache_path)
+
+    # --- HTTP ---
+
+    def _request(self, url, conditional):
+        headers = {'Accept': 'application/vnd.github+json', 'User-Agent': 'ai-agent-runner'}
+        if self.token:
+            headers['Authorization'] = f'Bearer {self.token}'
+        if conditional:
+            if self.etag:
+                headers['If-None-Match'] = self.etag
+            if self.last_modified:
+                headers['If-Modified-Since'] = self.last_modified
+
+        self.requests_made += 1
+        request = urllib.request.Request(url, headers=headers)
+        try:
+            with urllib.request.urlopen(request, timeout=self.timeout) as response:
+                self._read_rate_limit(response.headers, response.status)
+                return response.status, response.headers, json.loads(response.read().decode('utf-8'))
+        except urllib.error.HTTPError as e:
+            self._read_rate_limit(e.headers, e.code)
+            if e.code == 304:
+                return 304, e.headers, None
+            raise
+
+    def _read_rate_limit(self, headers, status):
+        """Remembers when the rate limit (or the server's requested poll interval) allows the next poll."""
+        now = time.time()
+        poll_interval = headers.get('X-Poll-Interval')
+        if poll_interval:
+            self.server_poll_interval = int(poll_interval)
+
+        retry_after = headers.get('Retry-After')
+        remaining = headers.get('X-RateLimit-Remaining')
+        reset = headers.get('X-RateLimit-Reset')
+        if retry_after and status in (403, 429):
+            self.rate_limited_until = now + int(retry_after)
+        elif remaining is not None and int(remaining) == 0 and reset:
+            self.rate_limited_until = int(reset)
+
+    def _issues_url(self):
+        query = urllib.parse.urlencode({'state': 'open', 'labels': self.label, 'per_page': 100})
+        return f"{self.api_url}/repos/{self.repo_name}/issues?{query}"
+
+    # --- Polling ---
+
+    def poll(self):
+        """
+        Fetches the open issue list if it changed. Returns a PollResult; on network or
+        HTTP errors the cached issues are returned with `error` set and the interval backs off.
+        """
+        if time.time() < self.rate_limited_until:
+            return PollResult(dict(self.issues), [], [], True, error="rate limited")
+
+        try:
+            status, headers, page = self._request(self._issues_url(), conditional=True)
+            if status == 304:
+                self.not_modified_count += 1
+                self.interval = min(self.max_interval, self.interval * 1.5)
+                return PollResult(dict(self.issues), [], [], True)
+
+            etag = headers.get('ETag')
+            last_modified = headers.get('Last-Modified')
+            items = list(page)
+            next_url = _next_link(headers.get('Link'))
+            while next_url:
+                _, page_headers, page = self._request(next_url, conditional=False)
+                items.extend(page)
+                next_url = _next_link(page_headers.get('Link'))
+        except (urllib.error.URLError, OSError, ValueError) as e:
+            self.interval = min(self.max_interval, self.interval * 2)
+            return PollResult(dict(self.issues), [], [], True, error=str(e))
+
+        fresh = {}
+        for item in items:
+            fresh[item['number']] = {
+                'number': item['number'],
+                'title': item.get('title'),
+                'body': item.get('body'),
+                'updated_at': item.get('updated_at'),
+            }
+        changed = sorted(number for number, issue in fresh.items()
+                         if self.issues.get(number, {}).get('updated_at') != issue['updated_at'])
+        removed = sorted(set(self.issues) - set(fresh))
+
+        self.issues = fresh
+        self.etag = etag
+        self.last_modified = last_modified
+        self._save_cache()
+
+        if changed or removed:
+            self.interval = self.min_interval
+        else:
+            self.interval = min(self.max_interval, self.interval * 1.5)
+        return PollResult(dict(fresh), changed, removed, False)
+
+    def next_interval(self):
+        """Seconds to wait before the next poll."""
+        interval = max(self.interval, self.server_poll_interval)
+        wait_for_limit = self.rate_limited_until - time.time()
+        return max(interval, wait_for_limit)
+
+def _next_link(link_header):
+    """Extracts the rel="next" URL from a GitHub Link header."""
+    if not link_header:
+        return None
+    match = re.search(r'<([^>]+)>;\s*rel="next"', link_header)
+    return match.group(1) if match else None
@@ -0,0 +1,214 @@
+import os
+import re
+import ast
+import json
+import fnmatch
+import hashlib
+import subprocess
+from concurrent.futures import ThreadPoolExecutor
+
+IGNORED_DIRS = {'.git', '.worktrees', '.ai_cache', 'venv', 'env', '.venv', '__pycache__', 'node_modules'}
+
+def module_name_for(path):
+    """'app/game.py' -> 'app.game', 'app/__init__.py' -> 'app'."""
+    parts = path[:-3].replace('\\', '/').split('/')
+    if parts[-1] == '__init__':
+        parts = parts[:-1]
+    return '.'.join(parts)
+
+def imports_of(source, module_name, is_package, search_packages=()):
+    """
+    Every module name a file may import, including parent packages. Absolute imports
+    may also resolve inside search_packages: test runs put the test start dir on
+    sys.path, as discovery does, so 'import helpers' can be 'tests.helpers'.
+    """
+    names = set()
+    try:
+        tree = ast.parse(source)
+    except SyntaxError:
+        return names
+    package = module_name if is_package else module_name.rpartition('.')[0]
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Import):
+            targets = [alias.name for alias in node.names]
+        elif isinstance(node, ast.ImportFrom):
+            base = node.module or ''
+            if node.level:
+                anchor = package.split('.') if package else []
+                anchor = anchor[:len(anchor) - (node.level - 1)] if node.level > 1 else anchor
+                base = '.'.join(filter(None, ['.'.join(anchor), base]))
+            # 'from a.b import c' may import the module a.b.c
+            targets = [base] + [f"{base}.{alias.name}" if base else alias.name for alias in node.names]
+        else:
+            continue
+        if not getattr(node, 'level', 0):
+            targets += [f"{package}.{target}" for package in search_packages for target in targets if target]
+        for target in targets:
+            parts = target.split('.')
+            for i in range(1, len(parts) + 1):
+                names.add('.'.join(parts[:i]))
+    return names
+
+class ImportGraph:
+    """
+    Import edges between the Python modules of a project, refreshed incrementally:
+    only files whose content hash changed are re-parsed, and the result is cached on disk.
+    """
+    def __init__(self, root, cache_path=None, start_dir='tests'):
+        self.root = os.path.abspath(root)
+        self.cache_path = cache_path
+        # Package of the test start dir, where bare imports of test modules may resolve
+        self.start_package = start_dir.strip('./').replace('\\', '/').replace('/', '.')
+        self.modules = {}
+        self.parsed_files = 0
+        if cache_path and os.path.exists(cache_path):
+            try:
+                with open(cache_path, 'r', encoding='utf-8') as f:
+                    self.modules = json.load(f)
+            except (OSError, ValueError):
+                self.modules = {}
+
+    def python_files(self):
+        """Relative paths of the project's .py files."""
+        for folder, dirs, files in os.walk(self.root):
+            dirs[:] = [d for d in dirs if d not in IGNORED_DIRS and not d.startswith('.')]
+            for name in files:
+                if name.endswith('.py'):
+                    yield os.path.relpath(os.path.join(folder, name), self.root).replace(os.sep, '/')
+
+    def refresh(self):
+        """Brings the graph up to date with the files on disk."""
+        fresh = {}
+        for path in self.python_files():
+            with open(os.path.join(self.root, path), 'rb') as f:
+                content = f.read()
+            digest = hashlib.sha256(content).hexdigest()
+            name = module_name_for(path)
+            cached = self.modules.get(name)
+            if cached and cached['hash'] == digest and cached['path'] == path and cached.get('start') == self.start_package:
+                fresh[name] = cached
+                continue
+            self.parsed_files += 1
+            imports = imports_of(content.decode('utf-8', errors='replace'), name, path.endswith('__init__.py'),
+                                 [self.start_package] if self.start_package else [])
+            fresh[name] = {'path': path, 'hash': digest, 'start': self.start_package, 'imports': sorted(imports)}
+        self.modules = fresh
+        if self.cache_path:
+            os.makedirs(os.path.dirname(self.cache_path) or '.', exist_ok=True)
+            with open(self.cache_path, 'w', encoding='utf-8') as f:
+                json.dump(self.modules, f)
+        return self
+
+    def dependents(self, module_names):
+        """Modules that import any of module_names, directly or transitively (including themselves)."""
+        reverse = {}
+        for name, info in self.modules.items():
+            for imported in info['imports']:
+                reverse.setdefault(imported, set()).add(name)
+        affected = set(module_names)
+        pending = list(module_names)
+        while pending:
+            for importer in reverse.get(pending.pop(), ()):
+                if importer not in affected:
+                    affected.add(importer)
+                    pending.append(importer)
+        return affected
+
+def changed_files(workdir, base_branch='main'):
+    """Files changed in a worktree relative to the base branch, including untracked ones."""
+    def git(*args):
+        result = subprocess.run(['git', *args], cwd=workdir, capture_output=True, text=True)
+        return result.stdout.split('\n') if result.returncode == 0 else []
+    files = set(git('diff', '--name-only', base_branch)) | set(git('ls-files', '--others', '--exclude-standard'))
+    return sorted(f for f in files if f)
+
+def find_test_modules(graph, start_dir='tests', pattern='test_*.py', names=None):
+    """
+    {dotted name: file size} of the test modules in an import graph, only among
+    `names` if given. The sizes let shard() balance shards by amount of test code.
+    """
+    start = start_dir.strip('./').replace('\\', '/')
+    found = {}
+    for name in sorted(graph.modules if names is None else names):
+        info = graph.modules.get(name)
+        if info is None:
+            continue
+        path = info['path']
+        in_start_dir = not start or path.startswith(start + '/')
+        if in_start_dir and fnmatch.fnmatch(os.path.basename(path), pattern):
+            try:
+                found[name] = os.path.getsize(os.path.join(graph.root, path))
+            except OSError:
+                found[name] = 1
+    return found
+
+def select_tests(workdir, changed, start_dir='tests', pattern='test_*.py', cache_path=None, graph=None):
+    """
+    Returns the dotted names of the test modules affected by the changed files,
+    or None when a full run is needed (non-Python files changed, e.g. requirements.txt).
+    """
+    if any(not path.endswith('.py') for path in changed):
+        return None
+
+    graph = graph or ImportGraph(workdir, cache_path, start_dir).refresh()
+    affected = graph.dependents({module_name_for(path) for path in changed})
+    return sorted(find_test_modules(graph, start_dir, pattern, affected))
+
+def shard(test_modules, count, sizes=None):
+    """Splits test modules into up to `count` shards, balancing by size (largest first)."""
+    sizes = sizes or {}
+    shards = [[] for _ in range(max(1, min(count, len(test_modules))))]
+    totals = [0] * len(shards)
+    for name in sorted(test_modules, key=lambda name: -sizes.get(name, 1)):
+        index = totals.index(min(totals))
+        shards[index].append(name)
+        totals[index] += sizes.get(name, 1)
+    return [sorted(s) for s in shards if s]
+
+def merge_results(results):
+    """Combines (returncode, output) pairs of several shards into one."""
+    returncode = 0
+    ran = 0
+    failures = 0
+    errors = 0
+    outputs = []
+    for index, (code, output) in enumerate(results, 1):
+        if code != 0:
+            returncode = code
+        match = re.search(r'Ran (\d+) tests?', output)
+        if match:
+            ran += int(match.group(1))
+        match = re.search(r'FAILED \(([^)]*)\)', output)
+        if match:
+            failures += _count('failures', match.group(1))
+            errors += _count('errors', match.group(1))
+        outputs.append(f"=== Shard {index}/{len(results)} ===\n{output}")
+    summary = f"Ran {ran} tests in {len(results)} shards: "
+    summary += "OK" if returncode == 0 else f"FAILED (failures={failures}, errors={errors})"
+    return returncode, "\n".join(outputs + [summary])
+
+def _count(label, text):
+    match = re.search(rf'{label}=(\d+)', text)
+    return int(match.group(1)) if match else 0
+
+def run_sharded(runner, workdir, test_modules, shards=None, sizes=None, log=None):
+    """
+    Runs the selected test modules in parallel shards on a test runner and merges the results.
+    With a LogDigest, each shard streams its output into its own stream of that log; the
+    output returned is then empty, since the digest holds the counts and failures.
+    """
+    shards = shards or os.cpu_count() or 1
+    groups = shard(test_modules, shards, sizes)
+    if not groups:
+        return 0, "No affected tests."
+
+    def run(indexed_group):
+        index, group = indexed_group
+        on_output = log.stream(f"shard {index}").feed if log is not None else None
+        return runner.run(workdir, tests=group, on_output=on_output)
+
+    with ThreadPoolExecutor(max_workers=len(groups)) as executor:
+        results = list(executor.map(run, enumerate(groups, 1)))
+    if log is not None:
+        return next((code for code, _ in results if code != 0), 0), ''
+    return merge_results(results)
@@ -0,0 +1,57 @@
+import json
+import math
+from collections import deque
+
+class LatencyStats:
+    """
+    Rolling latency histograms for named metrics (e.g. 'engine', 'update_gui', 'total').
+    Keeps the last `window` samples per metric and reports percentiles in milliseconds.
+    """
+    PERCENTILES = (50, 95, 99)
+
+    def __init__(self, window=1000):
+        self.window = window
+        self.samples = {}
+        self.counts = {}
+
+    def record(self, metric, seconds):
+        """Adds one sample, in seconds, to a metric."""
+        if metric not in self.samples:
+            self.samples[metric] = deque(maxlen=self.window)
+            self.counts[metric] = 0
+        self.samples[metric].append(seconds)
+        self.counts[metric] += 1
+
+    def percentile(self, metric, pct):
+        """Returns the pct-th percentile (nearest rank) of a metric in milliseconds, or None."""
+        values = sorted(self.samples.get(metric, ()))
+        if not values:
+            return None
+        rank = max(1, math.ceil(pct / 100 * len(values)))
+        return values[rank - 1] * 1000
+
+    def summary(self):
+        """Returns {metric: {'count', 'p50', 'p95', 'p99', 'max'}} with times in milliseconds."""
+        result = {}
+        for metric, values in self.samples.items():
+            entry = {'count': self.counts[metric]}
+            for pct in self.PERCENTILES:
+                entry[f'p{pct}'] = round(self.percentile(metric, pct), 3)
+            entry['max'] = round(max(values) * 1000, 3)
+            result[metric] = entry
+        return result
+
+    def format_summary(self):
+        """Returns a short multi-line text version of summary() for on-screen display."""
+        lines = []
+        for metric, entry in self.summary().items():
+            lines.append(f"{metric}: p50 {entry['p50']:.1f}  p95 {entry['p95']:.1f}  "
+                         f"p99 {entry['p99']:.1f} ms  (n={entry['count']})")
+        return "\n".join(lines) if lines else "No interactions recorded yet"
+
+def export_json(path, stats_by_name):
+    """Writes the summaries of several LatencyStats (e.g. one per board size) to a JSON file."""
+    data = {name: stats.summary() for name, stats in stats_by_name.items()}
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, indent=2)
+    return data
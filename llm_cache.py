@@ -0,0 +1,153 @@
+import os
+import pickle
+import hashlib
+import threading
+from impact_selection import IGNORED_DIRS
+
+class FileHasher:
+    """Content hashes of the files the agent tools can see, re-read only when size or mtime changes."""
+    def __init__(self):
+        self.known = {}
+        self.lock = threading.Lock()
+
+    def _file_hash(self, path):
+        stat = os.stat(path)
+        signature = (stat.st_size, stat.st_mtime_ns)
+        with self.lock:
+            known = self.known.get(path)
+        if known and known[0] == signature:
+            return known[1]
+        with open(path, 'rb') as f:
+            digest = hashlib.sha256(f.read()).hexdigest()
+        with self.lock:
+            self.known[path] = (signature, digest)
+        return digest
+
+    def file_hashes(self, root):
+        """{relative path: sha256} for every visible file under root."""
+        hashes = {}
+        for folder, dirs, files in os.walk(root):
+            dirs[:] = [d for d in dirs if d not in IGNORED_DIRS and not d.startswith('.')]
+            for name in files:
+                path = os.path.join(folder, name)
+                try:
+                    hashes[os.path.relpath(path, root).replace(os.sep, '/')] = self._file_hash(path)
+                except OSError:
+                    continue
+        return hashes
+
+def cache_key(model, temperature, prompt, file_hashes=None):
+    """Content address of one call: same model, temperature, prompt and project files -> same key."""
+    digest = hashlib.sha256()
+    for part in (str(model), repr(temperature), prompt):
+        digest.update(part.encode('utf-8'))
+        digest.update(b'\0')
+    for path, file_hash in sorted((file_hashes or {}).items()):
+        digest.update(f"{path}\0{file_hash}\0".encode('utf-8'))
+    return digest.hexdigest()
+
+class LLMCache:
+    """
+    Content-addressed on-disk cache of model responses, shared by every crew run,
+    retry and restart. Entries are files named by their key; the least recently
+    used ones are evicted once the cache grows beyond max_bytes.
+    """
+    def __init__(self, cache_dir='.ai_cache/llm', max_bytes=256 * 1024 * 1024):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.hasher = FileHasher()
+        self.lock = threading.Lock()
+        # key -> [size, last use]; last use starts as the file mtime so LRU order survives restarts
+        self.entries = {}
+        self.total_bytes = 0
+        self._tick = 0
+        self._load_index()
+
+    def _load_index(self):
+        if not os.path.isdir(self.cache_dir):
+            return
+        found = []
+        for name in os.listdir(self.cache_dir):
+            if name.endswith('.pkl'):
+                stat = os.stat(os.path.join(self.cache_dir, name))
+                found.append((stat.st_mtime_ns, name[:-4], stat.st_size))
+        for _, key, size in sorted(found):
+            self._tick += 1
+            self.entries[key] = [size, self._tick]
+            self.total_bytes += size
+
+    def _path(self, key):
+        return os.path.join(self.cache_dir, f"{key}.pkl")
+
+    def get(self, key):
+        """Cached value for key, or None."""
+        with self.lock:
+            if key not in self.entries:
+                self.misses += 1
+                return None
+            try:
+                with open(self._path(key), 'rb') as f:
+                    value = pickle.load(f)
+            except (OSError, pickle.PickleError, EOFError):
+                self._forget(key)
+                self.misses += 1
+                return None
+            self.hits += 1
+            self._tick += 1
+            self.entries[key][1] = self._tick
+            os.utime(self._path(key))
+            return value
+
+    def put(self, key, value):
+        """Stores value under key and evicts least recently used entries beyond max_bytes."""
+        data = pickle.dumps(value)
+        with self.lock:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            temp_path = self._path(key) + '.tmp'
+            with open(temp_path, 'wb') as f:
+                f.write(data)
+            os.replace(temp_path, self._path(key))
+            if key in self.entries:
+                self.total_bytes -= self.entries[key][0]
+            self._tick += 1
+            self.entries[key] = [len(data), self._tick]
+            self.total_bytes += len(data)
+            self._evict()
+
+    def _forget(self, key):
+        size, _ = self.entries.pop(key)
+        self.total_bytes -= size
+        try:
+            os.remove(self._path(key))
+        except OSError:
+            pass
+
+    def _evict(self):
+        while self.total_bytes > self.max_bytes and len(self.entries) > 1:
+            oldest = min(self.entries, key=lambda key: self.entries[key][1])
+            self._forget(oldest)
+            self.evictions += 1
+
+    def clear(self):
+        with self.lock:
+            for key in list(self.entries):
+                self._forget(key)
+
+    def stats(self):
+        with self.lock:
+            lookups = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / lookups if lookups else 0.0,
+                'entries': len(self.entries),
+                'bytes': self.total_bytes,
+                'evictions': self.evictions,
+            }
+
+    def key_for(self, model, temperature, prompt, root=None):
+        file_hashes = self.hasher.file_hashes(root) if root else None
+        return cache_key(model, temperature, prompt, file_hashes)
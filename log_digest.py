@@ -0,0 +1,174 @@
+import os
+import re
+import threading
+from collections import deque
+
+SEPARATOR_BLOCK = '=' * 70
+SEPARATOR_LINE = '-' * 70
+# 'test_x (module.Class.test_x) ... FAIL' as printed by a verbose run, when a test finishes
+PROGRESS_FAILURE = re.compile(r'\.\.\. (FAIL|ERROR)$')
+ADDRESS = re.compile(r'0x[0-9a-fA-F]+')
+
+class _Failure:
+    """One FAIL/ERROR block of the unittest report."""
+    def __init__(self, kind, test):
+        self.kind = kind
+        self.test = test
+        self.lines = deque(maxlen=200)
+
+    def signature(self):
+        """Failures with the same last frame and exception type share a traceback."""
+        frames = [line.strip() for line in self.lines if line.lstrip().startswith('File "')]
+        exception = next((line for line in reversed(self.lines) if line.strip() and not line.startswith(' ')), '')
+        return self.kind, frames[-1] if frames else '', ADDRESS.sub('0x?', exception.split(':')[0])
+
+    def compact(self, frames=3, message_lines=6):
+        """Traceback header, the last frames and the exception message."""
+        lines = [line for line in self.lines if line.strip()]
+        frame_starts = [i for i, line in enumerate(lines) if line.lstrip().startswith('File "')]
+        if not frame_starts:
+            return lines[-message_lines:]
+        message_start = frame_starts[-1] + 1
+        while message_start < len(lines) and lines[message_start].startswith('    '):
+            message_start += 1
+        kept = lines[frame_starts[-frames] if len(frame_starts) >= frames else frame_starts[0]:message_start]
+        header = ["Traceback (most recent call last):"]
+        if len(frame_starts) > frames:
+            header.append(f"  ... {len(frame_starts) - frames} earlier frames omitted")
+        message = lines[message_start:message_start + message_lines]
+        if len(lines) - message_start > message_lines:
+            message.append("  ...")
+        return header + kept + message
+
+class _LogStream:
+    """Parses the output of one test process, line by line, as it arrives."""
+    def __init__(self, digest, name):
+        self.digest = digest
+        self.name = name
+        self.failures = []
+        self.failed_progress = 0
+        self.ran = 0
+        self.tail = deque(maxlen=30)
+        self._current = None
+        self._expect_header = False
+        self._in_summary = False
+
+    def feed(self, line):
+        """Takes one line of output. Returns True once the failure limit is reached (the run can stop)."""
+        line = line.rstrip('\n')
+        self.digest._write_raw(self.name, line)
+        self.tail.append(line)
+
+        if line == SEPARATOR_BLOCK:
+            self._current = None
+            self._expect_header = True
+        elif self._expect_header:
+            self._expect_header = False
+            kind, _, test = line.partition(': ')
+            if kind in ('FAIL', 'ERROR'):
+                self._current = _Failure(kind, test)
+                self.failures.append(self._current)
+        elif line == SEPARATOR_LINE:
+            if self._current is not None and self._current.lines:
+                # Separator closing the last block: the run summary follows
+                self._current = None
+                self._in_summary = True
+        elif line.startswith('Ran ') and (self._in_summary or self._current is None):
+            match = re.match(r'Ran (\d+) tests?', line)
+            if match:
+                self.ran = int(match.group(1))
+        elif self._current is not None:
+            self._current.lines.append(line)
+        elif PROGRESS_FAILURE.search(line) or line in ('FAIL', 'ERROR'):
+            self.failed_progress += 1
+        return self.digest.limit_reached()
+
+class LogDigest:
+    """
+    Streaming capture of unittest output for fix prompts. The raw log goes to disk
+    as it arrives; in memory only the failure blocks are kept, and digest() returns
+    a size-bounded summary with repeated tracebacks collapsed. Several processes
+    (e.g. test shards) feed their own stream; the failure limit is shared.
+    """
+    def __init__(self, max_failures=5, max_chars=6000, raw_log_path=None):
+        self.max_failures = max_failures
+        self.max_chars = max_chars
+        self.raw_log_path = raw_log_path
+        self.lock = threading.Lock()
+        self.streams = []
+        self._raw = None
+        if raw_log_path:
+            os.makedirs(os.path.dirname(raw_log_path) or '.', exist_ok=True)
+            self._raw = open(raw_log_path, 'w', encoding='utf-8', errors='replace')
+
+    def stream(self, name=None):
+        """A parser for the output of one more test process."""
+        stream = _LogStream(self, name)
+        with self.lock:
+            self.streams.append(stream)
+        return stream
+
+    def feed(self, line):
+        """Feeds the default stream (single-process runs)."""
+        if not self.streams:
+            self.stream()
+        return self.streams[0].feed(line)
+
+    def _write_raw(self, name, line):
+        if self._raw is not None:
+            with self.lock:
+                self._raw.write(f"[{name}] {line}\n" if name else line + "\n")
+
+    def failure_count(self):
+        return sum(max(stream.failed_progress, len(stream.failures)) for stream in self.streams)
+
+    def limit_reached(self):
+        return bool(self.max_failures) and self.failure_count() >= self.max_failures
+
+    def close(self):
+        if self._raw is not None:
+            self._raw.close()
+            self._raw = None
+
+    def digest(self):
+        """Compact failure report: counts, then each distinct traceback once with the tests that hit it."""
+        groups = {}
+        for stream in self.streams:
+            for failure in stream.failures:
+                groups.setdefault(failure.signature(), []).append(failure)
+
+        ran = sum(stream.ran for stream in self.streams)
+        failed = sum(len(stream.failures) for stream in self.streams)
+        if failed:
+            header = f"Ran {ran} tests: {failed} failed"
+        elif ran:
+            header = f"Ran {ran} tests: OK"
+        else:
+            header = "No unittest summary in the output"
+        if self.limit_reached():
+            header += f" (stopped after {self.max_failures} failures)"
+        lines = [header]
+        if self.raw_log_path:
+            lines.append(f"Full log: {self.raw_log_path}")
+
+        if ran == 0 and failed == 0:
+            # No unittest report (import error, crash, timeout): show the end of the output
+            lines.append("")
+            lines.append("Last output:")
+            for stream in self.streams:
+                lines.extend(stream.tail)
+
+        text = "\n".join(lines)
+        shown = 0
+        for failures in groups.values():
+            tests = [failure.test for failure in failures]
+            names = ", ".join(tests[:3]) + (f" (+{len(tests) - 3} more)" if len(tests) > 3 else "")
+            count = f" x{len(tests)}" if len(tests) > 1 else ""
+            block = f"\n\n[{failures[0].kind}{count}] {names}\n" + "\n".join(failures[0].compact())
+            if len(text) + len(block) > self.max_chars:
+                break
+            text += block
+            shown += 1
+        if shown < len(groups):
+            text += f"\n\n({len(groups) - shown} more distinct failures omitted; see the full log)"
+        return text[:self.max_chars]
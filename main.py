@@ -4,6 +4,8 @@ import os
 import time
 import subprocess
 import json
+import threading
+from typing import Any
 
 # --- ⚠️ PARCHE CRÍTICO PARA WINDOWS ⚠️ ---
 if sys.platform.startswith('win'):
@@ -21,11 +23,22 @@ if sys.platform.startswith('win'):
 
 # --- IMPORTACIONES ---
 from github import Github
-from crewai import Agent, Task, Crew, Process
-from langchain_google_genai import ChatGoogleGenerativeAI, HarmBlockThreshold, HarmCategory
+from crewai import Agent, Task, Crew, Process, LLM
 from dotenv import load_dotenv
 from crewai_tools import FileWriterTool, FileReadTool
 from crewai.tools import BaseTool
+from agent_scheduler import IssueScheduler, WorktreeManager, branch_name_for, resolve_in_root
+from github_poller import IssuePoller
+from runner_service import create_test_runner
+from impact_selection import ImportGraph, changed_files, find_test_modules, select_tests, run_sharded
+from llm_cache import LLMCache
+from crew_llm import LLMGateway, GatewayLLM
+from rate_scheduler import RateScheduler, FIX_PRIORITY
+from pipeline_metrics import PipelineMetrics
+from project_index import ProjectIndex
+from log_digest import LogDigest
+from work_journal import WorkJournal
+from git_ops import GitOps, TouchedFiles
 
 load_dotenv()
 
@@ -35,6 +48,21 @@ os.environ["OPENAI_API_KEY"] = "NA"
 # --- CONFIGURACIÓN ---
 GITHUB_TOKEN = os.getenv("GITHUB_TOKEN")
 REPO_NAME = os.getenv("GITHUB_REPO_NAME") 
+# Issues worked on at the same time, each in its own git worktree
+MAX_CONCURRENT_ISSUES = int(os.getenv("AI_MAX_CONCURRENT_ISSUES", "2"))
+BASE_BRANCH = "main"
+# 'docker': contenedor persistente por hash de requirements.txt / 'local': proceso local equivalente
+TEST_RUNNER = os.getenv("AI_TEST_RUNNER", "docker")
+# Shards en paralelo para los tests afectados por un cambio
+TEST_SHARDS = int(os.getenv("AI_TEST_SHARDS", str(os.cpu_count() or 1)))
+IMPORT_GRAPH_CACHE = os.path.join(os.getcwd(), '.ai_cache', 'import_graph')
+# Resumen de fallos para el prompt de corrección; el log completo queda en disco
+TEST_LOGS_DIR = os.path.join(os.getcwd(), '.ai_cache', 'test_logs')
+TEST_FAILURE_LIMIT = int(os.getenv("AI_TEST_FAILURE_LIMIT", "5"))
+TEST_DIGEST_CHARS = int(os.getenv("AI_TEST_DIGEST_CHARS", "6000"))
+# Intentos de abrir la PR antes de dar la issue por fallida; la espera se duplica en cada uno
+PR_ATTEMPTS = int(os.getenv("AI_PR_ATTEMPTS", "3"))
+PR_RETRY_DELAY = int(os.getenv("AI_PR_RETRY_DELAY", "60"))
 
 if not GITHUB_TOKEN or not REPO_NAME:
     print("❌ ERROR: Faltan variables en .env")
@@ -43,30 +71,44 @@ if not GITHUB_TOKEN or not REPO_NAME:
 g = Github(GITHUB_TOKEN)
 
 # --- CONFIGURACIÓN DE MODELOS ---
-safety_settings = {
-    HarmCategory.HARM_CATEGORY_DANGEROUS_CONTENT: HarmBlockThreshold.BLOCK_NONE,
-    HarmCategory.HARM_CATEGORY_HATE_SPEECH: HarmBlockThreshold.BLOCK_NONE,
-    HarmCategory.HARM_CATEGORY_HARASSMENT: HarmBlockThreshold.BLOCK_NONE,
-    HarmCategory.HARM_CATEGORY_SEXUALLY_EXPLICIT: HarmBlockThreshold.BLOCK_NONE,
-}
-
-llm_pro = ChatGoogleGenerativeAI(
-    model="gemini-1.5-pro-latest",
-    verbose=True,
-    temperature=0.2,
-    google_api_key=os.getenv("GOOGLE_API_KEY"),
-    max_retries=5,
-    safety_settings=safety_settings
-)
-
-llm_flash = ChatGoogleGenerativeAI(
-    model="gemini-1.5-flash-latest",
-    verbose=True,
-    temperature=0.1,
-    google_api_key=os.getenv("GOOGLE_API_KEY"),
-    max_retries=10,
-    safety_settings=safety_settings
-)
+# Respuestas cacheadas en disco por modelo, temperatura, prompt y hashes de los ficheros del worktree:
+# repetir una issue sin cambios no vuelve a llamar a la API
+llm_cache = LLMCache(os.path.join(os.getcwd(), '.ai_cache', 'llm'),
+                     max_bytes=int(os.getenv("AI_LLM_CACHE_MB", "256")) * 1024 * 1024)
+
+# Cuota de peticiones por minuto compartida por todos los agentes y crews en paralelo
+PRO_MODEL = "gemini-1.5-pro-latest"
+FLASH_MODEL = "gemini-1.5-flash-latest"
+rate_scheduler = RateScheduler({
+    PRO_MODEL: int(os.getenv("AI_PRO_RPM", "5")),
+    FLASH_MODEL: int(os.getenv("AI_FLASH_RPM", "50")),
+})
+
+# Spans por etapa (JSON lines + Prometheus); resumen: python pipeline_metrics.py report
+metrics = PipelineMetrics(os.path.join(os.getcwd(), '.ai_cache', 'metrics', 'spans.jsonl'),
+                          os.path.join(os.getcwd(), '.ai_cache', 'metrics', 'metrics.prom'))
+
+def build_llms(root):
+    """
+    Modelos pro y flash para CrewAI. Cada llamada de los agentes pasa por un LLMGateway:
+    la caché incluye los ficheros visibles en el worktree 'root', la cuota por minuto
+    se comparte entre todas las issues y la latencia y los tokens van a los spans abiertos.
+    """
+    gateway = LLMGateway(llm_cache, root, rate_scheduler, metrics)
+    # Sin max_retries propio: CrewAI solo reintenta los errores de cuota (3 intentos como máximo,
+    # con espera creciente) alrededor de GatewayLLM.call, y cada reintento vuelve a pedir turno
+    # al rate_scheduler, así que un error de cuota no provoca un bucle de reintentos a ciegas
+    llm_pro = LLM(
+        model=f"gemini/{PRO_MODEL}",
+        temperature=0.2,
+        api_key=os.getenv("GOOGLE_API_KEY")
+    )
+    llm_flash = LLM(
+        model=f"gemini/{FLASH_MODEL}",
+        temperature=0.1,
+        api_key=os.getenv("GOOGLE_API_KEY")
+    )
+    return GatewayLLM.wrap(llm_pro, gateway), GatewayLLM.wrap(llm_flash, gateway)
 
 # --- CARGA DE AGENTES ---
 def load_agents_config():
@@ -104,9 +146,15 @@ ensure_git_protection()
 
 # --- HERRAMIENTAS PERSONALIZADAS ---
 
+# Cada issue trabaja en su propio worktree: las herramientas reciben 'root' y
+# resuelven todas las rutas dentro de él.
+
 class UTF8FileWriterTool(FileWriterTool):
     name: str = "Save File UTF-8"
     description: str = "Saves content to a file. You can specify the directory separately. Input: filename, content, directory (optional)."
+    root: str = "."
+    # Ficheros escritos por los agentes: solo esos entran en el commit de la PR
+    touched: Any = None
     
     def _run(self, filename: str, content: str, directory: str = None, **kwargs) -> str:
         forbidden_files = ['main.py', '.env', 'agents.json', 'Procfile', 'Dockerfile', '.gitignore']
@@ -121,6 +169,11 @@ class UTF8FileWriterTool(FileWriterTool):
         if clean_name in forbidden_files:
             return f"❌ SECURITY ERROR: Modification of '{clean_name}' is forbidden."
 
+        relative_path = file_path
+        file_path = resolve_in_root(self.root, relative_path)
+        if file_path is None:
+            return f"❌ SECURITY ERROR: '{relative_path}' is outside the project."
+
         try:
             target_folder = os.path.dirname(file_path)
             if target_folder and not os.path.exists(target_folder):
@@ -132,7 +185,9 @@ class UTF8FileWriterTool(FileWriterTool):
             
             with open(file_path, 'w', encoding='utf-8') as f:
                 f.write(content)
-            return f"File {file_path} saved successfully."
+            if self.touched is not None:
+                self.touched.add(file_path)
+            return f"File {relative_path} saved successfully."
             
         except Exception as e:
             return f"Error saving: {e}"
@@ -140,6 +195,8 @@ class UTF8FileWriterTool(FileWriterTool):
 class FileDeleteTool(BaseTool):
     name: str = "Delete File"
     description: str = "PERMANENTLY deletes one or multiple files. Input: 'file1.py' or 'file1.py, file2.py'."
+    root: str = "."
+    touched: Any = None
     
     def _run(self, file_path: str) -> str:
         forbidden_files = ['main.py', '.env', 'agents.json', '.git', 'requirements.txt', '.gitignore']
@@ -153,109 +210,232 @@ class FileDeleteTool(BaseTool):
             if clean_name in forbidden_files or '.git' in current_file:
                 results.append(f"❌ SECURITY ERROR: Deletion of '{clean_name}' is strictly forbidden.")
                 continue
+
+            full_path = resolve_in_root(self.root, current_file)
+            if full_path is None:
+                results.append(f"❌ SECURITY ERROR: '{current_file}' is outside the project.")
+                continue
             
-            if not os.path.exists(current_file):
+            if not os.path.exists(full_path):
                 results.append(f"⚠️ File {current_file} does not exist.")
                 continue
                 
             try:
-                os.remove(current_file)
+                os.remove(full_path)
+                if self.touched is not None:
+                    self.touched.add(full_path)
                 results.append(f"🗑️ File {current_file} DELETED.")
             except Exception as e:
                 results.append(f"❌ Error deleting {current_file}: {e}")
 
         return "\n".join(results)
 
+class ProjectFileReadTool(FileReadTool):
+    """FileReadTool que lee rutas relativas al worktree de la issue."""
+    root: str = "."
+
+    def _run(self, **kwargs) -> str:
+        file_path = kwargs.get('file_path') or self.file_path
+        full_path = resolve_in_root(self.root, file_path or '')
+        if full_path is None:
+            return f"❌ SECURITY ERROR: '{file_path}' is outside the project."
+        kwargs['file_path'] = full_path
+        return super()._run(**kwargs)
+
+# Ficheros que los agentes no deben ver en los listados
+HIDDEN_FILES = {'main.py', '.env', 'agents.json', '.gitignore'}
+
 class SmartFileLister(FileReadTool):
     name: str = "List Project Files"
-    description: str = "Lists relevant files. IMPORTANT: Provide dummy argument file_path='.'."
+    description: str = "Lists all project files (recursively, with sizes). IMPORTANT: Provide dummy argument file_path='.'."
+    root: str = "."
+    index: Any = None
 
     def _run(self, file_path: str = '.', **kwargs) -> str:
-        ignored_folders = {'.git', 'venv', 'env', '__pycache__', '.idea', '.vscode', 'git'}
-        hidden_files = {'main.py', '.env', 'agents.json', '.gitignore'}
-
-        files = []
         try:
-            for item in os.listdir('.'):
-                if (item not in ignored_folders) and (item not in hidden_files) and (not item.startswith('.')):
-                    files.append(item)
-            
-            if not files:
-                return "Directory is empty (New Project)."
-            return "\n".join(files)
+            return self.index.refresh().tree(hidden=HIDDEN_FILES)
         except Exception as e:
             return f"Error listing files: {str(e)}"
 
-# Instancias
-file_writer = UTF8FileWriterTool()
-file_reader = FileReadTool()
-file_deleter = FileDeleteTool()
-smart_directory_reader = SmartFileLister()
+class ProjectIndexTool(BaseTool):
+    name: str = "Project Index"
+    description: str = (
+        "Answers questions about the code WITHOUT reading whole files. Input 'query', one of: "
+        "'tree' (all files with sizes), 'outline app/game.py' (docstring, classes, methods, functions, imports; "
+        "several paths separated by commas), 'find Name' (where a class/function/method is defined), "
+        "'importers app.game' (files that import a module). Read a file only when you need its full code."
+    )
+    index: Any = None
+
+    def _run(self, query: str) -> str:
+        try:
+            return self.index.query(query, hidden=HIDDEN_FILES)
+        except Exception as e:
+            return f"Error querying the project index: {e}"
+
+def build_tools(root, touched=None):
+    """Instancias de herramientas limitadas al worktree 'root'; 'touched' recoge los ficheros modificados."""
+    # Índice incremental del worktree (árbol, símbolos, imports), persistido entre ejecuciones
+    index = ProjectIndex(root, os.path.join(os.getcwd(), '.ai_cache', 'project_index',
+                                            f"{os.path.basename(os.path.abspath(root))}.json"))
+    return {
+        'file_writer': UTF8FileWriterTool(root=root, touched=touched),
+        'file_reader': ProjectFileReadTool(root=root),
+        'file_deleter': FileDeleteTool(root=root, touched=touched),
+        'smart_directory_reader': SmartFileLister(root=root, index=index),
+        'project_index': ProjectIndexTool(index=index),
+    }
+
+worktrees = WorktreeManager(os.getcwd(), base_branch=BASE_BRANCH)
+# Commit y push de las ramas con comprobación de errores (un solo 'git fast-import' por lote)
+git_ops = GitOps(os.getcwd())
+# Runner de tests caliente: las dependencias se instalan una vez por hash de requirements.txt
+test_runner = create_test_runner(TEST_RUNNER, os.getcwd())
+# Crear PRs toca el repo remoto y la API de GitHub: una a la vez
+pr_lock = threading.Lock()
+# Etapas completadas por issue: tras un reinicio se reanuda desde la última
+journal = WorkJournal(os.path.join(os.getcwd(), '.ai_cache', 'journal.jsonl'))
 
 # --- FUNCIONES AUXILIARES ---
 
+# Sondeo condicional (ETag) con caché en disco: una lista sin cambios cuesta un 304
+issue_poller = IssuePoller(REPO_NAME, GITHUB_TOKEN, label='ai-agent')
+# Objetos Issue de PyGithub ya pedidos, por número
+issue_objects = {}
+# Issues terminadas que siguen en la lista hasta que GitHub refleje el cambio de etiqueta
+finished_issues = set()
+# Issues cuya PR falló: número -> momento a partir del cual se reintenta
+pr_retry_at = {}
+_repo = None
+
+def get_repo():
+    global _repo
+    if _repo is None:
+        _repo = g.get_repo(REPO_NAME)
+    return _repo
+
 def get_ai_tasks():
-    try:
-        repo = g.get_repo(REPO_NAME)
-        issues = repo.get_issues(state='open', labels=['ai-agent'])
-        return issues
-    except Exception as e:
-        print(f"⚠️ Error leyendo issues: {e}")
-        return []
+    result = issue_poller.poll()
+    if result.error:
+        print(f"⚠️ Error leyendo issues: {result.error}")
+
+    for number in result.removed:
+        issue_objects.pop(number, None)
+        finished_issues.discard(number)
+
+    tasks = []
+    for number in sorted(result.issues):
+        if number in finished_issues or pr_retry_at.get(number, 0) > time.time():
+            continue
+        try:
+            # Solo se piden a la API las issues nuevas o modificadas
+            if number not in issue_objects or number in result.changed:
+                issue_objects[number] = get_repo().get_issue(number)
+        except Exception as e:
+            print(f"⚠️ Error leyendo issue #{number}: {e}")
+            continue
+        tasks.append(issue_objects[number])
+    return tasks
 
-def create_pull_request(issue_number, issue_title):
+def create_pull_request(issue_number, issue_title, workdir, touched):
+    """Commitea los ficheros tocados por los agentes en la rama de la issue, la sube y abre la PR."""
     print(f"🚀 Creando Pull Request para Issue #{issue_number}...")
+    with pr_lock, metrics.span('pull_request'):
+        try:
+            branch_name = branch_name_for(issue_number, issue_title)
+            
+            # Un único commit sobre la base (los checkpoints del diario se aplastan) que
+            # solo incluye los ficheros escritos o borrados por los agentes
+            merge_base = git_ops.merge_base(branch_name, BASE_BRANCH)
+            commit = git_ops.commit(branch_name, merge_base, workdir, touched.paths(), f"AI Fix: {issue_title}")
+            # Solo se reescribe la rama si el remoto sigue en lo último que subió el agente:
+            # lo que haya subido otra persona no se pisa. Sin push en esta ejecución (rama de una
+            # ejecución anterior ya compactada, issue reetiquetada) vale lo que hay ahora en el remoto,
+            # y '' solo si la rama es nueva
+            pushed = journal.stages(issue_number).get('pushed', {}).get('sha') or git_ops.remote_sha(branch_name)
+            git_ops.push([branch_name], leases={branch_name: pushed})
+            journal.record(issue_number, 'pushed', sha=commit)
+            print(f"📦 Commit {commit[:10]} con {len(touched.paths())} ficheros subido a {branch_name}")
+            
+            repo = get_repo()
+            # Si el proceso cayó entre create_pull y el diario, la PR ya existe: GitHub rechazaría otra
+            existing = list(repo.get_pulls(state='open', head=f"{repo.owner.login}:{branch_name}", base=BASE_BRANCH))
+            if existing:
+                print(f"✅ PR ya abierta: {existing[0].html_url}")
+                return True
+            body = f"Resolves #{issue_number}\n\nGenerated by Autonomous AI Agent 🤖"
+            pr = repo.create_pull(title=f"AI Implementation: {issue_title}", body=body, head=branch_name, base=BASE_BRANCH)
+            
+            print(f"✅ PR Creada: {pr.html_url}")
+            return True
+        except Exception as e:
+            print(f"❌ Error creando PR: {e}")
+            return False
+
+def new_test_log(workdir, label):
+    """Resumen de fallos en streaming, con el log completo en .ai_cache/test_logs."""
+    name = f"{os.path.basename(os.path.abspath(workdir))}-{time.strftime('%Y%m%d-%H%M%S')}-{label}.log"
+    return LogDigest(TEST_FAILURE_LIMIT, TEST_DIGEST_CHARS, os.path.join(TEST_LOGS_DIR, name))
+
+def run_docker_tests(workdir):
+    """
+    Valida el worktree en el runner de tests caliente (contenedor persistente o proceso local).
+    Primero solo los tests afectados por el cambio; si pasan, la suite completa, para que
+    la PR se abra solo tras una ejecución completa en verde. Ambas van en shards paralelos
+    equilibrados por el tamaño de cada módulo de test.
+    La salida se procesa en streaming: la ejecución se corta al llegar al límite de fallos
+    y se devuelve un resumen compacto (sin trazas repetidas) en lugar del log completo.
+    """
+    start = time.perf_counter()
     try:
-        current_dir = os.getcwd()
-        safe_title = "".join([c if c.isalnum() else "-" for c in issue_title]).lower()[:30]
-        branch_name = f"feature/issue-{issue_number}-{safe_title}"
-        
-        subprocess.run(f"git checkout -b {branch_name}", shell=True, cwd=current_dir)
-        subprocess.run("git add .", shell=True, cwd=current_dir)
-        subprocess.run(f'git commit -m "AI Fix: {issue_title}"', shell=True, cwd=current_dir)
-        subprocess.run(f"git push origin {branch_name}", shell=True, cwd=current_dir)
-        
-        repo = g.get_repo(REPO_NAME)
-        body = f"Resolves #{issue_number}\n\nGenerated by Autonomous AI Agent 🤖"
-        pr = repo.create_pull(title=f"AI Implementation: {issue_title}", body=body, head=branch_name, base="main")
-        
-        print(f"✅ PR Creada: {pr.html_url}")
-        subprocess.run("git checkout main", shell=True, cwd=current_dir)
-        return True
+        changed = changed_files(workdir, BASE_BRANCH)
+        cache_path = os.path.join(IMPORT_GRAPH_CACHE, f"{os.path.basename(os.path.abspath(workdir))}.json")
+        graph = ImportGraph(workdir, cache_path).refresh()
+        all_tests = find_test_modules(graph)
+        selected = select_tests(workdir, changed, graph=graph)
+
+        if selected is not None:
+            print(f"🧪 Ejecutando {len(selected)} módulos de test afectados en paralelo...")
+            log = new_test_log(workdir, 'affected')
+            try:
+                with metrics.span('tests_affected', modules=len(selected)):
+                    returncode, _ = run_sharded(test_runner, workdir, selected, TEST_SHARDS, all_tests, log=log)
+            finally:
+                log.close()
+            if returncode != 0:
+                return False, log.digest()
+
+        print(f"🧪 Ejecutando la suite completa ({len(all_tests)} módulos) en paralelo...")
+        log = new_test_log(workdir, 'full')
+        try:
+            with metrics.span('tests_full', modules=len(all_tests)):
+                if all_tests:
+                    returncode, _ = run_sharded(test_runner, workdir, sorted(all_tests), TEST_SHARDS, all_tests,
+                                                log=log)
+                else:
+                    # Sin módulos test_*.py en tests/: descubrimiento normal de unittest
+                    returncode, _ = test_runner.run(workdir, on_output=log.stream().feed)
+        finally:
+            log.close()
     except Exception as e:
-        print(f"❌ Error creando PR: {e}")
-        subprocess.run("git checkout main", shell=True) 
-        return False
-
-def run_docker_tests():
-    print("🧪 Ejecutando Tests en Docker...")
-    
-    docker_command = (
-        'if [ -f requirements.txt ]; then pip install -r requirements.txt; fi && '
-        'export PYTHONPATH=$PYTHONPATH:. && '
-        'python -m unittest discover -s tests -p "test_*.py"'
-    )
-
-    cmd = f'docker run --rm -v "{os.getcwd()}":/app -w /app python:3.10-slim bash -c "{docker_command}"'
-    
-    result = subprocess.run(cmd, shell=True, capture_output=True)
-    
-    # Decodificación segura para Windows
-    stdout = result.stdout.decode('utf-8', errors='replace')
-    stderr = result.stderr.decode('utf-8', errors='replace')
-    
-    full_output = stdout + "\n" + stderr
+        return False, f"Test runner error: {e}"
+    finally:
+        metrics.add('test_seconds', time.perf_counter() - start)
 
-    if result.returncode == 0:
-        return True, stderr 
-    else:
-        return False, full_output
+    return returncode == 0, log.digest()
 
 # --- LÓGICA DE RESOLUCIÓN ---
 
-def solve_issue_with_retries(issue):
+def solve_issue_with_retries(issue, workdir, touched):
     MAX_RETRIES = 3
     attempt = 0
+    tools = build_tools(workdir, touched)
+    llm_pro, llm_flash = build_llms(workdir)
+    smart_directory_reader = tools['smart_directory_reader']
+    file_reader = tools['file_reader']
+    file_writer = tools['file_writer']
+    file_deleter = tools['file_deleter']
+    project_index = tools['project_index']
     
     # 1. Definición de Agentes
     arch_conf = agents_config['architect']
@@ -266,30 +446,30 @@ def solve_issue_with_retries(issue):
     architect = Agent(
         role=arch_conf['role'], goal=arch_conf['goal'], backstory=arch_conf['backstory'],
         llm=llm_pro, verbose=True, allow_delegation=False, 
-        tools=[smart_directory_reader, file_reader],
-        max_rpm=5
+        tools=[smart_directory_reader, project_index, file_reader],
+        max_rpm=None  # cuota compartida en rate_scheduler
     )
 
     manager = Agent(
         role=manager_conf['role'], goal=manager_conf['goal'], backstory=manager_conf['backstory'],
         llm=llm_pro, verbose=True, allow_delegation=False,
-        tools=[smart_directory_reader, file_reader],
-        max_rpm=5
+        tools=[smart_directory_reader, project_index, file_reader],
+        max_rpm=None  # cuota compartida en rate_scheduler
     )
     
     # 👇 CAMBIO 1: El Developer ahora tiene 'smart_directory_reader' para ver las carpetas
     dev = Agent(
         role=dev_conf['role'], goal=dev_conf['goal'], backstory=dev_conf['backstory'],
         llm=llm_flash, verbose=True, allow_delegation=False,
-        tools=[smart_directory_reader, file_reader, file_writer, file_deleter],
-        max_rpm=50
+        tools=[smart_directory_reader, project_index, file_reader, file_writer, file_deleter],
+        max_rpm=None  # cuota compartida en rate_scheduler
     )
     
     qa = Agent(
         role=qa_conf['role'], goal=qa_conf['goal'], backstory=qa_conf['backstory'],
         llm=llm_flash, verbose=True, allow_delegation=False,
-        tools=[file_writer],
-        max_rpm=50
+        tools=[project_index, file_writer],
+        max_rpm=None  # cuota compartida en rate_scheduler
     )
 
     print("🤖 Iniciando el Consejo de Arquitectura...")
@@ -348,23 +528,38 @@ def solve_issue_with_retries(issue):
         expected_output="Tests saved."
     )
 
-    crew = Crew(
-        agents=[architect, manager, dev, qa], 
-        tasks=[task_arch, task_plan, task_code, task_test], 
-        verbose=True, 
-        process=Process.sequential, 
-        memory=False
-    )
-    
-    crew.kickoff()
-
-    # 👇 CAPTURA DE CONTEXTO
-    original_plan = task_plan.output
+    done = journal.stages(issue.number)
+    if 'crew' in done:
+        print(f"⏩ #{issue.number}: la crew ya terminó en una ejecución anterior, se reanuda desde el diario.")
+        original_plan = done['crew']['plan']
+    else:
+        with metrics.span('crew') as crew_span:
+            # Un span por tarea: architect, manager, developer, qa
+            crew = Crew(
+                agents=[architect, manager, dev, qa], 
+                tasks=[task_arch, task_plan, task_code, task_test], 
+                verbose=True, 
+                process=Process.sequential, 
+                memory=False,
+                task_callback=lambda output: crew_span.split('task', agent=str(getattr(output, 'agent', '')))
+            )
+
+            crew.kickoff()
+
+        # 👇 CAPTURA DE CONTEXTO
+        original_plan = task_plan.output
+        journal.record(issue.number, 'crew', plan=str(original_plan), architecture=str(task_arch.output),
+                       commit=worktrees.checkpoint(issue.number, "crew"), touched=touched.paths())
 
     # BUCLE DE AUTO-CORRECCIÓN
     while attempt < MAX_RETRIES:
         print(f"\n🔄 Validación {attempt + 1}/{MAX_RETRIES}...")
-        tests_passed, error_log = run_docker_tests()
+        previous = done.get(f'tests-{attempt}')
+        if previous is not None:
+            tests_passed, error_log = previous['passed'], previous['log']
+        else:
+            tests_passed, error_log = run_docker_tests(workdir)
+            journal.record(issue.number, f'tests-{attempt}', passed=tests_passed, log=error_log)
         
         if tests_passed:
             print("✅ Tests pasados.")
@@ -372,7 +567,8 @@ def solve_issue_with_retries(issue):
         else:
             print(f"❌ Fallo en Tests. Reparando...")
             attempt += 1
-            if attempt < MAX_RETRIES:
+            metrics.add('retries')
+            if attempt < MAX_RETRIES and f'fix-{attempt}' not in done:
                 fix_task = Task(
                     description=f"""
                     CRITICAL: Tests FAILED.
@@ -385,7 +581,8 @@ def solve_issue_with_retries(issue):
                     
                     INSTRUCTIONS:
                     1. USE 'List Project Files' to check where the files actually are.
-                    2. Analyze the Import/Module error. 
+                    2. Analyze the Import/Module error. Use 'Project Index' ('outline <path>', 'find <name>',
+                       'importers <module>') to locate the code before reading whole files.
                     3. Fix the imports in the code to match the ACTUAL file structure. 
                        (Example: if 'game.py' is in 'app/', use 'from app.game import ...').
                     4. Fix the code or tests.
@@ -399,48 +596,119 @@ def solve_issue_with_retries(issue):
                     verbose=True, 
                     memory=False
                 )
-                fix_crew.kickoff()
+                # Las correcciones pasan antes que el trabajo nuevo de otras issues en la cola del modelo
+                with rate_scheduler.priority(FIX_PRIORITY), metrics.span('fix', attempt=attempt):
+                    fix_crew.kickoff()
+                journal.record(issue.number, f'fix-{attempt}',
+                               commit=worktrees.checkpoint(issue.number, f"fix {attempt}"), touched=touched.paths())
             
     return False, error_log
 
+# --- PROCESADO DE UNA ISSUE ---
+
+def process_issue(issue):
+    """Resuelve una issue en su propio worktree y abre la PR. Se ejecuta en un hilo del scheduler."""
+    with metrics.span('issue', issue.number, title=issue.title):
+        _process_issue(issue)
+
+def _process_issue(issue):
+    print(f"\n🔔 TAREA DETECTADA: {issue.title} (#{issue.number})")
+    branch_name = branch_name_for(issue.number, issue.title)
+    done = journal.stages(issue.number)
+    if not done:
+        journal.record(issue.number, 'started', branch=branch_name, title=issue.title)
+    try:
+        with metrics.span('worktree'):
+            # Al reanudar, el worktree parte del último checkpoint registrado
+            workdir = worktrees.create(issue.number, branch_name, start_point=journal.last_commit(issue.number))
+    except Exception as e:
+        print(f"❌ No se pudo crear el worktree de #{issue.number}: {e}")
+        return
+
+    # Ficheros tocados por los agentes; al reanudar se recuperan del diario
+    touched = TouchedFiles(workdir)
+    for data in done.values():
+        touched.update(data.get('touched', []))
+
+    try:
+        success, final_error = solve_issue_with_retries(issue, workdir, touched)
+        
+        if success:
+            if 'pull_request' in done or create_pull_request(issue.number, issue.title, workdir, touched):
+                journal.record(issue.number, 'pull_request')
+                issue.create_comment("✅ Tarea completada.")
+                issue.remove_from_labels("ai-agent")
+                journal.finish(issue.number, 'done')
+            else:
+                failures = journal.stages(issue.number).get('pull_request_failed', {}).get('attempts', 0) + 1
+                delay = PR_RETRY_DELAY * 2 ** (failures - 1)
+                journal.record(issue.number, 'pull_request_failed', attempts=failures, retry_at=time.time() + delay)
+                if failures < PR_ATTEMPTS:
+                    # La crew y los tests se reanudan desde el diario; solo se repite la PR
+                    pr_retry_at[issue.number] = time.time() + delay
+                    print(f"⏳ PR de #{issue.number} fallida ({failures}/{PR_ATTEMPTS}), reintento en {delay}s.")
+                    return
+                issue.create_comment(f"❌ No se pudo abrir la PR tras {failures} intentos.")
+                issue.remove_from_labels("ai-agent")
+                issue.add_to_labels("help-wanted")
+                journal.finish(issue.number, 'failed')
+        else:
+            print("💀 Se acabaron los intentos.")
+            issue.create_comment(f"❌ Error:\n```\n{final_error}\n```")
+            issue.remove_from_labels("ai-agent")
+            issue.add_to_labels("help-wanted")
+            journal.finish(issue.number, 'failed')
+        finished_issues.add(issue.number)
+    except Exception as e:
+        print(f"\n❌ Error en #{issue.number}: {e}")
+    finally:
+        worktrees.remove(issue.number)
+        stats = llm_cache.stats()
+        print(f"🗄️ Caché LLM: {stats['hits']} aciertos / {stats['misses']} fallos, "
+              f"{stats['entries']} entradas ({stats['bytes'] // 1024} KB)")
+        for model, rate in rate_scheduler.stats().items():
+            print(f"⏱️ {model}: {rate['granted']} peticiones, cola máx. {rate['max_waiting']}, "
+                  f"espera total {rate['total_wait']:.0f}s")
+
 # --- BUCLE PRINCIPAL ---
 
 if __name__ == "__main__":
     print("==========================================")
     print(f"👀 VIGILANTE ACTIVO EN: {REPO_NAME}")
     print("  - Roles: Architect + Manager (Pro) / Dev + QA (Flash)")
+    print(f"  - Issues en paralelo: {MAX_CONCURRENT_ISSUES} (un worktree por issue)")
     print("  - Protección .env: ACTIVADA 🛡️")
     print("==========================================")
 
+    journal.compact()
+    if journal.in_flight():
+        print(f"⏩ Issues a reanudar desde el diario: {', '.join(f'#{n}' for n in journal.in_flight())}")
+    # La espera tras una PR fallida se mantiene entre reinicios
+    for number in journal.in_flight():
+        failed = journal.stages(number).get('pull_request_failed')
+        if failed:
+            pr_retry_at[number] = failed['retry_at']
+
+    scheduler = IssueScheduler(process_issue, max_workers=MAX_CONCURRENT_ISSUES)
+
     while True:
         try:
-            issues = get_ai_tasks()
+            with metrics.span('poll'):
+                issues = get_ai_tasks()
             
-            if issues.totalCount > 0:
-                for issue in issues:
-                    print(f"\n🔔 TAREA DETECTADA: {issue.title} (#{issue.number})")
-                    
-                    success, final_error = solve_issue_with_retries(issue)
-                    
-                    if success:
-                        if create_pull_request(issue.number, issue.title):
-                            issue.create_comment("✅ Tarea completada.")
-                            issue.remove_from_labels("ai-agent")
-                    else:
-                        print("💀 Se acabaron los intentos.")
-                        issue.create_comment(f"❌ Error:\n```\n{final_error}\n```")
-                        issue.remove_from_labels("ai-agent")
-                        issue.add_to_labels("help-wanted")
-
-                    print("💤 Descansando...")
-                    time.sleep(10)
-            else:
+            # Las issues ya en curso no se vuelven a encolar
+            new_issues = [issue for issue in issues if scheduler.submit(issue)]
+            if not new_issues:
                 sys.stdout.write(".")
                 sys.stdout.flush()
-                time.sleep(30)
+            # Intervalo adaptativo: corto tras cambios, más largo en reposo o con límite de API
+            time.sleep(issue_poller.next_interval())
                 
         except KeyboardInterrupt:
             break
         except Exception as e:
             print(f"\n❌ Error General: {e}")
-            time.sleep(30)
\ No newline at end of file
+            time.sleep(30)
+
+    scheduler.shutdown(wait=False)
+    test_runner.shutdown()
@@ -1,84 +1,160 @@
 import random
 
+class _Cell:
+    """Dict-style view of one cell ('is_mine', 'is_revealed', 'is_flagged', 'value') over the game's flat arrays."""
+    __slots__ = ('game', 'index')
+    FIELDS = {'is_mine': 'mines', 'is_revealed': 'revealed', 'is_flagged': 'flagged', 'value': 'values'}
+
+    def __init__(self, game, index):
+        self.game = game
+        self.index = index
+
+    def __getitem__(self, key):
+        value = getattr(self.game, self.FIELDS[key])[self.index]
+        return value if key == 'value' else bool(value)
+
+    def __setitem__(self, key, value):
+        getattr(self.game, self.FIELDS[key])[self.index] = int(value)
+
+class _Row:
+    __slots__ = ('game', 'start')
+
+    def __init__(self, game, r):
+        self.game = game
+        self.start = r * game.cols
+
+    def __getitem__(self, c):
+        return _Cell(self.game, self.start + c)
+
+    def __len__(self):
+        return self.game.cols
+
+class _Board:
+    """board[r][c] access to the cells, created on demand instead of one dict per cell."""
+    __slots__ = ('game',)
+
+    def __init__(self, game):
+        self.game = game
+
+    def __getitem__(self, r):
+        return _Row(self.game, r)
+
+    def __len__(self):
+        return self.game.rows
+
 class MinesweeperGame:
     """
     Core logic for the Minesweeper game.
     """
+    # Largest supported side length; big boards are shown by the GUI's viewport mode
+    MAX_SIZE = 1000
+
     def __init__(self, rows, cols, num_mines):
-        if not (1 <= rows <= 50 and 1 <= cols <= 50 and 0 <= num_mines < rows * cols):
+        if not (1 <= rows <= self.MAX_SIZE and 1 <= cols <= self.MAX_SIZE and 0 <= num_mines < rows * cols):
             raise ValueError("Invalid board dimensions or mine count.")
 
         self.rows = rows
         self.cols = cols
         self.num_mines = num_mines
-        self.board = self._initialize_board()
+        self._initialize_board()
         self.state = 'playing'  # 'playing', 'won', 'lost'
         self.revealed_count = 0
         self.total_safe_cells = rows * cols - num_mines
+        # Numbered cells in the order they were revealed, so a solver can follow
+        # the frontier without rescanning the board
+        self.revealed_numbers = []
+        # Mine array drawn ahead of time with random_layout(), e.g. by a background
+        # thread while the player looks at the board; used on the first click if set
+        self.layout = None
+
+    @staticmethod
+    def random_layout(rows, cols, num_mines):
+        """Returns a random mine array for a board, before the first click is known."""
+        layout = bytearray(rows * cols)
+        for index in random.sample(range(rows * cols), num_mines):
+            layout[index] = 1
+        return layout
 
     def _initialize_board(self):
         """Creates the initial board structure."""
-        # Board structure: list of lists, where each element is a dictionary
-        # {'is_mine': bool, 'is_revealed': bool, 'is_flagged': bool, 'value': int (0-8)}
-        board = [
-            [
-                {'is_mine': False, 'is_revealed': False, 'is_flagged': False, 'value': 0}
-                for _ in range(self.cols)
-            ]
-            for _ in range(self.rows)
-        ]
-        return board
+        # One flat byte array per field, indexed by r * cols + c: a 1000x1000 board
+        # takes 4 MB instead of a million dicts. board[r][c] gives the dict-style view
+        # {'is_mine', 'is_revealed', 'is_flagged', 'value' (0-8)} of a cell.
+        size = self.rows * self.cols
+        self.mines = bytearray(size)
+        self.revealed = bytearray(size)
+        self.flagged = bytearray(size)
+        self.values = bytearray(size)
+        self.board = _Board(self)
 
     def _place_mines(self, start_r, start_c):
         """Places mines randomly, ensuring the starting cell is safe."""
-        
-        # Create a list of all possible coordinates
-        all_coords = [(r, c) for r in range(self.rows) for c in range(self.cols)]
-        
+        size = self.rows * self.cols
+
         # Exclude the starting cell and its neighbors (3x3 area)
         safe_zone = set()
         for dr in [-1, 0, 1]:
             for dc in [-1, 0, 1]:
                 r, c = start_r + dr, start_c + dc
                 if 0 <= r < self.rows and 0 <= c < self.cols:
-                    safe_zone.add((r, c))
+                    safe_zone.add(r * self.cols + c)
 
-        mine_candidates = [coord for coord in all_coords if coord not in safe_zone]
-        
-        if len(mine_candidates) < self.num_mines:
+        if size - len(safe_zone) < self.num_mines:
             # Fallback: if the board is too small, just ensure the start cell is safe
-            mine_candidates = [coord for coord in all_coords if coord != (start_r, start_c)]
-            if len(mine_candidates) < self.num_mines:
-                 raise RuntimeError("Cannot place required number of mines safely.")
+            safe_zone = {start_r * self.cols + start_c}
 
-
-        mine_locations = random.sample(mine_candidates, self.num_mines)
-
-        for r, c in mine_locations:
-            self.board[r][c]['is_mine'] = True
+        layout = self.layout
+        if layout is not None:
+            self.mines = layout
+            self._move_mines_out_of(safe_zone)
+        else:
+            # Sampling from a range needs no list of all cells; the few samples that fall in
+            # the safe zone are dropped, and the rest are still a uniform random choice
+            sample = random.sample(range(size), min(size, self.num_mines + len(safe_zone)))
+            for index in [index for index in sample if index not in safe_zone][:self.num_mines]:
+                self.mines[index] = 1
 
         self._calculate_neighbor_values()
 
+    def _move_mines_out_of(self, safe_zone):
+        """Moves the mines of a prepared layout that fall in the safe zone to random free cells outside it."""
+        mines = self.mines
+        moved = [index for index in safe_zone if mines[index]]
+        for index in moved:
+            mines[index] = 0
+        # At least as many free cells are left outside the safe zone as mines were moved
+        for _ in moved:
+            target = random.randrange(len(mines))
+            while mines[target] or target in safe_zone:
+                target = random.randrange(len(mines))
+            mines[target] = 1
+
     def _calculate_neighbor_values(self):
         """Calculates the number of adjacent mines for every non-mine cell."""
-        for r in range(self.rows):
-            for c in range(self.cols):
-                if not self.board[r][c]['is_mine']:
-                    count = 0
-                    for dr in [-1, 0, 1]:
-                        for dc in [-1, 0, 1]:
-                            nr, nc = r + dr, c + dc
-                            if 0 <= nr < self.rows and 0 <= nc < self.cols:
-                                if self.board[nr][nc]['is_mine']:
-                                    count += 1
-                    self.board[r][c]['value'] = count
+        # The mine array is read as one big little-endian integer with a byte per cell.
+        # A count never exceeds 8, so adding shifted copies sums the neighbours of every
+        # cell at once without carries between bytes, instead of looping over the mines.
+        rows, cols = self.rows, self.cols
+        size = rows * cols
+        full = (1 << (8 * size)) - 1
+        mines = int.from_bytes(self.mines, 'little')
+        # The left/right neighbour of a cell at a row edge belongs to another row
+        not_first_col = int.from_bytes((b'\x00' + b'\xff' * (cols - 1)) * rows, 'little')
+        not_last_col = int.from_bytes((b'\xff' * (cols - 1) + b'\x00') * rows, 'little')
+        row = mines + ((mines << 8) & not_first_col) + ((mines >> 8) & not_last_col)
+        row_bits = 8 * cols
+        counts = (row + ((row << row_bits) & full) + (row >> row_bits)) - mines
+        # Mine cells keep a value of 0
+        counts &= full ^ (mines * 0xff)
+        self.values = bytearray(counts.to_bytes(size, 'little'))
 
     def toggle_flag(self, r, c):
         """Toggles the flag state of a cell."""
-        if self.state != 'playing' or self.board[r][c]['is_revealed']:
+        index = r * self.cols + c
+        if self.state != 'playing' or self.revealed[index]:
             return False
-        
-        self.board[r][c]['is_flagged'] = not self.board[r][c]['is_flagged']
+
+        self.flagged[index] ^= 1
         return True
 
     def reveal_cell(self, r, c):
@@ -88,72 +164,85 @@ class MinesweeperGame:
         """
         if not (0 <= r < self.rows and 0 <= c < self.cols):
             return False
-        
-        cell = self.board[r][c]
 
-        if self.state != 'playing' or cell['is_revealed'] or cell['is_flagged']:
+        index = r * self.cols + c
+
+        if self.state != 'playing' or self.revealed[index] or self.flagged[index]:
             return False
 
         # Handle first click: place mines away from the starting cell
         if self.revealed_count == 0 and self.num_mines > 0:
             self._place_mines(r, c)
 
-        if cell['is_mine']:
+        if self.mines[index]:
             self.state = 'lost'
             self._reveal_all_mines()
             return True
-        
+
         # Recursive reveal for zero-value cells
         self._recursive_reveal(r, c)
-        
+
         # Check win condition
         if self.revealed_count == self.total_safe_cells:
             self.state = 'won'
             return True
-            
+
         return False
 
     def _recursive_reveal(self, r, c):
-        """Helper function for recursive revealing of safe cells."""
+        """Helper function for revealing connected safe cells (flood fill)."""
+        # Uses an explicit stack so large empty areas don't hit the recursion limit
         if not (0 <= r < self.rows and 0 <= c < self.cols):
             return
-        
-        cell = self.board[r][c]
-        
-        if cell['is_revealed'] or cell['is_mine'] or cell['is_flagged']:
-            return
+        rows, cols = self.rows, self.cols
+        mines, revealed, flagged, values = self.mines, self.revealed, self.flagged, self.values
+        last_row, last_col = rows - 1, cols - 1
+        around = (-cols - 1, -cols, -cols + 1, -1, 1, cols - 1, cols, cols + 1)
+        numbers = self.revealed_numbers
+        stack = [r * cols + c]
+        count = 0
+        while stack:
+            index = stack.pop()
+            if revealed[index] or mines[index] or flagged[index]:
+                continue
 
-        cell['is_revealed'] = True
-        self.revealed_count += 1
+            revealed[index] = 1
+            count += 1
 
-        # If the cell has a value > 0, stop recursion here
-        if cell['value'] > 0:
-            return
+            # If the cell has a value > 0, stop expanding here
+            r, c = divmod(index, cols)
+            if values[index]:
+                numbers.append((r, c))
+                continue
 
-        # Recurse to neighbors
-        for dr in [-1, 0, 1]:
-            for dc in [-1, 0, 1]:
-                if dr == 0 and dc == 0:
-                    continue
-                self._recursive_reveal(r + dr, c + dc)
+            # Expand to neighbors
+            if 0 < r < last_row and 0 < c < last_col:
+                stack.extend([index + step for step in around if not revealed[index + step]])
+            else:
+                for nr in range(max(r - 1, 0), min(r + 2, rows)):
+                    start = nr * cols
+                    for nc in range(max(c - 1, 0), min(c + 2, cols)):
+                        if not revealed[start + nc]:
+                            stack.append(start + nc)
+        self.revealed_count += count
 
     def _reveal_all_mines(self):
         """Reveals all mine locations when the game ends."""
-        for r in range(self.rows):
-            for c in range(self.cols):
-                if self.board[r][c]['is_mine']:
-                    self.board[r][c]['is_revealed'] = True
+        index = self.mines.find(1)
+        while index != -1:
+            self.revealed[index] = 1
+            index = self.mines.find(1, index + 1)
 
     def get_cell_state(self, r, c):
         """Returns the current display state of a cell."""
-        cell = self.board[r][c]
-        
-        if cell['is_revealed']:
-            if cell['is_mine']:
+        index = r * self.cols + c
+
+        if self.revealed[index]:
+            if self.mines[index]:
                 return 'mine'
             else:
-                return cell['value'] # 0-8
-        elif cell['is_flagged']:
+                return self.values[index] # 0-8
+        elif self.flagged[index]:
             return 'flagged'
         else:
             return 'unrevealed'
@@ -1,6 +1,12 @@
+import sys
+import time
+import queue
+import threading
 import tkinter as tk
-from tkinter import messagebox
-from minesweeper_game import MinesweeperGame
+from latency_stats import LatencyStats, export_json
+
+# The engine, solver and messagebox aren't needed for the first frame: they are
+# imported where they are first used.
 
 class MinesweeperGUI:
     
@@ -15,64 +21,152 @@ class MinesweeperGUI:
         1: 'blue', 2: 'green', 3: 'red', 4: 'darkblue',
         5: 'darkred', 6: 'teal', 7: 'black', 8: 'gray'
     }
-    
-    def __init__(self, master):
+
+    # Boards with more cells than this are drawn on a scrollable canvas (viewport mode)
+    # instead of one Button per cell
+    VIEWPORT_THRESHOLD = 30 * 30
+    CELL_SIZE = 20
+    # Maximum visible area of the viewport, in cells
+    VIEWPORT_ROWS = 30
+    VIEWPORT_COLS = 40
+    MINIMAP_SIZE = 150
+    # How often (ms) the main loop checks the analysis queue
+    ANALYSIS_POLL_MS = 50
+    # Where F4 writes the click-to-paint latency report
+    LATENCY_EXPORT_PATH = 'minesweeper_latency.json'
+
+    # Minimap colors per cell state
+    MINIMAP_COLORS = {
+        'unrevealed': '#c0c0c0', 'flagged': '#ff8000', 'mine': '#ff0000', 'revealed': '#ffffff'
+    }
+
+    def __init__(self, master, viewport=None):
         self.master = master
         master.title("Minesweeper")
         
         self.game = None
         self.buttons = []
+        # None picks the mode from the board size, True/False forces it
+        self.viewport = viewport
+        self.viewport_mode = False
+
+        # Hint/auto-play analysis runs in a worker thread and reports back through this queue.
+        # Each request gets a generation number so results of cancelled runs are dropped.
+        self.analysis_queue = queue.Queue()
+        self.analysis_generation = 0
+        self.analysis_cancel = None
+        self.analysis_polling = False
+        # One solver per game: it keeps the frontier between hints instead of rescanning the board
+        self.solver = None
+
+        # Click-to-paint latency, one LatencyStats per board size ("ROWSxCOLS"),
+        # plus 'app' for startup and restart timings
+        self.latency = {}
+
+        # Widgets kept between games: the difficulty screen and the last board (with the
+        # (rows, cols, viewport_mode) it was built for) are hidden instead of destroyed
+        self.config_frame = None
+        self.board_container = None
+        self.board_key = None
         
         self.main_frame = tk.Frame(master)
-        self.main_frame.pack(padx=10, pady=10)
+        # Fills the window so the viewport canvas grows and shrinks with it
+        self.main_frame.pack(padx=10, pady=10, fill=tk.BOTH, expand=True)
         
         self.status_label = tk.Label(self.main_frame, text="Select Difficulty", font=('Arial', 14))
         self.status_label.pack(pady=5)
+
+        # Performance overlay (F3 toggles it, F4 exports the numbers to JSON).
+        # Lives outside main_frame so screen changes don't destroy it.
+        self.overlay_visible = False
+        self.overlay_label = tk.Label(master, text="", font=('Courier', 9), justify=tk.LEFT, anchor='w',
+                                      bg='black', fg='lightgreen')
+        master.bind("<F3>", lambda event: self.toggle_overlay())
+        master.bind("<F4>", lambda event: self.export_latency())
         
         self.start_screen()
 
     def start_screen(self):
         """Displays the difficulty selection screen."""
+        self.cancel_analysis()
         
-        # Clear previous widgets if any
-        for widget in self.main_frame.winfo_children():
-            if widget != self.status_label:
-                widget.destroy()
+        # Hide the previous board; it is reused if the next game has the same size
+        if self.board_container is not None:
+            self.board_container.pack_forget()
         
         self.status_label.config(text="Select Difficulty", fg='black')
         
-        config_frame = tk.Frame(self.main_frame)
-        config_frame.pack(pady=20)
-        
-        for name, (r, c, m) in self.CONFIGS.items():
-            btn = tk.Button(config_frame, text=f"{name}\n({r}x{c}, {m} mines)", 
-                            command=lambda r=r, c=c, m=m: self.start_game(r, c, m),
-                            width=15, height=3)
-            btn.pack(side=tk.LEFT, padx=10)
+        if self.config_frame is None:
+            self.config_frame = tk.Frame(self.main_frame)
+            for name, (r, c, m) in self.CONFIGS.items():
+                btn = tk.Button(self.config_frame, text=f"{name}\n({r}x{c}, {m} mines)", 
+                                command=lambda r=r, c=c, m=m: self.start_game(r, c, m),
+                                width=15, height=3)
+                btn.pack(side=tk.LEFT, padx=10)
+        self.config_frame.pack(pady=20)
 
     def start_game(self, rows, cols, num_mines):
         """Initializes the game and switches to the game board view."""
+        started = time.perf_counter()
+
+        from minesweeper_game import MinesweeperGame
         try:
             self.game = MinesweeperGame(rows, cols, num_mines)
         except ValueError as e:
+            from tkinter import messagebox
             messagebox.showerror("Error", str(e))
             return
+        # The mines are drawn in the background while the player looks at the board;
+        # the first click only moves the few that land next to it
+        threading.Thread(target=self.prepare_layout_worker, args=(self.game,), daemon=True).start()
 
         self.rows = rows
         self.cols = cols
         
-        # Clear configuration screen widgets
-        for widget in self.main_frame.winfo_children():
-            if widget != self.status_label:
-                widget.destroy()
+        # Hide the configuration screen
+        if self.config_frame is not None:
+            self.config_frame.pack_forget()
         
         self.status_label.config(text="Game in Progress", fg='black')
-        self.create_board_gui()
+
+        if self.viewport is None:
+            self.viewport_mode = rows * cols > self.VIEWPORT_THRESHOLD
+        else:
+            self.viewport_mode = self.viewport
+
+        board_key = (rows, cols, self.viewport_mode)
+        if board_key == self.board_key:
+            # Same dimensions as last time: reset the existing widgets instead of rebuilding them
+            if self.viewport_mode:
+                self.top_row = 0
+                self.left_col = 0
+            self.update_gui()
+            self.board_container.pack(fill=tk.BOTH, expand=True)
+        else:
+            if self.board_container is not None:
+                self.board_container.destroy()
+            self.board_container = tk.Frame(self.main_frame)
+            self.board_container.pack(fill=tk.BOTH, expand=True)
+            self.board_key = board_key
+
+            if self.viewport_mode:
+                self.create_viewport_gui()
+            else:
+                self.create_board_gui()
+
+        self.master.after_idle(self.record_app_latency, 'restart', started)
+
+    def prepare_layout_worker(self, game):
+        """
+        Runs in a worker thread. Publishes the layout with a single attribute assignment;
+        if the first click comes first, the game draws its own mines and ignores it.
+        """
+        game.layout = game.random_layout(game.rows, game.cols, game.num_mines)
 
     def create_board_gui(self):
         """Creates the grid of buttons for the game board."""
         
-        board_frame = tk.Frame(self.main_frame)
+        board_frame = tk.Frame(self.board_container)
         board_frame.pack()
         
         self.buttons = []
@@ -90,28 +184,98 @@ class MinesweeperGUI:
                 row_buttons.append(btn)
             self.buttons.append(row_buttons)
             
-        # Add restart button
-        restart_btn = tk.Button(self.main_frame, text="Restart", command=self.start_screen)
-        restart_btn.pack(pady=10)
+        self.create_controls()
+
+    def create_controls(self):
+        """Adds the Restart, Hint and Auto-play buttons below the board."""
+        controls_frame = tk.Frame(self.board_container)
+        controls_frame.pack(pady=10)
+
+        restart_btn = tk.Button(controls_frame, text="Restart", command=self.start_screen)
+        restart_btn.pack(side=tk.LEFT, padx=5)
+        hint_btn = tk.Button(controls_frame, text="Hint", command=lambda: self.start_analysis('hint'))
+        hint_btn.pack(side=tk.LEFT, padx=5)
+        auto_btn = tk.Button(controls_frame, text="Auto-play", command=lambda: self.start_analysis('auto'))
+        auto_btn.pack(side=tk.LEFT, padx=5)
 
     def handle_click(self, r, c, button_type):
         """Handles user interaction (left click to reveal, right click to flag)."""
         if self.game.get_game_state() != 'playing':
             return
 
+        # The board is about to change, so any running analysis is out of date
+        self.cancel_analysis()
+
+        started = time.perf_counter()
         if button_type == 'left':
             game_state_changed = self.game.reveal_cell(r, c)
         elif button_type == 'right':
             self.game.toggle_flag(r, c)
             game_state_changed = False # Flagging doesn't change game state immediately
+        engine_done = time.perf_counter()
 
         self.update_gui()
+        gui_done = time.perf_counter()
+
+        stats = self.latency.setdefault(f"{self.rows}x{self.cols}", LatencyStats())
+        stats.record('engine', engine_done - started)
+        stats.record('update_gui', gui_done - engine_done)
+        # Idle callbacks run after Tk has processed pending redraws, so this measures click-to-paint
+        self.master.after_idle(self.record_idle_latency, stats, started)
         
         if game_state_changed:
             self.end_game_message()
 
+    # --- Latency instrumentation ---
+
+    def record_app_latency(self, metric, started):
+        """Records an app-level timing ('startup', 'restart') once Tk is idle."""
+        self.latency.setdefault('app', LatencyStats()).record(metric, time.perf_counter() - started)
+
+    def record_idle_latency(self, stats, started):
+        """Records the time from the click until Tk became idle."""
+        stats.record('total', time.perf_counter() - started)
+        if self.overlay_visible:
+            self.refresh_overlay()
+
+    def toggle_overlay(self):
+        """Shows or hides the performance overlay."""
+        self.overlay_visible = not self.overlay_visible
+        if self.overlay_visible:
+            self.refresh_overlay()
+            self.overlay_label.place(x=0, y=0)
+        else:
+            self.overlay_label.place_forget()
+
+    def refresh_overlay(self):
+        """Writes the current percentiles for the board being played into the overlay."""
+        if self.game is None:
+            text = "No game in progress"
+        else:
+            key = f"{self.rows}x{self.cols}"
+            stats = self.latency.get(key, LatencyStats())
+            text = f"Board {key}\n{stats.format_summary()}"
+        self.overlay_label.config(text=text)
+        self.overlay_label.lift()
+
+    def export_latency(self, path=None):
+        """Writes the latency percentiles of every board size played to a JSON file."""
+        path = path or self.LATENCY_EXPORT_PATH
+        try:
+            export_json(path, self.latency)
+        except OSError as e:
+            from tkinter import messagebox
+            messagebox.showerror("Error", f"Could not export latency stats: {e}")
+            return
+        self.status_label.config(text=f"Latency stats saved to {path}", fg='black')
+
     def update_gui(self):
         """Updates the appearance of all buttons based on the current game state."""
+        if self.viewport_mode:
+            self.draw_viewport()
+            self.draw_minimap()
+            return
+
         for r in range(self.rows):
             for c in range(self.cols):
                 state = self.game.get_cell_state(r, c)
@@ -129,8 +293,326 @@ class MinesweeperGUI:
                     btn.config(text=str(state), relief=tk.SUNKEN, bg='white', 
                                fg=self.NUMBER_COLORS.get(state, 'black'), font=('Arial', 8, 'bold'))
 
+    # --- Viewport mode (large boards) ---
+
+    def create_viewport_gui(self):
+        """
+        Creates a scrollable canvas showing only the visible window of cells,
+        plus a minimap overview of the whole board.
+        """
+        self.buttons = []
+        self.top_row = 0
+        self.left_col = 0
+        self.cell_items = []
+        self.drawn_cells = []
+
+        board_frame = tk.Frame(self.board_container)
+        board_frame.pack(fill=tk.BOTH, expand=True)
+
+        view_rows = min(self.rows, self.VIEWPORT_ROWS)
+        view_cols = min(self.cols, self.VIEWPORT_COLS)
+        self.canvas = tk.Canvas(board_frame, width=view_cols * self.CELL_SIZE, height=view_rows * self.CELL_SIZE,
+                                bg='lightgray', highlightthickness=0)
+        self.v_scroll = tk.Scrollbar(board_frame, orient=tk.VERTICAL, command=self.on_vertical_scroll)
+        self.h_scroll = tk.Scrollbar(board_frame, orient=tk.HORIZONTAL, command=self.on_horizontal_scroll)
+
+        self.canvas.grid(row=0, column=0, sticky='nsew')
+        self.v_scroll.grid(row=0, column=1, sticky='ns')
+        self.h_scroll.grid(row=1, column=0, sticky='ew')
+        board_frame.rowconfigure(0, weight=1)
+        board_frame.columnconfigure(0, weight=1)
+
+        # Minimap: one pixel per board region, scaled to fit MINIMAP_SIZE
+        scale = min(self.MINIMAP_SIZE / self.rows, self.MINIMAP_SIZE / self.cols)
+        self.minimap_width = max(1, int(self.cols * scale))
+        self.minimap_height = max(1, int(self.rows * scale))
+        self.minimap = tk.Canvas(board_frame, width=self.minimap_width, height=self.minimap_height,
+                                 highlightthickness=1, highlightbackground='black')
+        self.minimap.grid(row=0, column=2, sticky='n', padx=(10, 0))
+        self.minimap_image = tk.PhotoImage(width=self.minimap_width, height=self.minimap_height)
+        self.minimap.create_image(0, 0, image=self.minimap_image, anchor='nw')
+        self.minimap_frame = self.minimap.create_rectangle(0, 0, 0, 0, outline='blue', width=2)
+
+        self.canvas.bind("<Button-1>", lambda event: self.on_canvas_click(event, 'left'))
+        self.canvas.bind("<Button-3>", lambda event: self.on_canvas_click(event, 'right'))
+        self.canvas.bind("<Configure>", self.on_canvas_resize)
+        self.canvas.bind("<MouseWheel>", self.on_mouse_wheel)
+        self.canvas.bind("<Shift-MouseWheel>", lambda event: self.on_mouse_wheel(event, horizontal=True))
+        self.canvas.bind("<Button-4>", lambda event: self.scroll_view(-3, 0))
+        self.canvas.bind("<Button-5>", lambda event: self.scroll_view(3, 0))
+        self.canvas.bind("<Shift-Button-4>", lambda event: self.scroll_view(0, -3))
+        self.canvas.bind("<Shift-Button-5>", lambda event: self.scroll_view(0, 3))
+        self.canvas.bind("<ButtonPress-2>", self.on_drag_start)
+        self.canvas.bind("<B2-Motion>", self.on_drag_motion)
+        self.minimap.bind("<Button-1>", self.on_minimap_click)
+        self.minimap.bind("<B1-Motion>", self.on_minimap_click)
+        for key, (dr, dc) in {"<Up>": (-1, 0), "<Down>": (1, 0), "<Left>": (0, -1), "<Right>": (0, 1)}.items():
+            self.canvas.bind(key, lambda event, dr=dr, dc=dc: self.scroll_view(dr, dc))
+        self.canvas.focus_set()
+
+        self.build_cell_pool(view_rows, view_cols)
+        self.update_gui()
+
+        self.create_controls()
+
+    def build_cell_pool(self, view_rows, view_cols):
+        """
+        Creates the fixed set of canvas items for the visible window.
+        Items are recycled while scrolling: only their text and colors change.
+        """
+        self.canvas.delete('cell')
+        self.view_rows = view_rows
+        self.view_cols = view_cols
+        self.cell_items = []
+        self.drawn_cells = []
+
+        size = self.CELL_SIZE
+        for vr in range(view_rows):
+            row_items = []
+            for vc in range(view_cols):
+                x, y = vc * size, vr * size
+                rect = self.canvas.create_rectangle(x, y, x + size, y + size, fill='lightgray',
+                                                    outline='gray', tags='cell')
+                text = self.canvas.create_text(x + size // 2, y + size // 2, text="",
+                                               font=('Arial', 8, 'bold'), tags='cell')
+                row_items.append((rect, text))
+            self.cell_items.append(row_items)
+            self.drawn_cells.append([None] * view_cols)
+
+    def on_canvas_resize(self, event):
+        """Rebuilds the item pool when the window size changes the number of visible cells."""
+        view_rows = max(1, min(self.rows, event.height // self.CELL_SIZE))
+        view_cols = max(1, min(self.cols, event.width // self.CELL_SIZE))
+        if (view_rows, view_cols) != (self.view_rows, self.view_cols):
+            self.build_cell_pool(view_rows, view_cols)
+            self.scroll_view(0, 0)
+
+    def cell_appearance(self, state):
+        """Returns (text, bg, fg) for a cell state, matching the button look."""
+        if state == 'unrevealed':
+            return " ", 'lightgray', 'black'
+        elif state == 'flagged':
+            return "F", 'lightgray', 'red'
+        elif state == 'mine':
+            return "*", 'red', 'black'
+        elif state == 0:
+            return " ", 'white', 'black'
+        return str(state), 'white', self.NUMBER_COLORS.get(state, 'black')
+
+    def draw_viewport(self):
+        """Redraws only the visible cells, skipping items whose look hasn't changed."""
+        for vr in range(self.view_rows):
+            r = self.top_row + vr
+            for vc in range(self.view_cols):
+                c = self.left_col + vc
+                if r < self.rows and c < self.cols:
+                    look = self.cell_appearance(self.game.get_cell_state(r, c))
+                else:
+                    look = ("", 'lightgray', 'black')
+
+                if self.drawn_cells[vr][vc] == look:
+                    continue
+                self.drawn_cells[vr][vc] = look
+
+                rect, text = self.cell_items[vr][vc]
+                self.canvas.itemconfig(rect, fill=look[1])
+                self.canvas.itemconfig(text, text=look[0], fill=look[2])
+
+        self.v_scroll.set(self.top_row / self.rows, min(1.0, (self.top_row + self.view_rows) / self.rows))
+        self.h_scroll.set(self.left_col / self.cols, min(1.0, (self.left_col + self.view_cols) / self.cols))
+
+    def draw_minimap(self):
+        """Renders a scaled overview of the board; cost depends on the minimap size only."""
+        rows_data = []
+        for py in range(self.minimap_height):
+            r = py * self.rows // self.minimap_height
+            row_colors = []
+            for px in range(self.minimap_width):
+                c = px * self.cols // self.minimap_width
+                state = self.game.get_cell_state(r, c)
+                if isinstance(state, int):
+                    state = 'revealed'
+                row_colors.append(self.MINIMAP_COLORS[state])
+            rows_data.append("{" + " ".join(row_colors) + "}")
+        self.minimap_image.put(" ".join(rows_data))
+        self.update_minimap_frame()
+
+    def update_minimap_frame(self):
+        """Moves the rectangle marking the visible area on the minimap."""
+        x_scale = self.minimap_width / self.cols
+        y_scale = self.minimap_height / self.rows
+        self.minimap.coords(self.minimap_frame,
+                            self.left_col * x_scale, self.top_row * y_scale,
+                            (self.left_col + self.view_cols) * x_scale, (self.top_row + self.view_rows) * y_scale)
+
+    def scroll_view(self, d_rows, d_cols):
+        """Moves the visible window by whole cells, clamped to the board."""
+        self.move_view_to(self.top_row + d_rows, self.left_col + d_cols)
+
+    def move_view_to(self, top_row, left_col):
+        """Places the visible window with (top_row, left_col) as its top-left cell."""
+        top_row = max(0, min(top_row, self.rows - self.view_rows))
+        left_col = max(0, min(left_col, self.cols - self.view_cols))
+        if (top_row, left_col) == (self.top_row, self.left_col):
+            return
+        self.top_row = top_row
+        self.left_col = left_col
+        self.draw_viewport()
+        self.update_minimap_frame()
+
+    def on_vertical_scroll(self, *args):
+        """Scrollbar command for the vertical axis."""
+        self.move_view_to(self.scrollbar_target(args, self.top_row, self.rows, self.view_rows), self.left_col)
+
+    def on_horizontal_scroll(self, *args):
+        """Scrollbar command for the horizontal axis."""
+        self.move_view_to(self.top_row, self.scrollbar_target(args, self.left_col, self.cols, self.view_cols))
+
+    def scrollbar_target(self, args, current, total, visible):
+        """Translates Tk scrollbar arguments ('moveto'/'scroll') into a first visible index."""
+        if args[0] == 'moveto':
+            return int(float(args[1]) * total)
+        if args[0] == 'scroll':
+            step = visible if args[2] == 'pages' else 1
+            return current + int(args[1]) * step
+        return current
+
+    def on_mouse_wheel(self, event, horizontal=False):
+        """Scrolls with the mouse wheel (Windows/macOS)."""
+        steps = -3 if event.delta > 0 else 3
+        if horizontal:
+            self.scroll_view(0, steps)
+        else:
+            self.scroll_view(steps, 0)
+
+    def on_drag_start(self, event):
+        """Remembers where a middle-button pan started."""
+        self.drag_origin = (event.x, event.y, self.top_row, self.left_col)
+
+    def on_drag_motion(self, event):
+        """Pans the view while dragging with the middle button."""
+        x, y, top_row, left_col = self.drag_origin
+        self.move_view_to(top_row - (event.y - y) // self.CELL_SIZE, left_col - (event.x - x) // self.CELL_SIZE)
+
+    def on_minimap_click(self, event):
+        """Centers the view on the clicked minimap position."""
+        r = event.y * self.rows // self.minimap_height
+        c = event.x * self.cols // self.minimap_width
+        self.move_view_to(r - self.view_rows // 2, c - self.view_cols // 2)
+
+    def on_canvas_click(self, event, button_type):
+        """Maps a click on the canvas to a board cell."""
+        self.canvas.focus_set()
+        r = self.top_row + event.y // self.CELL_SIZE
+        c = self.left_col + event.x // self.CELL_SIZE
+        if 0 <= r < self.rows and 0 <= c < self.cols:
+            self.handle_click(r, c, button_type)
+
+    # --- Hint / auto-play analysis (worker thread) ---
+
+    def start_analysis(self, action):
+        """Starts a background analysis; action is 'hint' or 'auto'."""
+        if self.game is None or self.game.get_game_state() != 'playing':
+            return
+
+        self.cancel_analysis()
+        cancel_event = threading.Event()
+        self.analysis_cancel = cancel_event
+        generation = self.analysis_generation
+        self.status_label.config(text="Thinking...", fg='black')
+
+        if self.solver is None or self.solver.game is not self.game:
+            from minesweeper_solver import MinesweeperSolver
+            self.solver = MinesweeperSolver(self.game)
+
+        worker = threading.Thread(target=self.analysis_worker, args=(generation, action, self.solver, cancel_event),
+                                  daemon=True)
+        worker.start()
+
+        if not self.analysis_polling:
+            self.analysis_polling = True
+            self.master.after(self.ANALYSIS_POLL_MS, self.poll_analysis)
+
+    def cancel_analysis(self):
+        """Stops the analysis in flight, if any, and invalidates its pending result."""
+        self.analysis_generation += 1
+        if self.analysis_cancel is not None:
+            self.analysis_cancel.set()
+            self.analysis_cancel = None
+
+    def analysis_worker(self, generation, action, solver, cancel_event):
+        """Runs in the worker thread. Only reads the game; never touches Tk widgets."""
+        result = solver.analyze(cancel_event)
+        if result is not None:
+            self.analysis_queue.put((generation, action, result))
+
+    def poll_analysis(self):
+        """Runs on the Tk main loop: applies finished analyses and keeps polling while one is running."""
+        while True:
+            try:
+                generation, action, (safe, mines) = self.analysis_queue.get_nowait()
+            except queue.Empty:
+                break
+            if generation == self.analysis_generation:
+                self.analysis_cancel = None
+                self.apply_analysis(action, safe, mines)
+
+        if self.analysis_cancel is not None:
+            self.master.after(self.ANALYSIS_POLL_MS, self.poll_analysis)
+        else:
+            self.analysis_polling = False
+
+    def apply_analysis(self, action, safe, mines):
+        """Shows a hint or reveals every proven safe cell."""
+        safe = sorted(cell for cell in safe if self.game.get_cell_state(*cell) == 'unrevealed')
+
+        if not safe:
+            if mines:
+                r, c = min(mines)
+                self.status_label.config(text=f"No safe move. ({r}, {c}) is a mine", fg='black')
+            else:
+                self.status_label.config(text="No safe move found", fg='black')
+            return
+
+        if action == 'hint':
+            r, c = safe[0]
+            self.status_label.config(text=f"Hint: ({r}, {c}) is safe", fg='black')
+            self.highlight_cell(r, c)
+            return
+
+        game_state_changed = False
+        for r, c in safe:
+            if self.game.reveal_cell(r, c):
+                game_state_changed = True
+                break
+
+        self.status_label.config(text="Game in Progress", fg='black')
+        self.update_gui()
+
+        if game_state_changed:
+            self.end_game_message()
+        else:
+            # Newly revealed numbers may prove more cells safe
+            self.start_analysis('auto')
+
+    def highlight_cell(self, r, c):
+        """Marks a hinted cell until the next redraw."""
+        if not self.viewport_mode:
+            self.buttons[r][c].config(bg='lightgreen')
+            return
+
+        if not (self.top_row <= r < self.top_row + self.view_rows and self.left_col <= c < self.left_col + self.view_cols):
+            self.move_view_to(r - self.view_rows // 2, c - self.view_cols // 2)
+        vr, vc = r - self.top_row, c - self.left_col
+        rect, _ = self.cell_items[vr][vc]
+        self.canvas.itemconfig(rect, fill='lightgreen')
+        # Forget the cached look so the next draw restores the normal color
+        self.drawn_cells[vr][vc] = None
+
     def end_game_message(self):
         """Displays the win/loss message and updates the status label."""
+        from tkinter import messagebox
+
         state = self.game.get_game_state()
         
         if state == 'won':
@@ -144,6 +626,12 @@ class MinesweeperGUI:
         self.update_gui()
 
 if __name__ == '__main__':
+    started = time.perf_counter()
     root = tk.Tk()
     app = MinesweeperGUI(root)
+    # Time to first interactive frame
+    root.after_idle(app.record_app_latency, 'startup', started)
+    # Optional custom board: python minesweeper_gui.py ROWS COLS MINES
+    if len(sys.argv) == 4:
+        app.start_game(*(int(arg) for arg in sys.argv[1:]))
     root.mainloop()
\ No newline at end of file
@@ -0,0 +1,138 @@
+import threading
+
+class MinesweeperSolver:
+    """
+    Deduces safe cells and mines from what the player can see.
+    Only uses get_cell_state(), so it never peeks at hidden mine positions.
+    Designed to run in a worker thread: pass a threading.Event as cancel_event
+    and analyze() returns None as soon as it is set.
+
+    Keep one solver per game: it follows the game's revealed_numbers log and only
+    looks at the frontier (numbers next to hidden cells), so an analysis costs the
+    size of the frontier rather than the size of the board.
+    """
+    def __init__(self, game, cancel_event=None):
+        self.game = game
+        self.rows, self.cols = game.get_board_dimensions()
+        self.cancel_event = cancel_event
+        # Revealed numbers that may still touch hidden cells, and how much of the log was read
+        self.frontier = set()
+        self.log_position = 0
+        # A cancelled analysis may still be finishing when the next one starts
+        self.lock = threading.Lock()
+
+    def _cancelled(self):
+        return self.cancel_event is not None and self.cancel_event.is_set()
+
+    def _neighbors(self, r, c):
+        """Yields the coordinates of the cells around (r, c)."""
+        for dr in [-1, 0, 1]:
+            for dc in [-1, 0, 1]:
+                nr, nc = r + dr, c + dc
+                if (dr or dc) and 0 <= nr < self.rows and 0 <= nc < self.cols:
+                    yield nr, nc
+
+    def _update_frontier(self):
+        """Adds the numbers revealed since the last analysis to the frontier."""
+        revealed = self.game.revealed_numbers
+        end = len(revealed)
+        self.frontier.update(revealed[self.log_position:end])
+        self.log_position = end
+
+    def _collect_constraints(self):
+        """
+        Builds one constraint per frontier number touching hidden cells:
+        (set of hidden neighbor coordinates, number of mines among them).
+        Numbers with no hidden neighbors left are dropped from the frontier for good,
+        since revealed cells never become hidden again. Returns None if cancelled.
+        """
+        constraints = []
+        for index, (r, c) in enumerate(list(self.frontier)):
+            if index % 1000 == 0 and self._cancelled():
+                return None
+            hidden = set()
+            for nr, nc in self._neighbors(r, c):
+                if self.game.get_cell_state(nr, nc) in ('unrevealed', 'flagged'):
+                    hidden.add((nr, nc))
+            if hidden:
+                constraints.append((hidden, self.game.get_cell_state(r, c)))
+            else:
+                self.frontier.discard((r, c))
+        return constraints
+
+    def analyze(self, cancel_event=None):
+        """
+        Returns (safe_cells, mine_cells) as sets of (row, col), or None if cancelled.
+        Player flags are ignored: mines are only reported when they can be proven.
+        cancel_event, if given, replaces the one passed to the constructor.
+        """
+        with self.lock:
+            if cancel_event is not None:
+                self.cancel_event = cancel_event
+            return self._analyze()
+
+    def _analyze(self):
+        if self.game.get_game_state() != 'playing':
+            return set(), set()
+
+        # Before the first click nothing is known, but the first cell revealed is always safe
+        if self.game.revealed_count == 0:
+            return {(self.rows // 2, self.cols // 2)}, set()
+
+        self._update_frontier()
+        constraints = self._collect_constraints()
+        if constraints is None:
+            return None
+
+        safe, mines = set(), set()
+        changed = True
+        while changed:
+            if self._cancelled():
+                return None
+            changed = False
+
+            # Reduce every constraint by what has already been proven
+            reduced = []
+            for hidden, value in constraints:
+                unknown = hidden - safe - mines
+                remaining = value - len(hidden & mines)
+                if unknown:
+                    reduced.append((unknown, remaining))
+            constraints = reduced
+
+            # Single-point rule: all hidden neighbors are either safe or mines
+            for unknown, remaining in constraints:
+                if remaining == 0:
+                    safe |= unknown
+                    changed = True
+                elif remaining == len(unknown):
+                    mines |= unknown
+                    changed = True
+            if changed:
+                continue
+
+            # Subset rule: if A is inside B, the cells of B - A hold the difference in mines
+            by_cell = {}
+            for index, (unknown, _) in enumerate(constraints):
+                for cell in unknown:
+                    by_cell.setdefault(cell, []).append(index)
+            for index, (small, small_value) in enumerate(constraints):
+                if self._cancelled():
+                    return None
+                candidates = set()
+                for cell in small:
+                    candidates.update(by_cell[cell])
+                for other in candidates:
+                    big, big_value = constraints[other]
+                    if other == index or len(big) <= len(small) or not small <= big:
+                        continue
+                    rest = big - small
+                    if big_value == small_value:
+                        safe |= rest
+                        changed = True
+                    elif big_value - small_value == len(rest):
+                        mines |= rest
+                        changed = True
+
+        return safe, mines
+
@@ -0,0 +1,201 @@
+import os
+import json
+import time
+import argparse
+import threading
+import contextvars
+from contextlib import contextmanager
+
+COUNTERS = ('llm_calls', 'llm_seconds', 'prompt_tokens', 'completion_tokens', 'retries', 'test_seconds')
+
+# Spans open in the current thread (or task), outermost first
+_active_spans = contextvars.ContextVar('active_spans', default=())
+
+class Span:
+    """One timed pipeline stage with its counters (LLM calls, tokens, retries, test time)."""
+    def __init__(self, metrics, stage, issue=None, parent=None, attrs=None):
+        self.metrics = metrics
+        self.stage = stage
+        self.issue = issue if issue is not None else (parent.issue if parent else None)
+        self.parent = parent.stage if parent else None
+        self.attrs = attrs or {}
+        self.counters = dict.fromkeys(COUNTERS, 0)
+        self.started_at = time.time()
+        self._start = time.perf_counter()
+        self._split_start = self._start
+        self._split_counters = dict(self.counters)
+
+    def add(self, counter, value=1):
+        self.counters[counter] += value
+
+    def split(self, stage, **attrs):
+        """
+        Emits a child span covering the time since the previous split (or the start),
+        e.g. one span per crew task from a task callback.
+        """
+        now = time.perf_counter()
+        child = Span(self.metrics, stage, self.issue, self, attrs)
+        child.started_at = self.started_at + (self._split_start - self._start)
+        child.counters = {name: self.counters[name] - self._split_counters[name] for name in COUNTERS}
+        self.metrics._emit(child, now - self._split_start, 'ok')
+        self._split_start = now
+        self._split_counters = dict(self.counters)
+
+class PipelineMetrics:
+    """
+    Structured spans for the agent runner's stages (poll, crew tasks, tests, fixes,
+    git/PR). Each finished span is appended to a JSON lines file, and per-stage
+    totals are rewritten to a Prometheus text file.
+    """
+    def __init__(self, jsonl_path='.ai_cache/metrics/spans.jsonl', prom_path='.ai_cache/metrics/metrics.prom'):
+        self.jsonl_path = jsonl_path
+        self.prom_path = prom_path
+        self.lock = threading.Lock()
+        # stage -> {'count', 'errors', 'duration', counters...}
+        self.totals = {}
+
+    @contextmanager
+    def span(self, stage, issue=None, **attrs):
+        """Times the block as `stage`. Counters added inside also count for the enclosing spans."""
+        active = _active_spans.get()
+        span = Span(self, stage, issue, active[-1] if active else None, attrs)
+        token = _active_spans.set(active + (span,))
+        status = 'ok'
+        try:
+            yield span
+        except BaseException:
+            status = 'error'
+            raise
+        finally:
+            _active_spans.reset(token)
+            self._emit(span, time.perf_counter() - span._start, status)
+
+    def add(self, counter, value=1):
+        """Adds to a counter of every span open in the current thread."""
+        for span in _active_spans.get():
+            span.add(counter, value)
+
+    def record_llm_call(self, prompt_tokens=0, completion_tokens=0, seconds=0):
+        self.add('llm_calls')
+        self.add('llm_seconds', seconds)
+        self.add('prompt_tokens', prompt_tokens)
+        self.add('completion_tokens', completion_tokens)
+
+    def _emit(self, span, duration, status):
+        record = {
+            'stage': span.stage,
+            'issue': span.issue,
+            'parent': span.parent,
+            'start': round(span.started_at, 3),
+            'duration': round(duration, 4),
+            'status': status,
+        }
+        record.update({name: round(value, 4) for name, value in span.counters.items()})
+        record.update(span.attrs)
+
+        with self.lock:
+            totals = self.totals.setdefault(span.stage, dict.fromkeys(('count', 'errors', 'duration') + COUNTERS, 0))
+            totals['count'] += 1
+            totals['errors'] += status != 'ok'
+            totals['duration'] += duration
+            for name in COUNTERS:
+                totals[name] += span.counters[name]
+
+            if self.jsonl_path:
+                os.makedirs(os.path.dirname(self.jsonl_path) or '.', exist_ok=True)
+                with open(self.jsonl_path, 'a', encoding='utf-8') as f:
+                    f.write(json.dumps(record, default=str) + "\n")
+            if self.prom_path:
+                os.makedirs(os.path.dirname(self.prom_path) or '.', exist_ok=True)
+                temp_path = self.prom_path + '.tmp'
+                with open(temp_path, 'w', encoding='utf-8') as f:
+                    f.write(self._prometheus_text())
+                os.replace(temp_path, self.prom_path)
+
+    def prometheus_text(self):
+        with self.lock:
+            return self._prometheus_text()
+
+    def _prometheus_text(self):
+        metrics = [
+            ('agent_stage_duration_seconds', 'summary', "Time spent in each pipeline stage.", None),
+            ('agent_stage_errors_total', 'counter', "Stages that ended with an exception.", 'errors'),
+            ('agent_stage_llm_calls_total', 'counter', "LLM calls made during each stage.", 'llm_calls'),
+            ('agent_stage_llm_seconds_total', 'counter', "Time spent waiting for model responses during each stage.", 'llm_seconds'),
+            ('agent_stage_tokens_total', 'counter', "LLM tokens used during each stage.", None),
+            ('agent_stage_retries_total', 'counter', "Fix iterations during each stage.", 'retries'),
+            ('agent_stage_test_seconds_total', 'counter', "Test run time during each stage.", 'test_seconds'),
+        ]
+        lines = []
+        for name, kind, description, field in metrics:
+            lines.append(f"# HELP {name} {description}")
+            lines.append(f"# TYPE {name} {kind}")
+            for stage, totals in sorted(self.totals.items()):
+                label = f'stage="{stage}"'
+                if name == 'agent_stage_duration_seconds':
+                    lines.append(f"{name}_sum{{{label}}} {totals['duration']:.4f}")
+                    lines.append(f"{name}_count{{{label}}} {totals['count']}")
+                elif name == 'agent_stage_tokens_total':
+                    lines.append(f'{name}{{{label},kind="prompt"}} {totals["prompt_tokens"]}')
+                    lines.append(f'{name}{{{label},kind="completion"}} {totals["completion_tokens"]}')
+                else:
+                    lines.append(f"{name}{{{label}}} {totals[field]:g}")
+        return "\n".join(lines) + "\n"
+
+def load_spans(path):
+    spans = []
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            line = line.strip()
+            if line:
+                try:
+                    spans.append(json.loads(line))
+                except ValueError:
+                    continue
+    return spans
+
+def report(spans, top=5):
+    """Text summary: time and cost per stage, then the slowest and most expensive issues."""
+    stages = {}
+    for span in spans:
+        entry = stages.setdefault(span['stage'], {'count': 0, 'errors': 0, 'durations': [], 'llm_calls': 0, 'tokens': 0})
+        entry['count'] += 1
+        entry['errors'] += span.get('status') != 'ok'
+        entry['durations'].append(span['duration'])
+        entry['llm_calls'] += span.get('llm_calls', 0)
+        entry['tokens'] += span.get('prompt_tokens', 0) + span.get('completion_tokens', 0)
+
+    lines = [f"{'stage':<16}{'count':>7}{'total s':>10}{'mean s':>9}{'max s':>9}{'llm':>7}{'tokens':>10}{'errors':>8}"]
+    for stage, entry in sorted(stages.items(), key=lambda item: -sum(item[1]['durations'])):
+        total = sum(entry['durations'])
+        lines.append(f"{stage:<16}{entry['count']:>7}{total:>10.1f}{total / entry['count']:>9.1f}"
+                     f"{max(entry['durations']):>9.1f}{entry['llm_calls']:>7}{entry['tokens']:>10}{entry['errors']:>8}")
+
+    issues = [span for span in spans if span['stage'] == 'issue']
+    if issues:
+        lines.append("")
+        lines.append("Most expensive issues:")
+        issues.sort(key=lambda span: (-(span.get('prompt_tokens', 0) + span.get('completion_tokens', 0)),
+                                      -span['duration']))
+        for span in issues[:top]:
+            tokens = span.get('prompt_tokens', 0) + span.get('completion_tokens', 0)
+            lines.append(f"  #{span['issue']}: {span['duration']:.1f}s, {span.get('llm_calls', 0)} LLM calls, "
+                         f"{tokens} tokens, {span.get('retries', 0)} retries, {span.get('test_seconds', 0):.1f}s tests")
+    return "\n".join(lines)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Agent runner pipeline metrics.")
+    parser.add_argument('command', choices=['report'], help="'report': time and cost per stage and issue")
+    parser.add_argument('spans', nargs='?', default=os.path.join('.ai_cache', 'metrics', 'spans.jsonl'),
+                        help="spans file (default: .ai_cache/metrics/spans.jsonl)")
+    parser.add_argument('--top', type=int, default=5, help="issues listed in the report")
+    args = parser.parse_args(argv)
+
+    if not os.path.exists(args.spans):
+        print(f"No spans recorded yet ({args.spans})")
+        return
+    print(report(load_spans(args.spans), top=args.top))
+
+
+if __name__ == "__main__":
+    main()
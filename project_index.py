@@ -0,0 +1,200 @@
+import os
+import ast
+import json
+import hashlib
+import threading
+from impact_selection import IGNORED_DIRS, module_name_for, imports_of
+
+def _signature(node):
+    try:
+        return f"{node.name}({ast.unparse(node.args)})"
+    except Exception:
+        return f"{node.name}(...)"
+
+def _first_line(node):
+    doc = ast.get_docstring(node)
+    return doc.strip().splitlines()[0] if doc and doc.strip() else ''
+
+def analyze_python(source, module_name, is_package):
+    """Docstring summary, top-level classes (with methods) and functions, and imports of a module."""
+    try:
+        tree = ast.parse(source)
+    except SyntaxError as e:
+        return {'doc': '', 'symbols': [], 'imports': [], 'error': f"SyntaxError line {e.lineno}"}
+    symbols = []
+    for node in tree.body:
+        if isinstance(node, ast.ClassDef):
+            methods = [_signature(item) for item in node.body if isinstance(item, (ast.FunctionDef, ast.AsyncFunctionDef))]
+            symbols.append({'kind': 'class', 'name': node.name, 'line': node.lineno,
+                            'doc': _first_line(node), 'methods': methods})
+        elif isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)):
+            symbols.append({'kind': 'function', 'name': node.name, 'line': node.lineno,
+                            'signature': _signature(node), 'doc': _first_line(node)})
+    return {'doc': _first_line(tree), 'symbols': symbols,
+            'imports': sorted(imports_of(source, module_name, is_package))}
+
+def _analysis_key(relative, digest):
+    # Relative imports resolve against the file's own package, so identical files
+    # at different paths get separate analyses
+    return f"{digest}:{relative}"
+
+def _normalize(path):
+    path = path.strip().replace('\\', '/')
+    while path.startswith('./'):
+        path = path[2:]
+    return path
+
+class ProjectIndex:
+    """
+    Incremental index of a project: file tree with sizes and, for Python files,
+    symbols and import edges. Files are re-read only when their size or mtime
+    changes and re-analysed only when their content hash or path changes; the index is
+    persisted to cache_path so later runs start from it.
+    """
+    def __init__(self, root, cache_path=None):
+        self.root = os.path.abspath(root)
+        self.cache_path = cache_path
+        self.lock = threading.Lock()
+        # relative path -> {'size', 'mtime', 'hash'}
+        self.files = {}
+        # content hash + relative path -> analysis of a Python file
+        self.analyses = {}
+        self.analyzed_files = 0
+        if cache_path and os.path.exists(cache_path):
+            try:
+                with open(cache_path, 'r', encoding='utf-8') as f:
+                    data = json.load(f)
+                self.files = data.get('files', {})
+                self.analyses = data.get('analyses', {})
+            except (OSError, ValueError):
+                pass
+
+    def _walk(self):
+        for folder, dirs, files in os.walk(self.root):
+            dirs[:] = sorted(d for d in dirs if d not in IGNORED_DIRS and not d.startswith('.'))
+            for name in sorted(files):
+                path = os.path.join(folder, name)
+                yield os.path.relpath(path, self.root).replace(os.sep, '/'), path
+
+    def refresh(self):
+        """Brings the index up to date with the files on disk. Returns self."""
+        with self.lock:
+            fresh = {}
+            for relative, path in self._walk():
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    continue
+                known = self.files.get(relative)
+                if known and known['size'] == stat.st_size and known['mtime'] == stat.st_mtime_ns:
+                    fresh[relative] = known
+                    continue
+                try:
+                    with open(path, 'rb') as f:
+                        content = f.read()
+                except OSError:
+                    continue
+                digest = hashlib.sha256(content).hexdigest()
+                fresh[relative] = {'size': stat.st_size, 'mtime': stat.st_mtime_ns, 'hash': digest}
+                key = _analysis_key(relative, digest)
+                if relative.endswith('.py') and key not in self.analyses:
+                    self.analyzed_files += 1
+                    self.analyses[key] = analyze_python(content.decode('utf-8', errors='replace'),
+                                                           module_name_for(relative), relative.endswith('__init__.py'))
+            self.files = fresh
+            # Drop analyses no file refers to any more
+            used = {_analysis_key(relative, info['hash']) for relative, info in fresh.items()}
+            self.analyses = {key: analysis for key, analysis in self.analyses.items() if key in used}
+            self._save()
+        return self
+
+    def _save(self):
+        if not self.cache_path:
+            return
+        os.makedirs(os.path.dirname(self.cache_path) or '.', exist_ok=True)
+        temp_path = self.cache_path + '.tmp'
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump({'files': self.files, 'analyses': self.analyses}, f)
+        os.replace(temp_path, self.cache_path)
+
+    def analysis(self, path):
+        info = self.files.get(path)
+        return self.analyses.get(_analysis_key(path, info['hash'])) if info else None
+
+    # --- Queries (plain text for the agents) ---
+
+    def tree(self, hidden=()):
+        """Every file with its size, indented by folder."""
+        lines = []
+        shown_folders = set()
+        for path, info in sorted(self.files.items()):
+            if os.path.basename(path) in hidden:
+                continue
+            parts = path.split('/')
+            for depth in range(1, len(parts)):
+                folder = '/'.join(parts[:depth])
+                if folder not in shown_folders:
+                    shown_folders.add(folder)
+                    lines.append(f"{'  ' * (depth - 1)}{parts[depth - 1]}/")
+            lines.append(f"{'  ' * (len(parts) - 1)}{parts[-1]} ({info['size']} B)")
+        return "\n".join(lines) if lines else "Directory is empty (New Project)."
+
+    def outline(self, path):
+        """Summary of one file: docstring, classes with methods, functions, imports."""
+        path = _normalize(path)
+        info = self.files.get(path)
+        if info is None:
+            return f"⚠️ '{path}' is not in the project index."
+        analysis = self.analysis(path)
+        if analysis is None:
+            return f"{path}: {info['size']} B (not a Python file)"
+        lines = [f"{path} ({info['size']} B){' - ' + analysis['doc'] if analysis['doc'] else ''}"]
+        if analysis.get('error'):
+            lines.append(f"  ⚠️ {analysis['error']}")
+        for symbol in analysis['symbols']:
+            doc = f"  # {symbol['doc']}" if symbol['doc'] else ''
+            if symbol['kind'] == 'class':
+                lines.append(f"  class {symbol['name']} (line {symbol['line']}){doc}")
+                lines.extend(f"    def {method}" for method in symbol['methods'])
+            else:
+                lines.append(f"  def {symbol['signature']} (line {symbol['line']}){doc}")
+        project_modules = {module_name_for(p) for p in self.files if p.endswith('.py')}
+        imports = [name for name in analysis['imports'] if name in project_modules]
+        if imports:
+            lines.append(f"  imports: {', '.join(imports)}")
+        return "\n".join(lines)
+
+    def find(self, name):
+        """Files defining a class, function or method called `name`."""
+        hits = []
+        for path in sorted(self.files):
+            analysis = self.analysis(path)
+            for symbol in (analysis or {}).get('symbols', []):
+                if symbol['name'] == name:
+                    hits.append(f"{path}:{symbol['line']} {symbol['kind']} {symbol['name']}")
+                elif any(method.split('(')[0] == name for method in symbol.get('methods', [])):
+                    hits.append(f"{path}:{symbol['line']} method {symbol['name']}.{name}")
+        return "\n".join(hits) if hits else f"No definition of '{name}' found."
+
+    def importers(self, module):
+        """Project files that import `module` (a dotted name or a path like 'app/game.py')."""
+        if module.endswith('.py'):
+            module = module_name_for(module)
+        paths = [path for path in sorted(self.files)
+                 if module in ((self.analysis(path) or {}).get('imports') or ())]
+        return "\n".join(paths) if paths else f"No file imports '{module}'."
+
+    def query(self, command, hidden=()):
+        """'tree', 'outline <path>', 'find <name>' or 'importers <module>'."""
+        self.refresh()
+        action, _, argument = command.strip().partition(' ')
+        argument = argument.strip()
+        if action == 'tree' or not action:
+            return self.tree(hidden)
+        if action == 'outline' and argument:
+            return "\n\n".join(self.outline(path) for path in argument.split(','))
+        if action == 'find' and argument:
+            return self.find(argument)
+        if action == 'importers' and argument:
+            return self.importers(argument)
+        return "Unknown query. Use: 'tree', 'outline <path>[, <path>...]', 'find <name>' or 'importers <module>'."
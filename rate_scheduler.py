@@ -0,0 +1,106 @@
+import time
+import heapq
+import itertools
+import threading
+import contextvars
+from contextlib import contextmanager
+
+# Lower value = served first
+FIX_PRIORITY = 0
+NORMAL_PRIORITY = 1
+
+_current_priority = contextvars.ContextVar('rate_priority', default=NORMAL_PRIORITY)
+
+class TokenBucket:
+    """Refills at `rate_per_minute` tokens per minute, holding at most `capacity` tokens."""
+    def __init__(self, rate_per_minute, capacity=1, clock=time.monotonic):
+        self.rate = rate_per_minute / 60.0
+        self.capacity = capacity
+        self.clock = clock
+        self.tokens = capacity
+        self.updated = clock()
+
+    def _refill(self):
+        now = self.clock()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait_time(self):
+        """Seconds until a token is available (0 if one is available now)."""
+        self._refill()
+        if self.tokens >= 1:
+            return 0.0
+        return (1 - self.tokens) / self.rate
+
+    def take(self):
+        self._refill()
+        self.tokens -= 1
+
+class RateScheduler:
+    """
+    Process-wide request scheduler shared by every agent and model client:
+    one token bucket per model, and callers waiting for the same model are
+    served by priority (fix tasks before fresh work), then in arrival order.
+    """
+    def __init__(self, limits, burst=1, clock=time.monotonic):
+        self.clock = clock
+        self.buckets = {model: TokenBucket(rpm, burst, clock) for model, rpm in limits.items()}
+        self.condition = threading.Condition()
+        self.queues = {model: [] for model in limits}
+        self.counter = itertools.count()
+        self.metrics = {model: {'granted': 0, 'max_waiting': 0, 'total_wait': 0.0} for model in limits}
+
+    @contextmanager
+    def priority(self, priority):
+        """Requests made inside the block (in this thread or task) use `priority`."""
+        token = _current_priority.set(priority)
+        try:
+            yield
+        finally:
+            _current_priority.reset(token)
+
+    def acquire(self, model, priority=None, blocking=True):
+        """
+        Takes one request slot for `model`, waiting for its turn if blocking.
+        Returns False only when not blocking and no slot is free. Unknown models are not limited.
+        """
+        if model not in self.buckets:
+            return True
+        if priority is None:
+            priority = _current_priority.get()
+        bucket = self.buckets[model]
+        queue = self.queues[model]
+        metrics = self.metrics[model]
+
+        with self.condition:
+            if not blocking:
+                if queue or bucket.wait_time() > 0:
+                    return False
+                bucket.take()
+                metrics['granted'] += 1
+                return True
+
+            ticket = (priority, next(self.counter))
+            heapq.heappush(queue, ticket)
+            metrics['max_waiting'] = max(metrics['max_waiting'], len(queue))
+            start = self.clock()
+            while True:
+                if queue[0] == ticket:
+                    wait = bucket.wait_time()
+                    if wait <= 0:
+                        bucket.take()
+                        heapq.heappop(queue)
+                        metrics['granted'] += 1
+                        metrics['total_wait'] += self.clock() - start
+                        # The next caller in line becomes the head
+                        self.condition.notify_all()
+                        return True
+                    self.condition.wait(wait)
+                else:
+                    self.condition.wait()
+
+    def stats(self):
+        """Queue depth and grants per model."""
+        with self.condition:
+            return {model: dict(metrics, waiting=len(self.queues[model]))
+                    for model, metrics in self.metrics.items()}
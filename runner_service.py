@@ -0,0 +1,417 @@
+import os
+import sys
+import json
+import time
+import codecs
+import shutil
+import signal
+import hashlib
+import tempfile
+import threading
+import subprocess
+
+DEFAULT_START_DIR = 'tests'
+DEFAULT_PATTERN = 'test_*.py'
+# The runner's own checkout: never importable from the tests of a worktree
+RUNNER_DIR = os.path.dirname(os.path.abspath(__file__))
+
+def requirements_hash(workdir):
+    """Hash of requirements.txt, identifying the dependency layer a project needs."""
+    path = os.path.join(workdir, 'requirements.txt')
+    content = b''
+    if os.path.exists(path):
+        with open(path, 'rb') as f:
+            content = f.read()
+    return hashlib.sha256(content).hexdigest()[:16]
+
+def unittest_args(start_dir, pattern, tests, stream=False):
+    """
+    Arguments after 'python -m unittest': explicit test modules, or discovery.
+    Streamed runs are verbose (one line per finished test) and catch Ctrl-C, so an
+    interrupt stops the run after the current test and still prints the report.
+    """
+    flags = ['-v', '-c'] if stream else []
+    if tests:
+        return flags + list(tests)
+    return ['discover'] + flags + ['-s', start_dir, '-p', pattern]
+
+def has_requirements(workdir):
+    """True if requirements.txt lists at least one package."""
+    path = os.path.join(workdir, 'requirements.txt')
+    if not os.path.exists(path):
+        return False
+    with open(path, 'r', encoding='utf-8', errors='replace') as f:
+        return any(line.strip() and not line.strip().startswith('#') for line in f)
+
+def dockerfile_for(base_image, with_requirements):
+    """Dockerfile of a runner image: the base image plus the project's requirements, if any."""
+    lines = [f"FROM {base_image}"]
+    if with_requirements:
+        lines += ["COPY requirements.txt /tmp/requirements.txt",
+                  "RUN pip install --no-cache-dir -r /tmp/requirements.txt"]
+    return "\n".join(lines) + "\n"
+
+class DockerTestRunner:
+    """
+    Keeps one long-lived container per requirements hash and runs each validation
+    through 'docker exec'. The dependencies are baked into an image tagged with the
+    hash (ai-test-runner:<hash>), built once, so a restarted container comes back
+    with them already installed. The repository root is mounted so every issue
+    worktree under it is visible in the container.
+    """
+    IMAGE = 'python:3.10-slim'
+    IMAGE_REPOSITORY = 'ai-test-runner'
+
+    def __init__(self, mount_root):
+        self.mount_root = os.path.abspath(mount_root)
+        self.lock = threading.Lock()
+        # requirements hash -> lock held while its image or container is being prepared
+        self.hash_locks = {}
+
+    def _docker(self, *args, input=None):
+        return subprocess.run(['docker', *args], capture_output=True, input=input)
+
+    def _hash_lock(self, deps_hash):
+        with self.lock:
+            return self.hash_locks.setdefault(deps_hash, threading.Lock())
+
+    def _image_for(self, workdir, deps_hash):
+        """Returns the runner image for a requirements hash, building it the first time."""
+        tag = f"{self.IMAGE_REPOSITORY}:{deps_hash}"
+        if self._docker('image', 'inspect', tag).returncode == 0:
+            return tag
+        with_requirements = has_requirements(workdir)
+        with tempfile.TemporaryDirectory() as context:
+            if with_requirements:
+                shutil.copy(os.path.join(workdir, 'requirements.txt'), os.path.join(context, 'requirements.txt'))
+            built = self._docker('build', '-q', '-t', tag, '-f', '-', context,
+                                 input=dockerfile_for(self.IMAGE, with_requirements).encode('utf-8'))
+        if built.returncode != 0:
+            raise RuntimeError(built.stderr.decode('utf-8', errors='replace'))
+        return tag
+
+    def _container_for(self, workdir):
+        deps_hash = requirements_hash(workdir)
+        name = f"ai-test-runner-{deps_hash}"
+        # Only runs needing the same dependencies wait for a build
+        with self._hash_lock(deps_hash):
+            state = self._docker('inspect', '-f', '{{.State.Running}}', name)
+            if state.stdout.decode().strip() == 'true':
+                return name
+
+            image = self._image_for(workdir, deps_hash)
+            self._docker('rm', '-f', name)
+            started = self._docker('run', '-d', '--name', name, '-v', f"{self.mount_root}:/work",
+                                   '-w', '/work', image, 'sleep', 'infinity')
+            if started.returncode != 0:
+                raise RuntimeError(started.stderr.decode('utf-8', errors='replace'))
+            return name
+
+    def _container_path(self, workdir):
+        relative = os.path.relpath(os.path.abspath(workdir), self.mount_root).replace(os.sep, '/')
+        return '/work' if relative == '.' else f"/work/{relative}"
+
+    def run(self, workdir, start_dir=DEFAULT_START_DIR, pattern=DEFAULT_PATTERN, timeout=600, tests=None,
+            on_output=None):
+        """
+        Runs unittest in the warm container: the given test modules, or discovery.
+        Several runs may share the container at once. Returns (returncode, output).
+        With on_output, lines are passed to it as they arrive instead of being returned,
+        and the run is interrupted once on_output returns True.
+        """
+        name = self._container_for(workdir)
+        stream = on_output is not None
+        lines = []
+        returncode = self._exec_tests(name, workdir, start_dir, unittest_args(start_dir, pattern, tests, stream),
+                                      timeout, on_output if stream else lines.append)
+        return returncode, '' if stream else ''.join(lines)
+
+    def _exec_tests(self, name, workdir, start_dir, args, timeout, on_output):
+        """
+        Runs unittest in the container, passing each output line to on_output. Killing
+        the 'docker exec' client would leave the tests running in the container, so the
+        shell prints its pid before becoming the test process, and interrupts and
+        timeouts signal that process inside the container. The start dir is on the
+        path, as with discovery, so test modules can import their siblings.
+        """
+        process = subprocess.Popen(
+            ['docker', 'exec', '-w', self._container_path(workdir), '-e', f"PYTHONPATH={start_dir}:.", name,
+             'sh', '-c', 'echo $$; exec python -m unittest "$@"', 'sh', *args],
+            stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True, errors='replace')
+        first_line = process.stdout.readline()
+        pid = first_line.strip()
+        if not pid.isdigit():
+            # 'docker exec' failed before the shell started: that line is its error message
+            pid = None
+            if first_line:
+                on_output(first_line)
+
+        timed_out = threading.Event()
+
+        def kill():
+            timed_out.set()
+            self._signal(name, pid, 'KILL')
+            process.kill()
+
+        timer = threading.Timer(timeout, kill)
+        timer.start()
+        interrupted = False
+        try:
+            for line in process.stdout:
+                if on_output(line) and not interrupted:
+                    interrupted = True
+                    self._signal(name, pid, 'INT')
+            returncode = process.wait()
+        finally:
+            timer.cancel()
+        if timed_out.is_set():
+            on_output(f"\nTest run killed after {timeout}s\n")
+            return -9
+        return returncode
+
+    def _signal(self, name, pid, signal_name):
+        """Sends a signal to the test process inside the container."""
+        if pid is not None:
+            self._docker('exec', name, 'kill', f"-{signal_name}", pid)
+
+    def shutdown(self):
+        """Removes the runner containers (the images are kept for the next start)."""
+        listed = self._docker('ps', '-aq', '--filter', 'name=ai-test-runner-')
+        for container in listed.stdout.decode().split():
+            self._docker('rm', '-f', container)
+
+class LocalTestRunner:
+    """
+    Process stand-in for the Docker runner: persistent server processes per
+    requirements hash (dependencies installed once with 'pip install --target'
+    into cache_dir) receive test runs over a pipe and fork a child per run,
+    so each run starts from a warm interpreter with a clean module state.
+    Up to max_servers runs (e.g. test shards) execute at the same time.
+    """
+    def __init__(self, cache_dir='.ai_cache/test-deps', max_servers=None):
+        self.cache_dir = os.path.abspath(cache_dir)
+        self.max_servers = max_servers or os.cpu_count() or 1
+        # requirements hash -> list of (server process, lock held while it runs a job)
+        self.servers = {}
+        self.lock = threading.Lock()
+        # requirements hash -> lock held while its dependencies are installed
+        self.install_locks = {}
+
+    def _deps_dir(self, workdir):
+        deps_hash = requirements_hash(workdir)
+        deps_dir = os.path.join(self.cache_dir, deps_hash)
+        marker = os.path.join(deps_dir, '.installed')
+        with self.lock:
+            install_lock = self.install_locks.setdefault(deps_hash, threading.Lock())
+        # Only runs needing the same dependencies wait for an install
+        with install_lock:
+            if not os.path.exists(marker):
+                self._install(workdir, deps_dir, marker)
+        return deps_hash, deps_dir
+
+    def _install(self, workdir, deps_dir, marker):
+        """Installs requirements.txt into deps_dir and marks the layer as complete."""
+        os.makedirs(deps_dir, exist_ok=True)
+        if has_requirements(workdir):
+            result = subprocess.run([sys.executable, '-m', 'pip', 'install', '--quiet', '--target', deps_dir,
+                                     '-r', os.path.join(workdir, 'requirements.txt')], capture_output=True)
+            if result.returncode != 0:
+                raise RuntimeError(result.stderr.decode('utf-8', errors='replace'))
+        with open(marker, 'w') as f:
+            f.write('ok')
+
+    def _start_server(self, deps_dir):
+        env = dict(os.environ)
+        env['PYTHONPATH'] = os.pathsep.join(filter(None, [deps_dir, env.get('PYTHONPATH')]))
+        # Started from the deps dir, not the runner's checkout, so nothing there is picked up from the cwd
+        return subprocess.Popen([sys.executable, os.path.abspath(__file__), 'serve'], cwd=deps_dir,
+                                stdin=subprocess.PIPE, stdout=subprocess.PIPE, env=env, text=True)
+
+    def _acquire_server(self, workdir):
+        """Returns an idle (server, lock) pair with the lock held, starting servers as needed."""
+        deps_hash, deps_dir = self._deps_dir(workdir)
+        with self.lock:
+            pool = self.servers.setdefault(deps_hash, [])
+            pool[:] = [(server, lock) for server, lock in pool if server.poll() is None or lock.locked()]
+            for server, lock in pool:
+                if lock.acquire(blocking=False):
+                    return server, lock
+            if len(pool) < self.max_servers:
+                entry = (self._start_server(deps_dir), threading.Lock())
+                entry[1].acquire()
+                pool.append(entry)
+                return entry
+            server, lock = pool[0]
+        # Every server is busy: wait for the first one
+        lock.acquire()
+        return server, lock
+
+    def run(self, workdir, start_dir=DEFAULT_START_DIR, pattern=DEFAULT_PATTERN, timeout=600, tests=None,
+            on_output=None):
+        """
+        Sends a test run (given test modules, or discovery) to a warm server. Returns (returncode, output).
+        With on_output, lines are passed to it as they arrive instead of being returned,
+        and the run is interrupted once on_output returns True.
+        """
+        stream = on_output is not None
+        server, lock = self._acquire_server(workdir)
+        request = {'workdir': os.path.abspath(workdir), 'start_dir': start_dir,
+                   'args': unittest_args(start_dir, pattern, tests, stream), 'timeout': timeout, 'stream': stream}
+        try:
+            server.stdin.write(json.dumps(request) + "\n")
+            server.stdin.flush()
+            pid = None
+            partial = ''
+            interrupted = False
+            while True:
+                reply = server.stdout.readline()
+                if not reply:
+                    raise RuntimeError("test runner server stopped unexpectedly")
+                reply = json.loads(reply)
+                if 'returncode' in reply:
+                    break
+                if 'pid' in reply:
+                    pid = reply['pid']
+                    continue
+                # Output chunks may end mid-line
+                *lines, partial = (partial + reply['output']).split('\n')
+                for line in lines:
+                    if on_output(line) and not interrupted and pid:
+                        interrupted = True
+                        _interrupt(pid)
+        finally:
+            lock.release()
+        if stream and partial:
+            on_output(partial)
+        return reply['returncode'], reply['output']
+
+    def shutdown(self):
+        with self.lock:
+            for pool in self.servers.values():
+                for server, _ in pool:
+                    if server.poll() is None:
+                        server.stdin.close()
+                        server.wait(5)
+            self.servers.clear()
+
+def _interrupt(pid):
+    try:
+        os.kill(pid, signal.SIGINT)
+    except OSError:
+        pass
+
+def _isolate(workdir, start_dir):
+    """
+    Makes the worktree the only project code a test child can import: the server's
+    script dir leaves sys.path and modules loaded from it leave sys.modules, so a module
+    deleted or renamed in the worktree fails to import instead of loading the runner's copy.
+    The start dir goes first on sys.path, as discovery puts it, so explicitly named test
+    modules can still import their siblings ('from helpers import ...').
+    """
+    workdir = os.path.abspath(workdir)
+    sys.path[:] = [path for path in sys.path if os.path.abspath(path or '.') != RUNNER_DIR]
+    for name, module in list(sys.modules.items()):
+        path = os.path.abspath(getattr(module, '__file__', None) or os.devnull)
+        if name != '__main__' and path.startswith(RUNNER_DIR + os.sep) and not path.startswith(workdir + os.sep):
+            del sys.modules[name]
+    sys.path[:0] = [os.path.join(workdir, start_dir), workdir]
+
+def _run_tests_in_child(workdir, start_dir, args, timeout, emit=None):
+    """
+    Runs unittest with the given arguments in a forked child (or a subprocess where fork is unavailable).
+    With emit, the child's pid and then its output are passed to it while it runs,
+    and the returned output is empty.
+    """
+    if not hasattr(os, 'fork'):
+        result = subprocess.run([sys.executable, '-m', 'unittest', *args],
+                                cwd=workdir, capture_output=True, timeout=timeout,
+                                env=dict(os.environ, PYTHONPATH=os.pathsep.join(filter(None, [start_dir, '.', os.environ.get('PYTHONPATH')]))))
+        output = result.stdout.decode('utf-8', errors='replace') + "\n" + result.stderr.decode('utf-8', errors='replace')
+        if emit is not None:
+            emit({'output': output})
+            output = ''
+        return result.returncode, output
+
+    with tempfile.TemporaryFile() as log:
+        pid = os.fork()
+        if pid == 0:
+            code = 1
+            try:
+                os.dup2(log.fileno(), 1)
+                os.dup2(log.fileno(), 2)
+                os.chdir(workdir)
+                _isolate(workdir, start_dir)
+                import unittest
+                program = unittest.main(module=None, argv=['unittest', *args], exit=False)
+                code = 0 if program.result.wasSuccessful() else 1
+            except BaseException:
+                import traceback
+                traceback.print_exc()
+            finally:
+                sys.stdout.flush()
+                sys.stderr.flush()
+                os._exit(code)
+
+        if emit is not None:
+            emit({'pid': pid})
+        deadline = time.monotonic() + timeout
+        decoder = codecs.getincrementaldecoder('utf-8')(errors='replace')
+        sent = 0
+        returncode = None
+        while True:
+            done, status = os.waitpid(pid, os.WNOHANG)
+            if done:
+                returncode = os.waitstatus_to_exitcode(status)
+            elif time.monotonic() > deadline:
+                os.kill(pid, 9)
+                os.waitpid(pid, 0)
+                returncode = -9
+            if emit is not None:
+                # pread leaves the file offset the child writes at untouched
+                chunk = os.pread(log.fileno(), 1 << 20, sent)
+                while chunk:
+                    sent += len(chunk)
+                    emit({'output': decoder.decode(chunk)})
+                    chunk = os.pread(log.fileno(), 1 << 20, sent)
+            if returncode is not None:
+                break
+            time.sleep(0.02)
+
+        killed = f"\nTest run killed after {timeout}s\n" if returncode == -9 else ''
+        if emit is not None:
+            if killed:
+                emit({'output': killed})
+            return returncode, ''
+        log.seek(0)
+        output = log.read().decode('utf-8', errors='replace')
+        return returncode, output + killed
+
+def serve():
+    """Server loop used by LocalTestRunner: one JSON request per line on stdin, one reply per line on stdout."""
+    # Warm up what every run needs before the first request arrives
+    import unittest  # noqa: F401
+
+    def emit(message):
+        sys.stdout.write(json.dumps(message) + "\n")
+        sys.stdout.flush()
+
+    for line in sys.stdin:
+        request = json.loads(line)
+        try:
+            returncode, output = _run_tests_in_child(request['workdir'], request.get('start_dir', DEFAULT_START_DIR),
+                                                     request['args'], request['timeout'],
+                                                     emit if request.get('stream') else None)
+        except Exception as e:
+            returncode, output = 1, f"Test runner error: {e}"
+        sys.stdout.write(json.dumps({'returncode': returncode, 'output': output}) + "\n")
+        sys.stdout.flush()
+
+def create_test_runner(kind, mount_root):
+    """Builds the runner selected by AI_TEST_RUNNER: 'docker' (default) or 'local'."""
+    if kind == 'local':
+        return LocalTestRunner(os.path.join(mount_root, '.ai_cache', 'test-deps'))
+    return DockerTestRunner(mount_root)
+
+
+if __name__ == '__main__' and sys.argv[1:] == ['serve']:
+    serve()
@@ -0,0 +1,123 @@
+import os
+import shutil
+import subprocess
+import tempfile
+import threading
+import time
+import unittest
+from types import SimpleNamespace
+from agent_scheduler import IssueScheduler, WorktreeManager, branch_name_for, resolve_in_root
+
+def git(cwd, *args):
+    return subprocess.run(['git', *args], cwd=cwd, capture_output=True, text=True, check=True).stdout
+
+class TestWorktreeManager(unittest.TestCase):
+
+    def setUp(self):
+        self.repo = tempfile.mkdtemp()
+        git(self.repo, 'init', '-q', '-b', 'main')
+        git(self.repo, 'config', 'user.email', 'test@example.com')
+        git(self.repo, 'config', 'user.name', 'Test')
+        with open(os.path.join(self.repo, 'game.py'), 'w') as f:
+            f.write("print('hi')\n")
+        git(self.repo, 'add', '.')
+        git(self.repo, 'commit', '-q', '-m', 'init')
+        self.manager = WorktreeManager(self.repo)
+
+    def tearDown(self):
+        shutil.rmtree(self.repo, ignore_errors=True)
+
+    def test_parallel_worktrees_are_isolated(self):
+        path_a = self.manager.create(1, branch_name_for(1, "First"))
+        path_b = self.manager.create(2, branch_name_for(2, "Second"))
+
+        with open(os.path.join(path_a, 'game.py'), 'w') as f:
+            f.write("print('changed')\n")
+
+        # The other worktree and the shared checkout are untouched
+        with open(os.path.join(path_b, 'game.py')) as f:
+            self.assertEqual(f.read(), "print('hi')\n")
+        self.assertEqual(git(self.repo, 'status', '--porcelain'), "")
+        self.assertEqual(git(path_a, 'rev-parse', '--abbrev-ref', 'HEAD').strip(), "feature/issue-1-first")
+
+        self.manager.remove(1)
+        self.assertFalse(os.path.exists(path_a))
+
+    def test_recreate_after_crash(self):
+        self.manager.create(3, "feature/issue-3-x")
+        # A second create for the same issue starts from a clean worktree
+        path = self.manager.create(3, "feature/issue-3-x")
+        self.assertTrue(os.path.exists(os.path.join(path, 'game.py')))
+
+    def test_resume_from_checkpoint(self):
+        path = self.manager.create(4, "feature/issue-4-x")
+        with open(os.path.join(path, 'new.py'), 'w') as f:
+            f.write("x = 1\n")
+        commit = self.manager.checkpoint(4, "crew")
+
+        # Uncommitted work after the checkpoint is lost in the crash; the checkpoint is not
+        with open(os.path.join(path, 'partial.py'), 'w') as f:
+            f.write("y = 2\n")
+        path = self.manager.create(4, "feature/issue-4-x", start_point=commit)
+        self.assertTrue(os.path.exists(os.path.join(path, 'new.py')))
+        self.assertFalse(os.path.exists(os.path.join(path, 'partial.py')))
+
+class TestIssueScheduler(unittest.TestCase):
+
+    def test_concurrency_limit_and_dedupe(self):
+        running = []
+        peak = []
+        lock = threading.Lock()
+        release = threading.Event()
+
+        def handler(issue):
+            with lock:
+                running.append(issue.number)
+                peak.append(len(running))
+            release.wait(5)
+            with lock:
+                running.remove(issue.number)
+
+        scheduler = IssueScheduler(handler, max_workers=2)
+        issues = [SimpleNamespace(number=n) for n in range(1, 5)]
+        for issue in issues:
+            self.assertTrue(scheduler.submit(issue))
+        # Already queued/running issues are not submitted twice
+        self.assertFalse(scheduler.submit(issues[0]))
+
+        time.sleep(0.2)
+        self.assertEqual(len(running), 2)
+        release.set()
+        scheduler.shutdown()
+
+        self.assertEqual(max(peak), 2)
+        self.assertEqual(scheduler.active(), [])
+
+class TestResolveInRoot(unittest.TestCase):
+
+    def test_paths(self):
+        root = os.path.abspath('work')
+        self.assertEqual(resolve_in_root(root, 'app/game.py'), os.path.join(root, 'app', 'game.py'))
+        self.assertIsNone(resolve_in_root(root, '../main.py'))
+        self.assertIsNone(resolve_in_root(root, '/etc/passwd'))
+
+    def test_symlinks_cannot_escape(self):
+        tmp = tempfile.mkdtemp()
+        try:
+            root = os.path.join(tmp, 'work')
+            outside = os.path.join(tmp, 'outside')
+            os.makedirs(os.path.join(root, 'app'))
+            os.makedirs(outside)
+            os.symlink(outside, os.path.join(root, 'app', 'escape'))
+            os.symlink(os.path.join(root, 'app'), os.path.join(root, 'alias'))
+
+            self.assertIsNone(resolve_in_root(root, 'app/escape/evil.py'))
+            self.assertIsNone(resolve_in_root(root, 'app/escape'))
+            # Links that stay inside the worktree resolve to their target
+            self.assertEqual(resolve_in_root(root, 'alias/game.py'),
+                             os.path.join(os.path.realpath(root), 'app', 'game.py'))
+        finally:
+            shutil.rmtree(tmp, ignore_errors=True)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,86 @@
+import sys
+import time
+import unittest
+from calculation_worker import CalculationPool, evaluate_limited
+
+class TestEvaluateLimited(unittest.TestCase):
+
+    def test_result(self):
+        self.assertEqual(evaluate_limited("9*3", 100), "27")
+
+    def test_result_too_large(self):
+        with self.assertRaises(OverflowError):
+            evaluate_limited("10**200", 100)
+
+    def test_results_past_the_int_str_limit(self):
+        # Python refuses int/str conversions over 4300 digits by default
+        self.assertEqual(evaluate_limited("10**5000", 10000), "1" + "0" * 5000)
+        self.assertEqual(evaluate_limited("9" * 6000 + "+1", 10000), "1" + "0" * 6000)
+        with self.assertRaises(OverflowError):
+            evaluate_limited("10**12000", 10000)
+        with self.assertRaises(OverflowError):
+            evaluate_limited("9" * 12000, 10000)
+
+    @unittest.skipUnless(hasattr(sys, 'get_int_max_str_digits'), "no int/str limit before Python 3.11")
+    def test_int_str_limit_is_restored(self):
+        limit = sys.get_int_max_str_digits()
+        evaluate_limited("10**5000", 10000)
+        with self.assertRaises(OverflowError):
+            evaluate_limited("10**12000", 10000)
+        self.assertEqual(sys.get_int_max_str_digits(), limit)
+
+class TestCalculationPool(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.pool = CalculationPool(workers=2, cpu_time=1, max_digits=1000)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.pool.shutdown()
+
+    def test_success(self):
+        job = self.pool.submit("9*3")
+        self.assertEqual(self.pool.wait(job, timeout=30), ("27", None))
+
+    def test_errors_keep_their_type(self):
+        _, error = self.pool.wait(self.pool.submit("5/0"), timeout=30)
+        self.assertIsInstance(error, ZeroDivisionError)
+        _, error = self.pool.wait(self.pool.submit("5+*3"), timeout=30)
+        self.assertIsInstance(error, SyntaxError)
+        _, error = self.pool.wait(self.pool.submit("10**5000"), timeout=30)
+        self.assertIsInstance(error, OverflowError)
+
+    def test_runaway_expression_times_out(self):
+        started = time.monotonic()
+        result, error = self.pool.wait(self.pool.submit("9**9**9"), timeout=30)
+        self.assertIsNone(result)
+        self.assertIsInstance(error, TimeoutError)
+        self.assertLess(time.monotonic() - started, 10)
+
+        # The killed worker has been replaced
+        self.assertEqual(self.pool.wait(self.pool.submit("1+1"), timeout=30), ("2", None))
+
+    def test_default_limit_in_a_fresh_worker(self):
+        pool = CalculationPool(workers=1, cpu_time=1)
+        try:
+            result, error = pool.wait(pool.submit("10**5000"), timeout=30)
+            self.assertIsNone(error)
+            self.assertEqual(len(result), 5001)
+            _, error = pool.wait(pool.submit("10**20000"), timeout=30)
+            self.assertIsInstance(error, OverflowError)
+        finally:
+            pool.shutdown()
+
+    def test_cancel(self):
+        job = self.pool.submit("9**9**9")
+        self.assertTrue(self.pool.cancel(job))
+        self.assertFalse(self.pool.cancel(job))
+
+        other = self.pool.submit("2*21")
+        self.assertEqual(self.pool.wait(other, timeout=30), ("42", None))
+        # The cancelled job never reports a result
+        self.assertNotIn(job, [done[0] for done in self.pool.poll()])
+
+if __name__ == '__main__':
+    unittest.main()
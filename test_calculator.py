@@ -30,6 +30,14 @@ class TestCalculator(unittest.TestCase):
         self.calc.clear()
         self.assertEqual(self.calc.expression, "")
 
+    def test_set_result(self):
+        """Test that a result computed elsewhere becomes the new expression."""
+        self.calc.expression = "9*3"
+        self.calc.set_result("27")
+        self.assertEqual(self.calc.expression, "27")
+        self.calc.press("+")
+        self.assertEqual(self.calc.expression, "27+")
+
     def test_calculate_success(self):
         """Test a successful calculation."""
         self.calc.expression = "9*3"
@@ -0,0 +1,72 @@
+import io
+import sys
+import time
+import unittest
+from calculator_batch import evaluate_chunk, run_batch
+
+class TestCalculatorBatch(unittest.TestCase):
+
+    def test_evaluate_chunk(self):
+        lines = ["9*3", "1+2", "2+3", "9*3", "5/0", "5+*3", "10/4"]
+        results = evaluate_chunk(lines)
+        self.assertEqual(results[:4], ["27", "3", "5", "27"])
+        self.assertTrue(results[4].startswith("Error: ZeroDivisionError"))
+        self.assertTrue(results[5].startswith("Error: SyntaxError"))
+        self.assertEqual(results[6], "2.5")
+
+    def test_bad_lines_do_not_abort_the_chunk(self):
+        lines = ["1+1", "(" * 3000 + "1" + ")" * 3000, "9" * 5000, "9" * 20000, "2*3"]
+        results = evaluate_chunk(lines)
+        self.assertEqual(results[0], "2")
+        self.assertTrue(results[1].startswith("Error: RecursionError"))
+        self.assertEqual(results[2], "9" * 5000)
+        self.assertTrue(results[3].startswith("Error: "))
+        self.assertEqual(results[4], "6")
+
+    def test_runaway_lines_are_refused(self):
+        started = time.monotonic()
+        products = "*".join(["9" * 4000] * 50)
+        results = evaluate_chunk(["9**9**9", products, "10**4000*10**4000*10**4000", "2**10"], max_digits=10000)
+        self.assertLess(time.monotonic() - started, 5)
+        self.assertTrue(results[0].startswith("Error: OverflowError"))
+        self.assertTrue(results[1].startswith("Error: OverflowError"))
+        self.assertTrue(results[2].startswith("Error: OverflowError"))
+        self.assertEqual(results[3], "1024")
+
+        output = io.StringIO()
+        run_batch(io.StringIO("9**9**9\n1+1\n"), output, workers=2, chunk_size=1)
+        self.assertTrue(output.getvalue().startswith("Error: OverflowError"))
+        self.assertTrue(output.getvalue().endswith("\n2\n"))
+
+    @unittest.skipUnless(hasattr(sys, 'get_int_max_str_digits'), "no int/str limit before Python 3.11")
+    def test_in_process_chunk_restores_the_int_str_limit(self):
+        limit = sys.get_int_max_str_digits()
+        self.assertEqual(evaluate_chunk(["10**5000"], max_digits=10000), ["1" + "0" * 5000])
+        self.assertEqual(sys.get_int_max_str_digits(), limit)
+
+    def test_matches_calculator(self):
+        """Batch results must be the same strings Calculator.calculate produces."""
+        from calculator import Calculator
+
+        lines = [f"{i}*{i}-{i}/3" for i in range(50)]
+        calc = Calculator()
+        expected = []
+        for line in lines:
+            calc.expression = line
+            expected.append(calc.calculate())
+        self.assertEqual(evaluate_chunk(lines), expected)
+
+    def test_run_batch_in_process(self):
+        output = io.StringIO()
+        count = run_batch(io.StringIO("1+1\n2*3\n7-10\n"), output, workers=1, chunk_size=2)
+        self.assertEqual(count, 3)
+        self.assertEqual(output.getvalue(), "2\n6\n-3\n")
+
+    def test_run_batch_parallel_keeps_order(self):
+        lines = [f"{i}+0" for i in range(500)]
+        output = io.StringIO()
+        run_batch(io.StringIO("\n".join(lines) + "\n"), output, workers=2, chunk_size=7)
+        self.assertEqual(output.getvalue().splitlines(), [str(i) for i in range(500)])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,171 @@
+import os
+import shutil
+import tempfile
+import time
+import unittest
+from llm_cache import LLMCache
+from rate_scheduler import RateScheduler
+from pipeline_metrics import PipelineMetrics
+from crew_llm import LLMGateway, GatewayLLM
+
+try:
+    from crewai.llms.base_llm import BaseLLM
+    from crewai.utilities.llm_utils import create_llm
+    HAS_CREWAI = True
+except ImportError:
+    HAS_CREWAI = False
+
+MESSAGES = [{'role': 'system', 'content': "You are the developer."},
+            {'role': 'user', 'content': "Fix issue 7"}]
+
+class FakeClient:
+    """Local stand-in for the model API: answers deterministically and counts calls."""
+    def __init__(self):
+        self.calls = 0
+        self.prompt_tokens = 0
+        self.completion_tokens = 0
+
+    def send(self, messages):
+        self.calls += 1
+        self.prompt_tokens += 120
+        self.completion_tokens += 30
+        time.sleep(0.01)
+        return f"answer {self.calls} to: {messages[-1]['content']}"
+
+def write(path, content):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'w') as f:
+        f.write(content)
+
+class TestLLMGateway(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.project = os.path.join(self.tmp, 'project')
+        write(os.path.join(self.project, 'game.py'), "def answer():\n    return 42\n")
+        self.cache = LLMCache(os.path.join(self.tmp, 'cache'))
+        self.scheduler = RateScheduler({'gemini-pro': 600})  # one request every 100 ms
+        self.prom_path = os.path.join(self.tmp, 'metrics', 'metrics.prom')
+        self.metrics = PipelineMetrics(os.path.join(self.tmp, 'metrics', 'spans.jsonl'), self.prom_path)
+        self.gateway = LLMGateway(self.cache, self.project, self.scheduler, self.metrics)
+        self.client = FakeClient()
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp, ignore_errors=True)
+
+    def call(self, messages=MESSAGES, **kwargs):
+        return self.gateway.call('gemini-pro', 0.2, messages, lambda: self.client.send(messages),
+                                 usage=lambda: (self.client.prompt_tokens, self.client.completion_tokens), **kwargs)
+
+    def test_second_identical_prompt_is_served_from_the_cache(self):
+        first = self.call()
+        second = self.call()
+        self.assertEqual(second, first)
+        self.assertEqual(self.client.calls, 1)
+        self.assertEqual(self.cache.stats()['hits'], 1)
+
+    def test_other_prompt_tools_or_files_go_to_the_model(self):
+        self.call()
+        self.call(MESSAGES[:1] + [{'role': 'user', 'content': "Fix issue 8"}])
+        self.call(tools=[{'name': 'read_file'}])
+        write(os.path.join(self.project, 'game.py'), "def answer():\n    return 41\n")
+        self.call()
+        self.assertEqual(self.client.calls, 4)
+
+    def test_uncacheable_calls_always_go_out(self):
+        self.call(cacheable=False)
+        self.call(cacheable=False)
+        self.assertEqual(self.client.calls, 2)
+        self.assertEqual(self.cache.stats()['entries'], 0)
+
+    def test_requests_to_the_model_are_throttled(self):
+        start = time.monotonic()
+        for issue in range(3):
+            self.call([{'role': 'user', 'content': f"Fix issue {issue}"}])
+        # The first request is immediate, the other two wait for refills
+        self.assertGreaterEqual(time.monotonic() - start, 0.18)
+        stats = self.scheduler.stats()['gemini-pro']
+        self.assertEqual(stats['granted'], 3)
+        self.assertGreater(stats['total_wait'], 0)
+
+    def test_cache_hits_do_not_use_the_quota(self):
+        self.call()
+        self.call()
+        self.assertEqual(self.scheduler.stats()['gemini-pro']['granted'], 1)
+
+    def test_model_calls_reach_the_prometheus_export(self):
+        with self.metrics.span('task', 7) as span:
+            self.call()
+            self.call()  # served from the cache: no model call
+        self.assertEqual(span.counters['llm_calls'], 1)
+        self.assertGreaterEqual(span.counters['llm_seconds'], 0.01)
+        with open(self.prom_path) as f:
+            text = f.read()
+        self.assertIn('agent_stage_llm_calls_total{stage="task"} 1', text)
+        self.assertIn('agent_stage_tokens_total{stage="task",kind="prompt"} 120', text)
+        self.assertIn('agent_stage_tokens_total{stage="task",kind="completion"} 30', text)
+        self.assertIn('agent_stage_llm_seconds_total{stage="task"}', text)
+
+if HAS_CREWAI:
+    class FakeCrewLLM(BaseLLM):
+        """CrewAI LLM that records its calls and the stop words it saw instead of calling an API."""
+        calls: list = []
+        quota_errors: int = 0
+
+        def call(self, messages, tools=None, callbacks=None, available_functions=None,
+                 from_task=None, from_agent=None, response_model=None):
+            self.calls.append(list(self.stop_sequences))
+            if len(self.calls) <= self.quota_errors:
+                raise RuntimeError("429 Resource exhausted")
+            self._track_token_usage_internal({'prompt_tokens': 10, 'completion_tokens': 2})
+            return f"answer {len(self.calls)}"
+
+@unittest.skipUnless(HAS_CREWAI, "needs crewai")
+class TestGatewayLLM(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.cache = LLMCache(os.path.join(self.tmp, 'cache'))
+        self.inner = FakeCrewLLM(model='gemini-pro', temperature=0.2, calls=[])
+        project = os.path.join(self.tmp, 'project')
+        write(os.path.join(project, 'game.py'), "def answer():\n    return 42\n")
+        self.scheduler = RateScheduler({'gemini-pro': 600})
+        self.metrics = PipelineMetrics(None, None)
+        self.llm = GatewayLLM.wrap(self.inner, LLMGateway(self.cache, project, self.scheduler, self.metrics))
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp, ignore_errors=True)
+
+    def test_crewai_keeps_the_wrapper(self):
+        self.assertIs(create_llm(self.llm), self.llm)
+
+    def test_agent_calls_are_cached_throttled_and_measured(self):
+        with self.metrics.span('task') as span:
+            self.assertEqual(self.llm.call(MESSAGES), "answer 1")
+            self.assertEqual(self.llm.call(MESSAGES), "answer 1")
+        self.assertEqual(len(self.inner.calls), 1)
+        self.assertEqual(self.cache.stats()['hits'], 1)
+        self.assertEqual(self.scheduler.stats()['gemini-pro']['granted'], 1)
+        self.assertEqual(span.counters['llm_calls'], 1)
+        self.assertEqual(span.counters['prompt_tokens'], 10)
+        self.assertEqual(span.counters['completion_tokens'], 2)
+        self.assertIn('agent_stage_llm_calls_total{stage="task"} 1', self.metrics.prometheus_text())
+
+    def test_quota_errors_are_retried_through_the_scheduler(self):
+        self.inner.quota_errors = 1
+        self.assertEqual(self.llm.call(MESSAGES), "answer 2")
+        self.assertEqual(self.scheduler.stats()['gemini-pro']['granted'], 2)
+
+        # CrewAI gives up after three attempts
+        self.inner.quota_errors = 10
+        with self.assertRaises(RuntimeError):
+            self.llm.call([{'role': 'user', 'content': "Fix issue 8"}])
+        self.assertEqual(len(self.inner.calls), 5)
+
+    def test_stop_words_reach_the_inner_client(self):
+        self.llm.stop = ["\nObservation:"]
+        self.llm.call(MESSAGES)
+        self.assertEqual(self.inner.calls, [["\nObservation:"]])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,98 @@
+import unittest
+from expression_engine import tokenize, compile_expression, evaluate, IncrementalExpression
+
+class TestExpressionEngine(unittest.TestCase):
+
+    def test_matches_python_arithmetic(self):
+        """Results (value and type) should be identical to eval for calculator input."""
+        expressions = [
+            "7+5", "9*3", "10/4", "10//4", "-7//2", "7%3", "2**10", "2**-1", "2**3**2",
+            "-2**2", "2--3", "3*-2", "1+2*3-4/5", "(1+2)*3", "0.1+0.2", "1e+16*10",
+            "00", "5.", ".5*2", "27", "3*3+1",
+        ]
+        for expression in expressions:
+            with self.subTest(expression=expression):
+                result = evaluate(expression)
+                expected = eval(expression)
+                self.assertEqual(result, expected)
+                self.assertIs(type(result), type(expected))
+
+    def test_syntax_errors(self):
+        for expression in ["", "5+*3", "5+", "*5", "07", "(1+2", "1+2)", "3 4"]:
+            with self.subTest(expression=expression):
+                with self.assertRaises(SyntaxError):
+                    evaluate(expression)
+
+    def test_rejects_non_arithmetic_input(self):
+        for expression in ["__import__('os')", "abs(-1)", "x+1", "1;2", "[1]"]:
+            with self.subTest(expression=expression):
+                with self.assertRaises(SyntaxError):
+                    evaluate(expression)
+
+    def test_division_by_zero(self):
+        with self.assertRaises(ZeroDivisionError):
+            evaluate("5/0")
+
+    def test_tokenize(self):
+        self.assertEqual(tokenize("12+3.5**2"),
+                         [('number', 12), ('op', '+'), ('number', 3.5), ('op', '**'), ('number', 2)])
+
+    def test_compiled_expressions_are_cached(self):
+        compile_expression.cache_clear()
+        evaluate("6*7")
+        evaluate("6*7")
+        info = compile_expression.cache_info()
+        self.assertEqual(info.misses, 1)
+        self.assertEqual(info.hits, 1)
+
+    def test_long_chain(self):
+        self.assertEqual(evaluate("+".join(["1"] * 5000)), 5000)
+
+class TestIncrementalExpression(unittest.TestCase):
+
+    def type_keys(self, keys):
+        """Feeds keys one at a time like the calculator buttons; returns the last value."""
+        incremental = IncrementalExpression()
+        text = ""
+        for key in keys:
+            text += key
+            try:
+                value = incremental.update(text)
+            except (SyntaxError, ArithmeticError):
+                value = None
+        return incremental, value
+
+    def test_matches_full_evaluation(self):
+        for expression in ["12+3*4-5", "2**10-1", "7-2-1", "1/4+1/4", "3*-2+8//3", "-5+2"]:
+            with self.subTest(expression=expression):
+                _, value = self.type_keys(expression)
+                self.assertEqual(value, evaluate(expression))
+
+    def test_completed_terms_are_reused(self):
+        incremental, _ = self.type_keys("100+200+3")
+        self.assertEqual([boundary[2] for boundary in incremental.boundaries], [100, 300])
+        self.assertEqual(incremental.update("100+200+34"), 334)
+        self.assertEqual(len(incremental.boundaries), 2)
+
+    def test_incomplete_expression(self):
+        incremental, _ = self.type_keys("7+")
+        with self.assertRaises(SyntaxError):
+            incremental.update("7+")
+        self.assertEqual(incremental.update("7+1"), 8)
+
+    def test_errors_in_completed_terms(self):
+        incremental, _ = self.type_keys("5/0+")
+        with self.assertRaises(ZeroDivisionError):
+            incremental.update("5/0+1")
+
+    def test_runaway_power_is_refused(self):
+        incremental = IncrementalExpression()
+        with self.assertRaises(OverflowError):
+            incremental.update("9**9**9")
+
+    def test_replaced_text_starts_over(self):
+        incremental, _ = self.type_keys("9*3")
+        self.assertEqual(incremental.update("27+1"), 28)
+
+if __name__ == '__main__':
+    unittest.main()
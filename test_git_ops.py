@@ -0,0 +1,156 @@
+import os
+import shutil
+import subprocess
+import tempfile
+import unittest
+from git_ops import CommitRequest, GitError, GitOps, TouchedFiles
+
+def git(cwd, *args):
+    return subprocess.run(['git', *args], cwd=cwd, capture_output=True, text=True, check=True).stdout
+
+class TestGitOps(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.remote = os.path.join(self.tmp, 'remote.git')
+        self.repo = os.path.join(self.tmp, 'repo')
+        git(self.tmp, 'init', '-q', '--bare', self.remote)
+        git(self.tmp, 'init', '-q', '-b', 'main', self.repo)
+        git(self.repo, 'config', 'user.email', 'test@example.com')
+        git(self.repo, 'config', 'user.name', 'Test')
+        self.write('game.py', "print('hi')\n")
+        self.write('old.py', "x = 1\n")
+        git(self.repo, 'add', '.')
+        git(self.repo, 'commit', '-q', '-m', 'init')
+        git(self.repo, 'remote', 'add', 'origin', self.remote)
+        self.ops = GitOps(self.repo)
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp, ignore_errors=True)
+
+    def write(self, path, content):
+        full_path = os.path.join(self.repo, path)
+        os.makedirs(os.path.dirname(full_path), exist_ok=True)
+        with open(full_path, 'w') as f:
+            f.write(content)
+
+    def files_at(self, ref, git_dir=None):
+        cwd = git_dir or self.repo
+        return git(cwd, 'ls-tree', '-r', '--name-only', ref).split()
+
+    def test_only_touched_files_are_committed(self):
+        touched = TouchedFiles(self.repo)
+        self.write('game.py', "print('fixed')\n")
+        self.write('app/timer.py', "TIMER = 1\n")
+        self.write('scratch.log', "not part of the fix\n")
+        touched.add(os.path.join(self.repo, 'game.py'))
+        touched.add('app/timer.py')
+        os.remove(os.path.join(self.repo, 'old.py'))
+        touched.add('old.py')
+
+        commit = self.ops.commit('feature/issue-1-x', 'main', self.repo, touched.paths(), "AI Fix: x")
+
+        self.assertEqual(git(self.repo, 'rev-parse', 'feature/issue-1-x').strip(), commit)
+        self.assertEqual(self.files_at(commit), ['app/timer.py', 'game.py'])
+        self.assertEqual(git(self.repo, 'show', f'{commit}:game.py'), "print('fixed')\n")
+        self.assertEqual(git(self.repo, 'log', '--format=%s', commit).split('\n')[:2], ['AI Fix: x', 'init'])
+
+    def test_replaces_checkpoints_with_one_commit(self):
+        git(self.repo, 'checkout', '-q', '-b', 'feature/issue-2-y')
+        self.write('game.py', "print('step 1')\n")
+        git(self.repo, 'commit', '-q', '-am', 'checkpoint: crew')
+        self.write('game.py', "print('step 2')\n")
+        git(self.repo, 'commit', '-q', '-am', 'checkpoint: fix 1')
+
+        base = self.ops.merge_base('feature/issue-2-y', 'main')
+        commit = self.ops.commit('feature/issue-2-y', base, self.repo, ['game.py'], "AI Fix: y")
+
+        self.assertEqual(git(self.repo, 'rev-parse', f'{commit}^').strip(), base)
+        self.assertEqual(git(self.repo, 'show', f'{commit}:game.py'), "print('step 2')\n")
+
+    def test_push_several_branches_at_once(self):
+        self.write('game.py', "print('a')\n")
+        first = CommitRequest('feature/issue-1-a', 'main', self.repo, ['game.py'], "AI Fix: a")
+        second = CommitRequest('feature/issue-2-b', 'main', self.repo, ['old.py'], "AI Fix: b")
+        commits = self.ops.publish([first, second])
+
+        self.assertEqual(len(set(commits)), 2)
+        for branch, commit in zip(['feature/issue-1-a', 'feature/issue-2-b'], commits):
+            self.assertEqual(git(self.remote, 'rev-parse', branch).strip(), commit)
+
+    def test_failures_raise(self):
+        with self.assertRaises(GitError):
+            self.ops.merge_base('missing-branch', 'main')
+        with self.assertRaises(GitError):
+            self.ops.commit('feature/x', 'missing-branch', self.repo, ['game.py'], "AI Fix")
+        self.ops.commit('feature/x', 'main', self.repo, ['game.py'], "AI Fix")
+        with self.assertRaises(GitError):
+            GitOps(self.repo, remote='nowhere').push(['feature/x'])
+
+    def test_symlinks_and_deletions(self):
+        os.makedirs(os.path.join(self.repo, 'assets'))
+        os.symlink('assets', os.path.join(self.repo, 'static'))
+        os.symlink('missing.txt', os.path.join(self.repo, 'broken'))
+        os.remove(os.path.join(self.repo, 'old.py'))
+
+        commit = self.ops.commit('feature/links', 'main', self.repo, ['static', 'broken', 'old.py', 'assets'], "links")
+
+        entries = git(self.repo, 'ls-tree', commit).splitlines()
+        modes = {line.split('\t')[1]: line.split()[0] for line in entries}
+        self.assertEqual(modes, {'broken': '120000', 'game.py': '100644', 'static': '120000'})
+        self.assertEqual(git(self.repo, 'cat-file', 'blob', f'{commit}:static'), 'assets')
+
+    def test_lease_protects_other_pushes(self):
+        # First push: the branch must not exist on the remote yet
+        first = self.ops.publish([CommitRequest('feature/w', 'main', self.repo, ['game.py'], "first")],
+                                 leases={'feature/w': ''})[0]
+        self.write('game.py', "print('second')\n")
+        self.ops.commit('feature/w', 'main', self.repo, ['game.py'], "second")
+        with self.assertRaises(GitError):
+            self.ops.push(['feature/w'], leases={'feature/w': ''})
+
+        # Someone else pushes to the agent branch
+        other = os.path.join(self.tmp, 'other')
+        git(self.tmp, 'clone', '-q', '-b', 'feature/w', self.remote, other)
+        git(other, 'config', 'user.email', 'human@example.com')
+        git(other, 'config', 'user.name', 'Human')
+        git(other, 'commit', '-q', '--allow-empty', '-m', 'human fix')
+        git(other, 'push', '-q', 'origin', 'feature/w')
+        human = git(self.remote, 'rev-parse', 'feature/w').strip()
+
+        # A re-run rewriting the branch from the sha it pushed is rejected
+        self.write('game.py', "print('rerun')\n")
+        self.ops.commit('feature/w', 'main', self.repo, ['game.py'], "rerun")
+        with self.assertRaises(GitError):
+            self.ops.push(['feature/w'], leases={'feature/w': first})
+        self.assertEqual(git(self.remote, 'rev-parse', 'feature/w').strip(), human)
+
+        # Once the remote is back at the expected sha the rewrite goes through
+        self.ops.push(['feature/w'], leases={'feature/w': human})
+        self.assertEqual(git(self.remote, 'log', '-1', '--format=%s', 'feature/w').strip(), "rerun")
+
+    def test_lease_for_a_branch_left_by_an_earlier_run(self):
+        self.assertEqual(self.ops.remote_sha('feature/v'), '')
+        earlier = self.ops.publish([CommitRequest('feature/v', 'main', self.repo, ['game.py'], "earlier run")],
+                                   leases={'feature/v': ''})[0]
+        self.assertEqual(self.ops.remote_sha('feature/v'), earlier)
+
+        # A new run of the issue has no pushed sha of its own: the branch is not new
+        self.write('game.py', "print('new run')\n")
+        self.ops.commit('feature/v', 'main', self.repo, ['game.py'], "new run")
+        with self.assertRaises(GitError):
+            self.ops.push(['feature/v'], leases={'feature/v': ''})
+        self.ops.push(['feature/v'], leases={'feature/v': self.ops.remote_sha('feature/v')})
+        self.assertEqual(git(self.remote, 'log', '-1', '--format=%s', 'feature/v').strip(), "new run")
+
+    def test_rejected_push_without_force(self):
+        self.ops.publish([CommitRequest('feature/z', 'main', self.repo, ['game.py'], "first")])
+        self.write('game.py', "print('rewritten')\n")
+        self.ops.commit('feature/z', 'main', self.repo, ['game.py'], "second")
+        with self.assertRaises(GitError):
+            self.ops.push(['feature/z'])
+        self.ops.push(['feature/z'], force=True)
+        self.assertEqual(git(self.remote, 'log', '-1', '--format=%s', 'feature/z').strip(), "second")
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,170 @@
+import json
+import os
+import shutil
+import tempfile
+import threading
+import time
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+from github_poller import IssuePoller
+
+class FakeGitHub:
+    """
+    Minimal local stand-in for the GitHub issues endpoint. Serves ETags, honours
+    If-None-Match with 304, paginates with Link headers and counts requests.
+    """
+    def __init__(self, page_size=100):
+        self.issues = {}
+        self.version = 0
+        self.page_size = page_size
+        self.requests = []
+        self.rate_limit_remaining = 5000
+        fake = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                fake.requests.append((self.path, self.headers.get('If-None-Match')))
+                etag = f'"v{fake.version}"'
+                headers = {'X-RateLimit-Remaining': str(fake.rate_limit_remaining),
+                           'X-RateLimit-Reset': str(int(time.time()) + 60)}
+                if fake.rate_limit_remaining == 0:
+                    self._reply(403, headers, {'message': 'API rate limit exceeded'})
+                    return
+                if self.headers.get('If-None-Match') == etag:
+                    self._reply(304, headers, None)
+                    return
+
+                page = int(parse_qs(urlparse(self.path).query).get('page', ['1'])[0])
+                items = sorted(fake.issues.values(), key=lambda issue: issue['number'])
+                chunk = items[(page - 1) * fake.page_size:page * fake.page_size]
+                headers['ETag'] = etag
+                if page * fake.page_size < len(items):
+                    base = self.path.split('&page=')[0]
+                    headers['Link'] = f'<http://127.0.0.1:{fake.port}{base}&page={page + 1}>; rel="next"'
+                self._reply(200, headers, chunk)
+
+            def _reply(self, status, headers, body):
+                self.send_response(status)
+                for key, value in headers.items():
+                    self.send_header(key, value)
+                if body is None:
+                    self.end_headers()
+                    return
+                data = json.dumps(body).encode('utf-8')
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self.port = self.server.server_address[1]
+        self.url = f"http://127.0.0.1:{self.port}"
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def set_issue(self, number, title):
+        self.version += 1
+        self.issues[number] = {'number': number, 'title': title, 'body': '', 'updated_at': f"t{self.version}"}
+
+    def close_issue(self, number):
+        self.version += 1
+        del self.issues[number]
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+class TestIssuePoller(unittest.TestCase):
+
+    def setUp(self):
+        self.fake = FakeGitHub(page_size=2)
+        self.tmp = tempfile.mkdtemp()
+        self.cache_path = os.path.join(self.tmp, 'issues.json')
+
+    def tearDown(self):
+        self.fake.stop()
+        shutil.rmtree(self.tmp, ignore_errors=True)
+
+    def make_poller(self):
+        return IssuePoller('owner/repo', api_url=self.fake.url, cache_path=self.cache_path,
+                           min_interval=30, max_interval=300)
+
+    def test_detects_new_changed_and_removed(self):
+        poller = self.make_poller()
+        self.fake.set_issue(1, "First")
+        self.fake.set_issue(2, "Second")
+        self.fake.set_issue(3, "Third")
+
+        result = poller.poll()
+        self.assertEqual(result.changed, [1, 2, 3])
+        self.assertEqual(sorted(result.issues), [1, 2, 3])
+
+        self.fake.set_issue(2, "Second (edited)")
+        self.fake.close_issue(3)
+        result = poller.poll()
+        self.assertEqual(result.changed, [2])
+        self.assertEqual(result.removed, [3])
+        self.assertEqual(result.issues[2]['title'], "Second (edited)")
+
+    def test_unchanged_polls_are_conditional(self):
+        poller = self.make_poller()
+        self.fake.set_issue(1, "First")
+        self.fake.set_issue(2, "Second")
+        self.fake.set_issue(3, "Third")
+        poller.poll()
+        full_fetch = len(self.fake.requests)
+        self.assertEqual(full_fetch, 2)  # two pages
+
+        for _ in range(10):
+            result = poller.poll()
+            self.assertTrue(result.not_modified)
+            self.assertEqual(sorted(result.issues), [1, 2, 3])
+
+        # Ten polls cost ten 304s instead of ten full paginated fetches
+        self.assertEqual(len(self.fake.requests), full_fetch + 10)
+        self.assertEqual(poller.not_modified_count, 10)
+        self.assertTrue(all(etag == '"v3"' for _, etag in self.fake.requests[full_fetch:]))
+
+    def test_cache_survives_restart(self):
+        self.fake.set_issue(7, "Persisted")
+        self.make_poller().poll()
+
+        restarted = self.make_poller()
+        result = restarted.poll()
+        self.assertTrue(result.not_modified)
+        self.assertEqual(result.issues[7]['title'], "Persisted")
+
+    def test_interval_adapts(self):
+        poller = self.make_poller()
+        self.fake.set_issue(1, "First")
+        poller.poll()
+        self.assertEqual(poller.next_interval(), 30)
+        poller.poll()
+        poller.poll()
+        self.assertGreater(poller.next_interval(), 30)
+
+        self.fake.set_issue(2, "Second")
+        poller.poll()
+        self.assertEqual(poller.next_interval(), 30)
+
+    def test_backs_off_when_rate_limited(self):
+        poller = self.make_poller()
+        self.fake.set_issue(1, "First")
+        poller.poll()
+
+        self.fake.rate_limit_remaining = 0
+        result = poller.poll()
+        self.assertIsNotNone(result.error)
+        self.assertEqual(sorted(result.issues), [1])
+        self.assertGreater(poller.next_interval(), 50)
+
+        # While limited, no request reaches the server
+        requests = len(self.fake.requests)
+        poller.poll()
+        self.assertEqual(len(self.fake.requests), requests)
+
+if __name__ == '__main__':
+    unittest.main()
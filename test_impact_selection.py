@@ -0,0 +1,137 @@
+import os
+import shutil
+import tempfile
+import unittest
+from impact_selection import (ImportGraph, find_test_modules, select_tests, shard, merge_results, run_sharded,
+                              module_name_for)
+from log_digest import LogDigest
+from runner_service import LocalTestRunner
+
+def write(path, content):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'w') as f:
+        f.write(content)
+
+def make_test_module(import_line, call, expected):
+    return (f"import unittest\n{import_line}\n\n"
+            f"class TestIt(unittest.TestCase):\n"
+            f"    def test_it(self):\n        self.assertEqual({call}, {expected})\n")
+
+class TestImpactSelection(unittest.TestCase):
+
+    def setUp(self):
+        self.project = tempfile.mkdtemp()
+        self.cache_path = os.path.join(self.project, '.ai_cache', 'graph.json')
+        files = {
+            'app/__init__.py': "",
+            'app/game.py': "def answer():\n    return 42\n",
+            'app/utils.py': "def double(x):\n    return 2 * x\n",
+            'app/gui.py': "from . import game\n\ndef title():\n    return f'Game {game.answer()}'\n",
+            'tests/__init__.py': "",
+            'tests/test_game.py': make_test_module("from app.game import answer", "answer()", "42"),
+            'tests/test_utils.py': make_test_module("from app import utils", "utils.double(2)", "4"),
+            'tests/test_gui.py': make_test_module("import app.gui", "app.gui.title()", "'Game 42'"),
+        }
+        for path, content in files.items():
+            write(os.path.join(self.project, path), content)
+
+    def tearDown(self):
+        shutil.rmtree(self.project, ignore_errors=True)
+
+    def select(self, *changed):
+        return select_tests(self.project, list(changed), cache_path=self.cache_path)
+
+    def test_module_name_for(self):
+        self.assertEqual(module_name_for('app/game.py'), 'app.game')
+        self.assertEqual(module_name_for('app/__init__.py'), 'app')
+
+    def test_selects_only_affected_tests(self):
+        self.assertEqual(self.select('app/utils.py'), ['tests.test_utils'])
+        # gui imports game with a relative import, so both test modules are affected
+        self.assertEqual(self.select('app/game.py'), ['tests.test_game', 'tests.test_gui'])
+        self.assertEqual(self.select('tests/test_gui.py'), ['tests.test_gui'])
+
+    def test_non_python_change_needs_full_run(self):
+        self.assertIsNone(self.select('app/utils.py', 'requirements.txt'))
+
+    def test_graph_is_refreshed_incrementally(self):
+        graph = ImportGraph(self.project, self.cache_path).refresh()
+        self.assertEqual(graph.parsed_files, 8)
+
+        graph = ImportGraph(self.project, self.cache_path).refresh()
+        self.assertEqual(graph.parsed_files, 0)
+
+        write(os.path.join(self.project, 'app', 'utils.py'), "from app.game import answer\n")
+        graph = ImportGraph(self.project, self.cache_path).refresh()
+        self.assertEqual(graph.parsed_files, 1)
+        self.assertIn('app.utils', graph.dependents({'app.game'}))
+
+    def test_find_test_modules(self):
+        graph = ImportGraph(self.project, self.cache_path).refresh()
+        found = find_test_modules(graph)
+        self.assertEqual(sorted(found), ['tests.test_game', 'tests.test_gui', 'tests.test_utils'])
+        self.assertEqual(found['tests.test_game'],
+                         os.path.getsize(os.path.join(self.project, 'tests', 'test_game.py')))
+        self.assertEqual(list(find_test_modules(graph, names={'tests.test_gui', 'app.gui'})), ['tests.test_gui'])
+
+    def test_shard_balances_by_size(self):
+        sizes = {'a': 10, 'b': 6, 'c': 5, 'd': 1}
+        groups = shard(['a', 'b', 'c', 'd'], 2, sizes)
+        self.assertEqual(sorted(groups), [['a', 'd'], ['b', 'c']])
+        self.assertEqual(shard(['a'], 4), [['a']])
+        self.assertEqual(shard([], 4), [])
+
+    def test_merge_results(self):
+        returncode, output = merge_results([
+            (0, "Ran 3 tests in 0.1s\n\nOK"),
+            (1, "Ran 2 tests in 0.1s\n\nFAILED (failures=1, errors=1)"),
+        ])
+        self.assertEqual(returncode, 1)
+        self.assertIn("Ran 5 tests in 2 shards: FAILED (failures=1, errors=1)", output)
+
+    def test_run_sharded(self):
+        runner = LocalTestRunner(os.path.join(self.project, '.ai_cache', 'deps'), max_servers=2)
+        try:
+            returncode, output = run_sharded(runner, self.project, self.select('app/game.py', 'app/utils.py'), 2)
+            self.assertEqual(returncode, 0, output)
+            self.assertIn("Ran 3 tests in 2 shards: OK", output)
+
+            write(os.path.join(self.project, 'app', 'game.py'), "def answer():\n    return 41\n")
+            returncode, output = run_sharded(runner, self.project, self.select('app/game.py'), 2)
+            self.assertEqual(returncode, 1)
+            self.assertIn("Ran 2 tests in 2 shards: FAILED (failures=2, errors=0)", output)
+            self.assertLessEqual(sum(len(pool) for pool in runner.servers.values()), 2)
+        finally:
+            runner.shutdown()
+
+    def test_run_sharded_streaming_into_a_digest(self):
+        runner = LocalTestRunner(os.path.join(self.project, '.ai_cache', 'deps'), max_servers=2)
+        graph = ImportGraph(self.project, self.cache_path).refresh()
+        all_tests = find_test_modules(graph)
+        try:
+            write(os.path.join(self.project, 'app', 'game.py'), "def answer():\n    return 41\n")
+            log = LogDigest(max_failures=0)
+            returncode, output = run_sharded(runner, self.project, sorted(all_tests), 2, all_tests, log=log)
+            self.assertEqual(returncode, 1)
+            self.assertEqual(output, '')
+            self.assertTrue(log.digest().startswith("Ran 3 tests: 2 failed"), log.digest())
+        finally:
+            runner.shutdown()
+
+    def test_sibling_imports_in_the_test_dir(self):
+        # Discovery puts tests/ on sys.path, so test modules may import their helpers directly
+        write(os.path.join(self.project, 'tests', 'helpers.py'), "def triple(x):\n    return 3 * x\n")
+        write(os.path.join(self.project, 'tests', 'test_helpers.py'),
+              make_test_module("from helpers import triple", "triple(2)", "6"))
+        self.assertEqual(self.select('tests/helpers.py'), ['tests.test_helpers'])
+
+        runner = LocalTestRunner(os.path.join(self.project, '.ai_cache', 'deps'), max_servers=2)
+        try:
+            returncode, output = run_sharded(runner, self.project, self.select('tests/helpers.py', 'app/game.py'), 2)
+            self.assertEqual(returncode, 0, output)
+            self.assertIn("Ran 3 tests in 2 shards: OK", output)
+        finally:
+            runner.shutdown()
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,47 @@
+import json
+import os
+import tempfile
+import unittest
+from latency_stats import LatencyStats, export_json
+
+class TestLatencyStats(unittest.TestCase):
+
+    def setUp(self):
+        self.stats = LatencyStats(window=100)
+
+    def test_percentiles(self):
+        # 1ms .. 100ms
+        for i in range(1, 101):
+            self.stats.record('engine', i / 1000)
+        self.assertAlmostEqual(self.stats.percentile('engine', 50), 50)
+        self.assertAlmostEqual(self.stats.percentile('engine', 95), 95)
+        self.assertAlmostEqual(self.stats.percentile('engine', 99), 99)
+        self.assertIsNone(self.stats.percentile('missing', 50))
+
+    def test_rolling_window(self):
+        for _ in range(100):
+            self.stats.record('total', 1.0)
+        for _ in range(100):
+            self.stats.record('total', 0.001)
+        # Old slow samples have rolled out, but the count covers everything
+        summary = self.stats.summary()['total']
+        self.assertAlmostEqual(summary['p99'], 1.0)
+        self.assertEqual(summary['count'], 200)
+
+    def test_format_summary(self):
+        self.assertEqual(self.stats.format_summary(), "No interactions recorded yet")
+        self.stats.record('update_gui', 0.002)
+        self.assertIn("update_gui: p50 2.0", self.stats.format_summary())
+
+    def test_export_json(self):
+        self.stats.record('engine', 0.005)
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'latency.json')
+            export_json(path, {'9x9': self.stats})
+            with open(path, encoding='utf-8') as f:
+                data = json.load(f)
+        self.assertEqual(data['9x9']['engine']['count'], 1)
+        self.assertEqual(data['9x9']['engine']['p50'], 5.0)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,87 @@
+import os
+import shutil
+import tempfile
+import unittest
+from llm_cache import LLMCache, cache_key
+from crew_llm import LLMGateway
+
+class FakeModel:
+    """Local stand-in for a model client: answers deterministically and counts calls."""
+    def __init__(self):
+        self.calls = 0
+
+    def invoke(self, prompt):
+        self.calls += 1
+        return f"answer to: {prompt}"
+
+def write(path, content):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'w') as f:
+        f.write(content)
+
+class TestLLMCache(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.cache_dir = os.path.join(self.tmp, 'cache')
+        self.project = os.path.join(self.tmp, 'project')
+        write(os.path.join(self.project, 'app', 'game.py'), "def answer():\n    return 42\n")
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp, ignore_errors=True)
+
+    def run_crew(self, model):
+        """The prompts of one issue run: plan, implement, review."""
+        gateway = LLMGateway(LLMCache(self.cache_dir), self.project)
+        answers = [gateway.call('gemini-pro', 0.2, prompt, lambda prompt=prompt: model.invoke(prompt))
+                   for prompt in ("plan", "implement", "review")]
+        return answers, gateway.cache.stats()
+
+    def test_rerun_does_not_call_the_model(self):
+        model = FakeModel()
+        first, stats = self.run_crew(model)
+        self.assertEqual(model.calls, 3)
+        self.assertEqual(stats['misses'], 3)
+
+        # A new LLMCache reads the same directory, like a restarted process
+        second, stats = self.run_crew(model)
+        self.assertEqual(second, first)
+        self.assertEqual(model.calls, 3)
+        self.assertEqual(stats['hits'], 3)
+        self.assertEqual(stats['hit_rate'], 1.0)
+
+    def test_file_change_invalidates(self):
+        model = FakeModel()
+        self.run_crew(model)
+        write(os.path.join(self.project, 'app', 'game.py'), "def answer():\n    return 41\n")
+        self.run_crew(model)
+        self.assertEqual(model.calls, 6)
+
+    def test_key_depends_on_model_temperature_prompt_and_files(self):
+        base = cache_key('pro', 0.2, 'prompt', {'a.py': '1'})
+        self.assertEqual(base, cache_key('pro', 0.2, 'prompt', {'a.py': '1'}))
+        self.assertNotEqual(base, cache_key('flash', 0.2, 'prompt', {'a.py': '1'}))
+        self.assertNotEqual(base, cache_key('pro', 0.1, 'prompt', {'a.py': '1'}))
+        self.assertNotEqual(base, cache_key('pro', 0.2, 'other', {'a.py': '1'}))
+        self.assertNotEqual(base, cache_key('pro', 0.2, 'prompt', {'a.py': '2'}))
+
+    def test_lru_eviction(self):
+        cache = LLMCache(self.cache_dir, max_bytes=300)
+        value = "x" * 80
+        for key in ('a', 'b', 'c'):
+            cache.put(key, value)
+        cache.get('a')  # 'b' is now the least recently used
+        cache.put('d', value)
+
+        self.assertGreater(cache.stats()['evictions'], 0)
+        self.assertLessEqual(cache.stats()['bytes'], 300)
+        self.assertIsNone(cache.get('b'))
+        self.assertEqual(cache.get('a'), value)
+        self.assertEqual(cache.get('d'), value)
+
+        # The index is rebuilt from disk with the same entries
+        reopened = LLMCache(self.cache_dir, max_bytes=300)
+        self.assertEqual(set(reopened.entries), set(cache.entries))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,136 @@
+import os
+import shutil
+import tempfile
+import unittest
+from log_digest import LogDigest
+from runner_service import LocalTestRunner
+
+REPORT = """test_a (tests.test_game.TestGame.test_a) ... FAIL
+test_b (tests.test_game.TestGame.test_b) ... FAIL
+test_c (tests.test_game.TestGame.test_c) ... ERROR
+test_d (tests.test_game.TestGame.test_d) ... ok
+
+======================================================================
+ERROR: test_c (tests.test_game.TestGame.test_c)
+----------------------------------------------------------------------
+Traceback (most recent call last):
+  File "/work/tests/test_game.py", line 20, in test_c
+    load()
+  File "/work/app/game.py", line 3, in load
+    import missing
+ModuleNotFoundError: No module named 'missing'
+
+======================================================================
+FAIL: test_a (tests.test_game.TestGame.test_a)
+----------------------------------------------------------------------
+Traceback (most recent call last):
+  File "/work/tests/test_game.py", line 8, in check
+    self.assertEqual(answer(), 42)
+AssertionError: 41 != 42
+
+======================================================================
+FAIL: test_b (tests.test_game.TestGame.test_b)
+----------------------------------------------------------------------
+Traceback (most recent call last):
+  File "/work/tests/test_game.py", line 8, in check
+    self.assertEqual(answer(), 42)
+AssertionError: 40 != 42
+
+----------------------------------------------------------------------
+Ran 4 tests in 0.004s
+
+FAILED (failures=2, errors=1)
+"""
+
+FAILING_TESTS = """import time
+import unittest
+
+def check(case, value):
+    time.sleep(0.05)
+    case.assertEqual(value, 42)
+
+class TestMany(unittest.TestCase):
+""" + "".join(f"    def test_{i:02d}(self):\n        check(self, {i})\n\n" for i in range(30))
+
+class TestLogDigest(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.raw_log_path = os.path.join(self.tmp, 'logs', 'run.log')
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp, ignore_errors=True)
+
+    def test_collapses_repeated_tracebacks(self):
+        log = LogDigest(max_failures=0, raw_log_path=self.raw_log_path)
+        for line in REPORT.splitlines():
+            log.feed(line)
+        log.close()
+        digest = log.digest()
+
+        self.assertTrue(digest.startswith("Ran 4 tests: 3 failed"))
+        self.assertIn("[FAIL x2] test_a (tests.test_game.TestGame.test_a), test_b", digest)
+        self.assertEqual(digest.count("AssertionError"), 1)
+        self.assertIn("[ERROR] test_c", digest)
+        self.assertIn("ModuleNotFoundError: No module named 'missing'", digest)
+        with open(self.raw_log_path) as f:
+            self.assertEqual(f.read(), REPORT)
+
+    def test_size_bound(self):
+        log = LogDigest(max_failures=0, max_chars=350)
+        for line in REPORT.splitlines():
+            log.feed(line)
+        digest = log.digest()
+        self.assertLessEqual(len(digest), 350)
+        self.assertIn("more distinct failures omitted", digest)
+
+    def test_limit_counts_progress_lines(self):
+        log = LogDigest(max_failures=2)
+        self.assertFalse(log.feed("test_a (m.T.test_a) ... FAIL"))
+        self.assertFalse(log.feed("test_b (m.T.test_b) ... ok"))
+        self.assertTrue(log.feed("test_c (m.T.test_c) ... ERROR"))
+
+    def test_output_without_report(self):
+        log = LogDigest()
+        log.feed("Traceback (most recent call last):")
+        log.feed("SyntaxError: invalid syntax")
+        digest = log.digest()
+        self.assertIn("No unittest summary", digest)
+        self.assertIn("SyntaxError: invalid syntax", digest)
+
+class TestStreamingRun(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.project = os.path.join(self.tmp, 'project')
+        os.makedirs(os.path.join(self.project, 'tests'))
+        with open(os.path.join(self.project, 'tests', '__init__.py'), 'w'):
+            pass
+        with open(os.path.join(self.project, 'tests', 'test_many.py'), 'w') as f:
+            f.write(FAILING_TESTS)
+        self.runner = LocalTestRunner(os.path.join(self.tmp, 'cache'))
+
+    def tearDown(self):
+        self.runner.shutdown()
+        shutil.rmtree(self.tmp, ignore_errors=True)
+
+    def test_stops_early_with_a_compact_digest(self):
+        raw_log_path = os.path.join(self.tmp, 'run.log')
+        log = LogDigest(max_failures=3, raw_log_path=raw_log_path)
+        returncode, output = self.runner.run(self.project, on_output=log.stream().feed)
+        log.close()
+
+        self.assertNotEqual(returncode, 0)
+        self.assertEqual(output, '')
+        digest = log.digest()
+        self.assertIn("stopped after 3 failures", digest)
+        ran = int(digest.split()[1])
+        self.assertLess(ran, 30)
+        # Every failure has the same traceback: it appears once
+        self.assertEqual(digest.count("Traceback"), 1)
+        self.assertIn(f"x{ran}]", digest)
+        with open(raw_log_path) as f:
+            self.assertIn("AssertionError", f.read())
+
+if __name__ == '__main__':
+    unittest.main()
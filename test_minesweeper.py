@@ -144,5 +144,72 @@ class TestMinesweeperGame(unittest.TestCase):
         self.assertEqual(game.get_game_state(), 'won')
         self.assertEqual(game.revealed_count, game.total_safe_cells)
 
+    def test_large_board_flood_fill(self):
+        # A big board with almost no mines opens a huge empty area in one click,
+        # which must not hit Python's recursion limit
+        random.seed(7)
+        R, C, M = 300, 300, 1
+        game = MinesweeperGame(R, C, M)
+
+        game.reveal_cell(150, 150)
+
+        self.assertEqual(game.get_game_state(), 'won')
+        self.assertEqual(game.revealed_count, R * C - M)
+
+        # Values must still match a full neighbour count
+        mine_r, mine_c = next((r, c) for r in range(R) for c in range(C) if game.board[r][c]['is_mine'])
+        for dr in [-1, 0, 1]:
+            for dc in [-1, 0, 1]:
+                r, c = mine_r + dr, mine_c + dc
+                if (dr or dc) and 0 <= r < R and 0 <= c < C:
+                    self.assertEqual(game.board[r][c]['value'], 1)
+
+        with self.assertRaises(ValueError):
+            MinesweeperGame(MinesweeperGame.MAX_SIZE + 1, 5, 1)
+
+    def test_max_size_board_uses_flat_arrays(self):
+        random.seed(3)
+        R = C = MinesweeperGame.MAX_SIZE
+        M = R * C * 15 // 100
+        game = MinesweeperGame(R, C, M)
+        self.assertEqual(len(game.mines), R * C)
+
+        game.reveal_cell(500, 500)
+
+        self.assertEqual(game.mines.count(1), M)
+        for r in range(499, 502):
+            for c in range(499, 502):
+                self.assertFalse(game.board[r][c]['is_mine'])
+        # Spot-check the counts at corners, edges and the middle
+        for r, c in [(0, 0), (0, C - 1), (R - 1, 0), (R - 1, C - 1), (0, 300), (700, C - 1), (250, 250)]:
+            if game.board[r][c]['is_mine']:
+                continue
+            expected = sum(game.board[nr][nc]['is_mine']
+                           for nr in range(max(r - 1, 0), min(r + 2, R))
+                           for nc in range(max(c - 1, 0), min(c + 2, C)))
+            self.assertEqual(game.board[r][c]['value'], expected)
+
+    def test_prepared_layout_is_moved_out_of_the_safe_zone(self):
+        random.seed(5)
+        R, C, M = 20, 20, 60
+        game = MinesweeperGame(R, C, M)
+        # Three of the prepared mines sit around the first click, the rest fill the top rows
+        around = [10 * C + 10, 9 * C + 11, 11 * C + 9]
+        kept = set(range(M - len(around)))
+        layout = bytearray(R * C)
+        for index in kept.union(around):
+            layout[index] = 1
+        game.layout = layout
+
+        game.reveal_cell(10, 10)
+
+        mines = {i for i in range(R * C) if game.board[i // C][i % C]['is_mine']}
+        self.assertEqual(len(mines), M)
+        self.assertLessEqual(kept, mines)
+        for r in range(9, 12):
+            for c in range(9, 12):
+                self.assertFalse(game.board[r][c]['is_mine'])
+        self.assertTrue(game.board[10][10]['is_revealed'])
+
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
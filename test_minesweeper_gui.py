@@ -0,0 +1,132 @@
+import time
+import threading
+import unittest
+import tkinter as tk
+from minesweeper_gui import MinesweeperGUI
+from minesweeper_solver import MinesweeperSolver
+from test_minesweeper_solver import make_game
+
+try:
+    tk.Tk().destroy()
+    HAS_DISPLAY = True
+except tk.TclError:
+    HAS_DISPLAY = False
+
+@unittest.skipUnless(HAS_DISPLAY, "Tk needs a display")
+class TestViewport(unittest.TestCase):
+
+    def setUp(self):
+        self.root = tk.Tk()
+        self.app = MinesweeperGUI(self.root, viewport=True)
+        self.app.start_game(200, 200, 10)
+        self.pump()
+
+    def tearDown(self):
+        self.root.destroy()
+
+    def pump(self):
+        self.root.update_idletasks()
+        self.root.update()
+
+    def test_visible_range_follows_window_size(self):
+        rows, cols = self.app.view_rows, self.app.view_cols
+
+        self.root.geometry('1200x1000')
+        self.pump()
+        self.assertGreater(self.app.view_rows, rows)
+        self.assertGreater(self.app.view_cols, cols)
+        self.assertEqual(len(self.app.cell_items), self.app.view_rows)
+        self.assertEqual(len(self.app.cell_items[0]), self.app.view_cols)
+
+        self.root.geometry('400x300')
+        self.pump()
+        self.assertLess(self.app.view_rows, rows)
+        self.assertLess(self.app.view_cols, cols)
+
+@unittest.skipUnless(HAS_DISPLAY, "Tk needs a display")
+class TestRestart(unittest.TestCase):
+
+    def setUp(self):
+        self.root = tk.Tk()
+        self.app = MinesweeperGUI(self.root)
+
+    def tearDown(self):
+        self.root.destroy()
+
+    def test_same_size_board_is_reused(self):
+        self.app.start_game(16, 30, 99)
+        self.root.update()
+        board = self.app.board_container
+        buttons = self.app.buttons
+
+        self.app.start_screen()
+        self.app.start_game(16, 30, 99)
+        self.root.update()
+        self.assertIs(self.app.board_container, board)
+        self.assertIs(self.app.buttons, buttons)
+        self.assertEqual(self.app.game.revealed_count, 0)
+
+        # Time until Tk is idle again: building 480 buttons vs resetting them
+        build, reuse = self.app.latency['app'].samples['restart']
+        self.assertLess(reuse, build)
+
+    def test_mines_are_drawn_before_the_first_click(self):
+        self.app.start_game(16, 30, 99)
+        game = self.app.game
+        deadline = time.monotonic() + 5
+        while game.layout is None and time.monotonic() < deadline:
+            time.sleep(0.01)
+        layout = game.layout
+        self.assertEqual(layout.count(1), 99)
+
+        self.app.handle_click(8, 15, 'left')
+        self.assertIs(game.mines, layout)
+        self.assertEqual(game.mines.count(1), 99)
+        self.assertFalse(game.board[8][15]['is_mine'])
+
+class RecordingSolver(MinesweeperSolver):
+    """Notes the thread every analysis runs on."""
+    def __init__(self, game):
+        super().__init__(game)
+        self.threads = []
+
+    def analyze(self, cancel_event=None):
+        self.threads.append(threading.current_thread())
+        return super().analyze(cancel_event)
+
+@unittest.skipUnless(HAS_DISPLAY, "Tk needs a display")
+class TestAnalysis(unittest.TestCase):
+
+    def setUp(self):
+        self.root = tk.Tk()
+        self.app = MinesweeperGUI(self.root)
+        self.app.start_game(6, 6, 4)
+        self.app.game = make_game(6, 6, [(0, 0), (0, 5), (3, 2), (5, 5)], reveal=(5, 0))
+        self.app.solver = RecordingSolver(self.app.game)
+        self.app.end_game_message = lambda: self.app.status_label.config(text="Game over")
+        self.app.update_gui()
+
+    def tearDown(self):
+        self.root.destroy()
+
+    def pump_until(self, condition, timeout=5):
+        deadline = time.monotonic() + timeout
+        while not condition() and time.monotonic() < deadline:
+            self.root.update()
+            time.sleep(0.01)
+        self.assertTrue(condition())
+
+    def test_hint_runs_off_the_tk_thread(self):
+        self.app.start_analysis('hint')
+        self.pump_until(lambda: self.app.status_label.cget('text').startswith("Hint"))
+        self.assertTrue(self.app.solver.threads)
+        self.assertNotIn(threading.main_thread(), self.app.solver.threads)
+
+    def test_auto_play_runs_off_the_tk_thread(self):
+        self.app.start_analysis('auto')
+        self.pump_until(lambda: self.app.game.get_game_state() == 'won' and not self.app.analysis_polling)
+        self.assertGreaterEqual(len(self.app.solver.threads), 1)
+        self.assertNotIn(threading.main_thread(), self.app.solver.threads)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,86 @@
+import unittest
+import threading
+from minesweeper_game import MinesweeperGame
+from minesweeper_solver import MinesweeperSolver
+
+def make_game(rows, cols, mines, reveal):
+    """Builds a game with fixed mine positions and reveals from the given cell."""
+    game = MinesweeperGame(rows, cols, len(mines))
+    for r, c in mines:
+        game.board[r][c]['is_mine'] = True
+    game._calculate_neighbor_values()
+    game._recursive_reveal(*reveal)
+    return game
+
+class TestMinesweeperSolver(unittest.TestCase):
+
+    def test_first_move_is_safe(self):
+        game = MinesweeperGame(9, 9, 10)
+        safe, mines = MinesweeperSolver(game).analyze()
+        self.assertEqual(safe, {(4, 4)})
+        self.assertEqual(mines, set())
+
+    def test_deduces_safe_cells_and_mines(self):
+        # Mines at both top corners: the top middle cell can only be proven safe
+        # by combining the constraints of neighbouring numbers
+        game = make_game(3, 3, [(0, 0), (0, 2)], reveal=(2, 1))
+        self.assertEqual(game.get_game_state(), 'playing')
+
+        safe, mines = MinesweeperSolver(game).analyze()
+        self.assertEqual(safe, {(0, 1)})
+        self.assertEqual(mines, {(0, 0), (0, 2)})
+
+    def test_never_reports_a_mine_as_safe(self):
+        game = make_game(5, 5, [(0, 0), (4, 4), (2, 3)], reveal=(4, 0))
+        safe, mines = MinesweeperSolver(game).analyze()
+        for r, c in safe:
+            self.assertFalse(game.board[r][c]['is_mine'])
+        for r, c in mines:
+            self.assertTrue(game.board[r][c]['is_mine'])
+
+    def test_flags_are_not_trusted(self):
+        game = make_game(3, 3, [(0, 0), (0, 2)], reveal=(2, 1))
+        # A wrong flag on the safe cell must not change the deduction
+        game.toggle_flag(0, 1)
+        safe, _ = MinesweeperSolver(game).analyze()
+        self.assertEqual(safe, {(0, 1)})
+
+    def test_cancelled_analysis_returns_none(self):
+        game = make_game(3, 3, [(0, 0), (0, 2)], reveal=(2, 1))
+        cancel = threading.Event()
+        cancel.set()
+        self.assertIsNone(MinesweeperSolver(game, cancel).analyze())
+
+    def test_reused_solver_follows_new_reveals(self):
+        game = make_game(6, 6, [(0, 0), (0, 5), (3, 2), (5, 5)], reveal=(5, 0))
+        solver = MinesweeperSolver(game)
+        while game.get_game_state() == 'playing':
+            result = solver.analyze()
+            self.assertEqual(result, MinesweeperSolver(game).analyze())
+            safe = [cell for cell in result[0] if game.get_cell_state(*cell) == 'unrevealed']
+            if not safe:
+                break
+            for r, c in safe:
+                game.reveal_cell(r, c)
+
+    def test_analysis_cost_follows_the_frontier(self):
+        class CountingGame(MinesweeperGame):
+            reads = 0
+
+            def get_cell_state(self, r, c):
+                CountingGame.reads += 1
+                return super().get_cell_state(r, c)
+
+        # A 3x3 pocket in the corner of a large board, fenced by mines
+        mines = [(3, c) for c in range(4)] + [(r, 3) for r in range(3)]
+        game = CountingGame(300, 300, len(mines))
+        for r, c in mines:
+            game.board[r][c]['is_mine'] = True
+        game._calculate_neighbor_values()
+        game._recursive_reveal(0, 0)
+
+        self.assertIsNotNone(MinesweeperSolver(game).analyze())
+        self.assertLess(CountingGame.reads, 200)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,95 @@
+import io
+import os
+import shutil
+import tempfile
+import threading
+import unittest
+from contextlib import redirect_stdout
+from pipeline_metrics import PipelineMetrics, load_spans, report, main
+
+class TestPipelineMetrics(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.jsonl_path = os.path.join(self.tmp, 'metrics', 'spans.jsonl')
+        self.prom_path = os.path.join(self.tmp, 'metrics', 'metrics.prom')
+        self.metrics = PipelineMetrics(self.jsonl_path, self.prom_path)
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp, ignore_errors=True)
+
+    def run_issue(self, number, fixes):
+        """Spans of one issue as the runner records them."""
+        with self.metrics.span('issue', number):
+            with self.metrics.span('crew') as crew:
+                for agent in ('architect', 'developer'):
+                    self.metrics.record_llm_call(100, 20)
+                    crew.split('task', agent=agent)
+            for attempt in range(fixes):
+                with self.metrics.span('tests'):
+                    self.metrics.add('test_seconds', 1.5)
+                self.metrics.add('retries')
+                with self.metrics.span('fix', attempt=attempt):
+                    self.metrics.record_llm_call(50, 10)
+
+    def spans(self):
+        return load_spans(self.jsonl_path)
+
+    def test_counters_roll_up_to_enclosing_spans(self):
+        self.run_issue(7, fixes=2)
+        spans = self.spans()
+        issue = next(span for span in spans if span['stage'] == 'issue')
+        self.assertEqual(issue['issue'], 7)
+        self.assertEqual(issue['llm_calls'], 4)
+        self.assertEqual(issue['prompt_tokens'], 300)
+        self.assertEqual(issue['completion_tokens'], 60)
+        self.assertEqual(issue['retries'], 2)
+        self.assertEqual(issue['test_seconds'], 3.0)
+
+        tasks = [span for span in spans if span['stage'] == 'task']
+        self.assertEqual([task['agent'] for task in tasks], ['architect', 'developer'])
+        self.assertTrue(all(task['llm_calls'] == 1 and task['issue'] == 7 and task['parent'] == 'crew'
+                            for task in tasks))
+        self.assertEqual([span['attempt'] for span in spans if span['stage'] == 'fix'], [0, 1])
+
+    def test_errors_are_recorded(self):
+        with self.assertRaises(RuntimeError):
+            with self.metrics.span('pull_request', 3):
+                raise RuntimeError("push rejected")
+        self.assertEqual(self.spans()[0]['status'], 'error')
+        self.assertIn('agent_stage_errors_total{stage="pull_request"} 1', self.metrics.prometheus_text())
+
+    def test_threads_have_separate_spans(self):
+        threads = [threading.Thread(target=self.run_issue, args=(number, 1)) for number in (1, 2)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        issues = {span['issue']: span for span in self.spans() if span['stage'] == 'issue'}
+        self.assertEqual(issues[1]['llm_calls'], 3)
+        self.assertEqual(issues[2]['llm_calls'], 3)
+
+    def test_prometheus_file(self):
+        self.run_issue(1, fixes=1)
+        with open(self.prom_path) as f:
+            text = f.read()
+        self.assertIn('# TYPE agent_stage_duration_seconds summary', text)
+        self.assertIn('agent_stage_duration_seconds_count{stage="task"} 2', text)
+        self.assertIn('agent_stage_tokens_total{stage="issue",kind="prompt"} 250', text)
+        self.assertIn('agent_stage_retries_total{stage="issue"} 1', text)
+
+    def test_report(self):
+        self.run_issue(1, fixes=0)
+        self.run_issue(2, fixes=2)
+        text = report(self.spans())
+        self.assertIn("Most expensive issues:", text)
+        # Issue 2 used more tokens, so it comes first
+        self.assertLess(text.index("#2:"), text.index("#1:"))
+
+        output = io.StringIO()
+        with redirect_stdout(output):
+            main(['report', self.jsonl_path])
+        self.assertIn("fix", output.getvalue())
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,107 @@
+import os
+import shutil
+import tempfile
+import unittest
+from project_index import ProjectIndex
+
+GAME = '''"""Game rules."""
+
+class Game:
+    """Holds the board."""
+    def __init__(self, rows, cols):
+        self.rows = rows
+
+    def reveal(self, row, col):
+        pass
+
+def new_game(rows=9, cols=9):
+    return Game(rows, cols)
+'''
+
+def write(path, content):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'w') as f:
+        f.write(content)
+
+class TestProjectIndex(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.project = os.path.join(self.tmp, 'project')
+        self.cache_path = os.path.join(self.tmp, 'index.json')
+        write(os.path.join(self.project, 'app', '__init__.py'), "")
+        write(os.path.join(self.project, 'app', 'game.py'), GAME)
+        write(os.path.join(self.project, 'app', 'gui.py'), "from app.game import new_game\n")
+        write(os.path.join(self.project, 'README.md'), "# Project\n")
+        write(os.path.join(self.project, '.git', 'HEAD'), "ref: refs/heads/main\n")
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp, ignore_errors=True)
+
+    def index(self):
+        return ProjectIndex(self.project, self.cache_path).refresh()
+
+    def test_tree_is_recursive_with_sizes(self):
+        tree = self.index().tree(hidden={'README.md'})
+        self.assertIn("app/\n  __init__.py (0 B)", tree)
+        self.assertIn(f"  game.py ({len(GAME)} B)", tree)
+        self.assertNotIn("README.md", tree)
+        self.assertNotIn("HEAD", tree)
+
+    def test_outline_and_find(self):
+        index = self.index()
+        outline = index.outline('./app/game.py')
+        self.assertIn("app/game.py", outline)
+        self.assertIn("Game rules.", outline)
+        self.assertIn("class Game (line 3)  # Holds the board.", outline)
+        self.assertIn("def reveal(self, row, col)", outline)
+        self.assertIn("def new_game(rows=9, cols=9) (line 11)", outline)
+        self.assertIn("not a Python file", index.outline('README.md'))
+        self.assertIn("not in the project index", index.outline('missing.py'))
+
+        self.assertEqual(index.find('new_game'), "app/game.py:11 function new_game")
+        self.assertEqual(index.find('reveal'), "app/game.py:3 method Game.reveal")
+
+    def test_importers(self):
+        index = self.index()
+        self.assertEqual(index.importers('app.game'), "app/gui.py")
+        self.assertEqual(index.importers('app/game.py'), "app/gui.py")
+        self.assertIn("imports: app, app.game", index.outline('app/gui.py'))
+
+    def test_updates_only_changed_files(self):
+        self.assertEqual(self.index().analyzed_files, 3)
+
+        # Unchanged files are neither re-read nor re-analysed, also after a restart
+        index = self.index()
+        self.assertEqual(index.analyzed_files, 0)
+
+        write(os.path.join(self.project, 'app', 'gui.py'), "from app.game import Game\n\ndef show():\n    pass\n")
+        os.remove(os.path.join(self.project, 'README.md'))
+        index = self.index()
+        self.assertEqual(index.analyzed_files, 1)
+        self.assertEqual(index.find('show'), "app/gui.py:3 function show")
+        self.assertNotIn('README.md', index.files)
+
+    def test_identical_files_resolve_relative_imports_from_their_own_path(self):
+        for package in ('pkg_a', 'pkg_b'):
+            write(os.path.join(self.project, package, '__init__.py'), "from .core import run\n")
+            write(os.path.join(self.project, package, 'core.py'), "def run():\n    pass\n")
+        index = self.index()
+        self.assertEqual(index.importers('pkg_a.core'), "pkg_a/__init__.py")
+        self.assertEqual(index.importers('pkg_b.core'), "pkg_b/__init__.py")
+        self.assertIn("imports: pkg_b, pkg_b.core", index.outline('pkg_b/__init__.py'))
+
+        # Also when the analyses come back from the cache file
+        index = self.index()
+        self.assertEqual(index.analyzed_files, 0)
+        self.assertEqual(index.importers('pkg_b.core'), "pkg_b/__init__.py")
+
+    def test_query(self):
+        index = ProjectIndex(self.project)
+        self.assertIn("game.py", index.query("tree"))
+        self.assertIn("class Game", index.query("outline app/game.py, app/gui.py"))
+        self.assertIn("function new_game", index.query("find new_game"))
+        self.assertIn("Unknown query", index.query("read app/game.py"))
+
+if __name__ == '__main__':
+    unittest.main()
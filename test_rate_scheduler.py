@@ -0,0 +1,82 @@
+import threading
+import time
+import unittest
+from rate_scheduler import TokenBucket, RateScheduler, FIX_PRIORITY, NORMAL_PRIORITY
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+class TestTokenBucket(unittest.TestCase):
+
+    def test_refill(self):
+        clock = FakeClock()
+        bucket = TokenBucket(60, capacity=2, clock=clock)
+        bucket.take()
+        bucket.take()
+        self.assertAlmostEqual(bucket.wait_time(), 1.0)
+        clock.now = 0.5
+        self.assertAlmostEqual(bucket.wait_time(), 0.5)
+        clock.now = 10
+        self.assertEqual(bucket.wait_time(), 0)
+        self.assertEqual(bucket.tokens, 2)
+
+class TestRateScheduler(unittest.TestCase):
+
+    def wait_for_queue(self, scheduler, model, depth):
+        deadline = time.monotonic() + 5
+        while scheduler.stats()[model]['waiting'] < depth:
+            self.assertLess(time.monotonic(), deadline)
+            time.sleep(0.005)
+
+    def test_shared_quota_across_threads(self):
+        scheduler = RateScheduler({'flash': 1200})  # one request every 50 ms
+        start = time.monotonic()
+        threads = [threading.Thread(target=scheduler.acquire, args=('flash',)) for _ in range(6)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        # The first request is immediate, the other five wait for refills
+        self.assertGreaterEqual(time.monotonic() - start, 0.2)
+        stats = scheduler.stats()['flash']
+        self.assertEqual(stats['granted'], 6)
+        self.assertEqual(stats['waiting'], 0)
+        self.assertGreater(stats['max_waiting'], 1)
+
+    def test_fix_tasks_go_first(self):
+        scheduler = RateScheduler({'pro': 240})  # one request every 250 ms
+        scheduler.acquire('pro')
+        order = []
+
+        def worker(name, priority):
+            scheduler.acquire('pro', priority)
+            order.append(name)
+
+        threads = []
+        for i in range(2):
+            threads.append(threading.Thread(target=worker, args=(f"new-{i}", NORMAL_PRIORITY)))
+            threads[-1].start()
+            self.wait_for_queue(scheduler, 'pro', i + 1)
+
+        def fix_worker():
+            with scheduler.priority(FIX_PRIORITY):
+                worker("fix", None)
+
+        threads.append(threading.Thread(target=fix_worker))
+        threads[-1].start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(order, ["fix", "new-0", "new-1"])
+
+    def test_non_blocking_and_unknown_models(self):
+        scheduler = RateScheduler({'pro': 1})
+        self.assertTrue(scheduler.acquire('pro', blocking=False))
+        self.assertFalse(scheduler.acquire('pro', blocking=False))
+        self.assertTrue(scheduler.acquire('other-model'))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,164 @@
+import os
+import shutil
+import subprocess
+import tempfile
+import threading
+import unittest
+from runner_service import LocalTestRunner, DockerTestRunner, dockerfile_for, requirements_hash
+
+PASSING_TEST = """import unittest
+from app.game import answer
+
+class TestGame(unittest.TestCase):
+    def test_answer(self):
+        self.assertEqual(answer(), 42)
+"""
+
+SLOW_TEST = """import time, unittest
+
+class TestSlow(unittest.TestCase):
+    def test_slow(self):
+        time.sleep(30)
+"""
+
+def write(path, content):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'w') as f:
+        f.write(content)
+
+class TestLocalTestRunner(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.project = os.path.join(self.tmp, 'project')
+        write(os.path.join(self.project, 'app', '__init__.py'), "")
+        write(os.path.join(self.project, 'app', 'game.py'), "def answer():\n    return 42\n")
+        write(os.path.join(self.project, 'tests', '__init__.py'), "")
+        write(os.path.join(self.project, 'tests', 'test_game.py'), PASSING_TEST)
+        self.runner = LocalTestRunner(os.path.join(self.tmp, 'cache'))
+
+    def tearDown(self):
+        self.runner.shutdown()
+        shutil.rmtree(self.tmp, ignore_errors=True)
+
+    def test_runs_are_served_by_one_warm_process(self):
+        returncode, output = self.runner.run(self.project)
+        self.assertEqual(returncode, 0, output)
+        self.assertIn("Ran 1 test", output)
+        [(server, _)] = next(iter(self.runner.servers.values()))
+
+        # A fix between attempts is picked up without restarting the server
+        write(os.path.join(self.project, 'app', 'game.py'), "def answer():\n    return 41\n")
+        returncode, output = self.runner.run(self.project)
+        self.assertEqual(returncode, 1)
+        self.assertIn("FAIL", output)
+        [(reused, _)] = next(iter(self.runner.servers.values()))
+        self.assertIs(reused, server)
+        self.assertIsNone(server.poll())
+
+    def test_runner_checkout_is_not_importable(self):
+        # calculator.py exists next to runner_service.py, but not in the worktree
+        write(os.path.join(self.project, 'tests', 'test_calc.py'),
+              "import unittest\nimport calculator\n\nclass TestCalc(unittest.TestCase):\n"
+              "    def test_calc(self):\n        pass\n")
+        returncode, output = self.runner.run(self.project)
+        self.assertEqual(returncode, 1, output)
+        self.assertIn("No module named 'calculator'", output)
+
+    def test_requirements_change_uses_a_new_layer(self):
+        self.runner.run(self.project)
+        first_hash = requirements_hash(self.project)
+        write(os.path.join(self.project, 'requirements.txt'), "# no packages yet\n")
+        self.runner.run(self.project)
+        self.assertNotEqual(requirements_hash(self.project), first_hash)
+        self.assertEqual(len(self.runner.servers), 2)
+
+    def test_timeout(self):
+        write(os.path.join(self.project, 'tests', 'test_slow.py'), SLOW_TEST)
+        returncode, output = self.runner.run(self.project, timeout=1)
+        self.assertNotEqual(returncode, 0)
+        self.assertIn("killed", output)
+
+    def test_install_does_not_block_other_layers(self):
+        other = os.path.join(self.tmp, 'other')
+        shutil.copytree(self.project, other)
+        write(os.path.join(other, 'requirements.txt'), "# no packages yet\n")
+
+        # An install for the first project's layer is in progress
+        busy = self.runner.install_locks.setdefault(requirements_hash(self.project), threading.Lock())
+        with busy:
+            done = []
+            worker = threading.Thread(target=lambda: done.append(self.runner.run(other)))
+            worker.start()
+            worker.join(30)
+            self.assertEqual(done[0][0], 0, done)
+
+def docker_available():
+    if shutil.which('docker') is None:
+        return False
+    return subprocess.run(['docker', 'info'], capture_output=True).returncode == 0
+
+class TestDockerTestRunner(unittest.TestCase):
+
+    def test_container_path(self):
+        runner = DockerTestRunner('/repo')
+        self.assertEqual(runner._container_path('/repo'), '/work')
+        self.assertEqual(runner._container_path('/repo/.worktrees/issue-3'), '/work/.worktrees/issue-3')
+
+    def test_dockerfile(self):
+        self.assertEqual(dockerfile_for('python:3.10-slim', False), "FROM python:3.10-slim\n")
+        dockerfile = dockerfile_for('python:3.10-slim', True)
+        self.assertIn("COPY requirements.txt", dockerfile)
+        self.assertIn("RUN pip install --no-cache-dir -r /tmp/requirements.txt", dockerfile)
+
+@unittest.skipUnless(docker_available(), "needs a running Docker daemon")
+class TestDockerRuns(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.project = os.path.join(self.tmp, 'project')
+        write(os.path.join(self.project, 'app', '__init__.py'), "")
+        write(os.path.join(self.project, 'app', 'game.py'), "def answer():\n    return 42\n")
+        write(os.path.join(self.project, 'tests', '__init__.py'), "")
+        write(os.path.join(self.project, 'tests', 'test_game.py'), PASSING_TEST)
+        self.runner = DockerTestRunner(self.tmp)
+
+    def tearDown(self):
+        self.runner.shutdown()
+        shutil.rmtree(self.tmp, ignore_errors=True)
+
+    def container(self):
+        return f"ai-test-runner-{requirements_hash(self.project)}"
+
+    def test_image_outlives_the_container(self):
+        returncode, output = self.runner.run(self.project)
+        self.assertEqual(returncode, 0, output)
+        subprocess.run(['docker', 'rm', '-f', self.container()], capture_output=True)
+
+        returncode, output = self.runner.run(self.project)
+        self.assertEqual(returncode, 0, output)
+        image = subprocess.run(['docker', 'image', 'inspect', f"ai-test-runner:{requirements_hash(self.project)}"],
+                               capture_output=True)
+        self.assertEqual(image.returncode, 0)
+
+    def test_timeout_kills_the_process_in_the_container(self):
+        write(os.path.join(self.project, 'tests', 'test_slow.py'), SLOW_TEST)
+        returncode, output = self.runner.run(self.project, timeout=3)
+        self.assertNotEqual(returncode, 0)
+        self.assertIn("killed", output)
+
+        listed = subprocess.run(
+            ['docker', 'exec', self.container(), 'python', '-c',
+             "import os; print(sum(b'unittest' in open(f'/proc/{p}/cmdline', 'rb').read() "
+             "for p in os.listdir('/proc') if p.isdigit()))"],
+            capture_output=True, text=True)
+        self.assertEqual(listed.stdout.strip(), '0')
+
+    def test_streaming_interrupt(self):
+        lines = []
+        returncode, output = self.runner.run(self.project, on_output=lambda line: lines.append(line) or True)
+        self.assertEqual(output, '')
+        self.assertTrue(any("test_answer" in line for line in lines), lines)
+
+if __name__ == '__main__':
+    unittest.main()
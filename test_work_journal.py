@@ -0,0 +1,63 @@
+import os
+import shutil
+import tempfile
+import unittest
+from work_journal import WorkJournal
+
+class TestWorkJournal(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.path = os.path.join(self.tmp, 'journal.jsonl')
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp, ignore_errors=True)
+
+    def test_resume_after_restart(self):
+        journal = WorkJournal(self.path)
+        journal.record(5, 'started', branch='feature/issue-5-x')
+        journal.record(5, 'crew', plan="1. Add a timer", commit='abc')
+        journal.record(5, 'tests-0', passed=False, log="Ran 3 tests: 1 failed")
+
+        restarted = WorkJournal(self.path)
+        self.assertEqual(restarted.in_flight(), [5])
+        stages = restarted.stages(5)
+        self.assertEqual(stages['crew']['plan'], "1. Add a timer")
+        self.assertFalse(stages['tests-0']['passed'])
+        self.assertNotIn('fix-1', stages)
+        self.assertEqual(restarted.last_commit(5), 'abc')
+
+        restarted.record(5, 'fix-1', commit='def')
+        self.assertEqual(restarted.last_commit(5), 'def')
+
+    def test_torn_last_line_is_ignored(self):
+        journal = WorkJournal(self.path)
+        journal.record(1, 'started')
+        journal.record(1, 'crew', plan="plan")
+        with open(self.path, 'a') as f:
+            f.write('{"issue": 1, "stage": "tests-0", "da')
+
+        restarted = WorkJournal(self.path)
+        self.assertEqual(sorted(restarted.stages(1)), ['crew', 'started'])
+
+    def test_finished_runs(self):
+        journal = WorkJournal(self.path)
+        journal.record(1, 'started')
+        journal.record(1, 'crew', plan="old plan")
+        journal.finish(1, 'done')
+        journal.record(2, 'started')
+        self.assertEqual(journal.in_flight(), [2])
+        self.assertEqual(journal.stages(1), {})
+
+        # A new run of the same issue starts from scratch
+        journal.record(1, 'started')
+        self.assertEqual(journal.stages(1), {'started': {}})
+
+        journal.finish(1, 'failed')
+        journal.compact()
+        self.assertEqual(WorkJournal(self.path).in_flight(), [2])
+        with open(self.path) as f:
+            self.assertEqual(len(f.readlines()), 1)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,92 @@
+import os
+import json
+import time
+import threading
+
+class WorkJournal:
+    """
+    Append-only JSON lines journal of each issue's completed stages (crew output,
+    test results, fixes, pull request). Every entry is flushed and fsynced before
+    the stage counts as done, so after a crash or restart the runner resumes an
+    issue from its last completed stage. A torn last line is ignored on load.
+    """
+    def __init__(self, path='.ai_cache/journal.jsonl'):
+        self.path = path
+        self.lock = threading.Lock()
+        self.entries = []
+        if os.path.exists(path):
+            with open(path, 'r', encoding='utf-8') as f:
+                for line in f:
+                    try:
+                        self.entries.append(json.loads(line))
+                    except ValueError:
+                        continue
+
+    def record(self, issue_number, stage, **data):
+        """Appends one completed stage and waits until it is on disk."""
+        entry = {'issue': issue_number, 'stage': stage, 'time': round(time.time(), 3), 'data': data}
+        line = json.dumps(entry, default=str) + "\n"
+        with self.lock:
+            os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+            with open(self.path, 'a', encoding='utf-8') as f:
+                f.write(line)
+                f.flush()
+                os.fsync(f.fileno())
+            self.entries.append(entry)
+
+    def finish(self, issue_number, outcome):
+        """Closes the issue's current run; a later 'started' begins a new one."""
+        self.record(issue_number, 'finished', outcome=outcome)
+
+    def stages(self, issue_number):
+        """{stage: data} of the issue's current (unfinished) run; empty if there is none."""
+        current = {}
+        with self.lock:
+            for entry in self.entries:
+                if entry['issue'] != issue_number:
+                    continue
+                if entry['stage'] in ('started', 'finished'):
+                    current = {}
+                if entry['stage'] != 'finished':
+                    current[entry['stage']] = entry['data']
+        return current
+
+    def last_commit(self, issue_number):
+        """Worktree checkpoint recorded by the latest completed stage of the current run, or None."""
+        commit = None
+        for data in self.stages(issue_number).values():
+            commit = data.get('commit') or commit
+        return commit
+
+    def in_flight(self):
+        """Issues with a run that was started and not finished."""
+        open_runs = set()
+        with self.lock:
+            for entry in self.entries:
+                if entry['stage'] == 'started':
+                    open_runs.add(entry['issue'])
+                elif entry['stage'] == 'finished':
+                    open_runs.discard(entry['issue'])
+        return sorted(open_runs)
+
+    def compact(self):
+        """Rewrites the journal keeping only the entries of unfinished runs."""
+        keep = set(self.in_flight())
+        with self.lock:
+            entries = []
+            latest_start = {}
+            for index, entry in enumerate(self.entries):
+                if entry['stage'] == 'started':
+                    latest_start[entry['issue']] = index
+            for index, entry in enumerate(self.entries):
+                if entry['issue'] in keep and index >= latest_start.get(entry['issue'], 0):
+                    entries.append(entry)
+            temp_path = self.path + '.tmp'
+            os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+            with open(temp_path, 'w', encoding='utf-8') as f:
+                for entry in entries:
+                    f.write(json.dumps(entry, default=str) + "\n")
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(temp_path, self.path)
+            self.entries = entries